@@ -0,0 +1,266 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .fill_simulator import FillSimulator
+from .result_cache import BacktestResultCache
+from .properties.backtester_properties import FillSimulatorProps
+from signal_generator.properties.signal_generator_properties import BaseSignalProps, MACrossoverProps, RSIProps
+from signal_generator.signals.signal_ma_crossover import SignalMACrossover
+from signal_generator.signals.signal_rsi_mr import SignalRSI
+from performance.performance_metrics import PerformanceMetrics
+from performance.properties.performance_properties import PerformanceMetricsProps
+from events.events import ExecutionEvent, SignalType
+from clock.clock import Clock
+from clock.properties.clock_properties import SimulatedClockProps
+from utils.utils import Utils
+from typing import List
+import bisect
+import pandas as pd
+import numpy as np
+
+# Versión del motor de backtest. Hay que incrementarla cuando cambie la lógica de simulación,
+# para que los resultados cacheados con la versión anterior dejen de ser válidos.
+BACKTEST_ENGINE_VERSION = "1.1"
+
+
+class Backtester():
+
+    def __init__(self, fill_properties: FillSimulatorProps, result_cache: BacktestResultCache | None = None):
+        """
+        Initializes the Backtester object.
+
+        Args:
+            fill_properties (FillSimulatorProps): The properties of the fill model.
+            result_cache (BacktestResultCache | None): The optional cache where the results are stored and looked up.
+        """
+        self.fill_properties = fill_properties
+        self.FILL_SIMULATOR = FillSimulator(fill_properties)
+        self.RESULT_CACHE = result_cache
+
+    def _get_signal_generator_method(self, signal_props: BaseSignalProps) -> SignalMACrossover | SignalRSI:
+        """
+        Returns an instance of the signal generator to be backtested based on the provided signal properties.
+
+        Args:
+            signal_props (BaseSignalProps): The signal properties.
+
+        Returns:
+            SignalMACrossover | SignalRSI: The signal generator.
+
+        Raises:
+            Exception: If the signal properties are of an unknown type.
+        """
+        if isinstance(signal_props, MACrossoverProps):
+            return SignalMACrossover(properties=signal_props)
+
+        elif isinstance(signal_props, RSIProps):
+            return SignalRSI(properties=signal_props)
+
+        else:
+            raise Exception(f"ERROR: Método de señal desconocido para el backtest: {signal_props}")
+
+    def run(self, signal_props: BaseSignalProps, bars: pd.DataFrame, symbol: str, timeframe: str, data_checksum: str | None = None) -> pd.DataFrame:
+        """
+        Runs a backtest of a strategy over historical bars, or returns it from the cache if it was already run.
+
+        Args:
+            signal_props (BaseSignalProps): The properties of the strategy.
+            bars (pd.DataFrame): The historical bars of the symbol, indexed by time.
+            symbol (str): The symbol of the bars.
+            timeframe (str): The timeframe of the bars.
+            data_checksum (str | None): The checksum of the data file the bars come from. If None, it is computed from the bars.
+
+        Returns:
+            pd.DataFrame: One row per trade with the columns 'symbol', 'signal', 'entry_time', 'entry_price', 'exit_time',
+            'exit_price', 'exit_reason' ("SL", "TP", "SIGNAL" or "END") and 'pnl_points'.
+        """
+        key = None
+        if self.RESULT_CACHE is not None and not bars.empty:
+            # La clave incluye el fill model, ya que cambia los resultados igual que la estrategia
+            checksum = data_checksum if data_checksum is not None else BacktestResultCache.compute_data_checksum(bars)
+            checksum = f"{checksum}:{self.fill_properties.model_dump_json()}"
+            key = BacktestResultCache.build_key(signal_props, symbol, timeframe, bars.index[0], bars.index[-1], checksum, BACKTEST_ENGINE_VERSION)
+
+            cached_result = self.RESULT_CACHE.get(key)
+            if cached_result is not None:
+                return cached_result
+
+        # El backtest corre sobre el tiempo simulado de las velas, no sobre la hora real
+        if bars.empty:
+            trades = self._simulate(signal_props, bars, symbol)
+        else:
+            with Clock.simulated(SimulatedClockProps(start_time=bars.index[0])):
+                trades = self._simulate(signal_props, bars, symbol)
+
+        if key is not None:
+            self.RESULT_CACHE.put(key, trades)
+
+        return trades
+
+    def run_sweep(self, signal_props_list: List[BaseSignalProps], bars: pd.DataFrame, symbol: str, timeframe: str, data_checksum: str | None = None) -> List[pd.DataFrame]:
+        """
+        Runs a parameter sweep: one backtest per strategy properties object, each one cached independently.
+
+        Args:
+            signal_props_list (List[BaseSignalProps]): The properties of every strategy to be backtested.
+            bars (pd.DataFrame): The historical bars of the symbol, indexed by time.
+            symbol (str): The symbol of the bars.
+            timeframe (str): The timeframe of the bars.
+            data_checksum (str | None): The checksum of the data file the bars come from. If None, it is computed once from the bars.
+
+        Returns:
+            List[pd.DataFrame]: The trades of each backtest, in the same order as signal_props_list.
+        """
+        if data_checksum is None and self.RESULT_CACHE is not None and not bars.empty:
+            data_checksum = BacktestResultCache.compute_data_checksum(bars)
+
+        return [self.run(signal_props, bars, symbol, timeframe, data_checksum) for signal_props in signal_props_list]
+
+    def compute_metrics(self, trades: pd.DataFrame, bars: pd.DataFrame, properties: PerformanceMetricsProps,
+                        initial_balance: float, volume: float, point_value: float) -> PerformanceMetrics:
+        """
+        Runs the trades of a backtest through PerformanceMetrics, the same engine used in live trading. The equity is
+        marked on every bar with the realized profit of the trades closed so far.
+
+        Args:
+            trades (pd.DataFrame): The trades returned by run.
+            bars (pd.DataFrame): The historical bars the backtest was run on, indexed by time.
+            properties (PerformanceMetricsProps): The properties of the performance metrics.
+            initial_balance (float): The initial balance of the account.
+            volume (float): The volume in lots of every trade.
+            point_value (float): The value in the account currency of one point for that volume.
+
+        Returns:
+            PerformanceMetrics: The metrics of the backtest.
+        """
+        metrics = PerformanceMetrics(properties)
+
+        profit = (trades['pnl_points'] * point_value).tolist()
+        execution_events = []
+        for k, (symbol, signal, entry_time, entry_price, exit_time, exit_price) in enumerate(zip(
+                trades['symbol'].tolist(), trades['signal'].tolist(), trades['entry_time'].tolist(),
+                trades['entry_price'].tolist(), trades['exit_time'].tolist(), trades['exit_price'].tolist())):
+            is_buy = signal == "BUY"
+            # (instante, prioridad, ejecución): en la misma vela, la salida va antes que la entrada de la siguiente operación
+            execution_events.append((exit_time, 0, ExecutionEvent(symbol=symbol, signal=SignalType.SELL if is_buy else SignalType.BUY,
+                                                                  fill_price=exit_price, fill_time=exit_time, volume=volume,
+                                                                  closes_position=True, profit=profit[k])))
+            execution_events.append((entry_time, 1, ExecutionEvent(symbol=symbol, signal=SignalType.BUY if is_buy else SignalType.SELL,
+                                                                   fill_price=entry_price, fill_time=entry_time, volume=volume)))
+        execution_events.sort(key=lambda item: (item[0], item[1]))
+
+        # Balance tras los cierres de cada vela, arrastrado a las velas sin cierres
+        realized = pd.Series(profit, index=pd.DatetimeIndex(trades['exit_time']), dtype=float).groupby(level=0).sum()
+        equity_curve = initial_balance + realized.reindex(bars.index, fill_value=0.0).cumsum()
+        metrics.replay([execution_event for _, _, execution_event in execution_events], equity_curve)
+        return metrics
+
+    def _simulate(self, signal_props: BaseSignalProps, bars: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        """
+        Simulates the strategy over the bars.
+
+        The entry conditions of every bar and the fills and SL/TP exits of every candidate entry are computed as batched
+        array operations. Then a walk over the signals (not over the bars) applies the same position logic as
+        generate_signal: open when there is no position in that direction, and close the opposite position before.
+
+        Args:
+            signal_props (BaseSignalProps): The properties of the strategy.
+            bars (pd.DataFrame): The historical bars of the symbol, indexed by time.
+            symbol (str): The symbol of the bars.
+
+        Returns:
+            pd.DataFrame: The trades of the backtest.
+        """
+        columns = ['symbol', 'signal', 'entry_time', 'entry_price', 'exit_time', 'exit_price', 'exit_reason', 'pnl_points']
+        if len(bars) < 2:
+            return pd.DataFrame(columns=columns)
+
+        signal_generator = self._get_signal_generator_method(signal_props)
+        buy_condition, sell_condition = signal_generator.compute_backtest_conditions(bars)
+        sl_points = getattr(signal_generator, 'sl_points', 0)
+        tp_points = getattr(signal_generator, 'tp_points', 0)
+        point = self.fill_properties.point
+        n = len(bars)
+
+        # Cada vela con condición (excepto la última) es una entrada candidata en la apertura de la siguiente
+        candidates = {}
+        for side, condition in (("BUY", buy_condition), ("SELL", sell_condition)):
+            signal_bars = np.flatnonzero(condition[:-1])
+            signals = np.full(len(signal_bars), side)
+            entry_idx, entry_price = self.FILL_SIMULATOR.fill_market_orders(bars, signal_bars, signals)
+
+            direction = 1.0 if side == "BUY" else -1.0
+            sl = entry_price - direction * sl_points * point if sl_points > 0 else np.zeros(len(signal_bars))
+            tp = entry_price + direction * tp_points * point if tp_points > 0 else np.zeros(len(signal_bars))
+            exit_idx, exit_price, exit_reason = self.FILL_SIMULATOR.resolve_exits(bars, entry_idx, signals, sl, tp)
+
+            candidates[side] = (signal_bars, entry_idx, entry_price, exit_idx, exit_price, exit_reason)
+
+        # Recorremos las señales aplicando la lógica de posiciones de la estrategia (con listas, para evitar
+        # el coste de acceder a escalares numpy en el bucle)
+        signal_bars = {side: candidates[side][0].tolist() for side in candidates}
+        entry_bars = {side: candidates[side][1].tolist() for side in candidates}
+        sl_tp_bars = {side: candidates[side][3].tolist() for side in candidates}
+
+        # Cada operación: (lado, candidata de entrada, tipo de salida, barra de salida, candidata contraria)
+        walked_trades = []
+        side = None
+        candidate = -1
+        next_bar = 0
+        while True:
+            if side is None:
+                # Sin posición: buscamos la siguiente vela con condición de entrada
+                next_buy = bisect.bisect_left(signal_bars["BUY"], next_bar)
+                next_sell = bisect.bisect_left(signal_bars["SELL"], next_bar)
+                buy_bar = signal_bars["BUY"][next_buy] if next_buy < len(signal_bars["BUY"]) else n
+                sell_bar = signal_bars["SELL"][next_sell] if next_sell < len(signal_bars["SELL"]) else n
+                if buy_bar == n and sell_bar == n:
+                    break
+                side, candidate = ("BUY", next_buy) if buy_bar < sell_bar else ("SELL", next_sell)
+
+            opposite = "SELL" if side == "BUY" else "BUY"
+
+            # Siguiente señal contraria a partir del cierre de la vela de entrada
+            next_opposite = bisect.bisect_left(signal_bars[opposite], entry_bars[side][candidate])
+            opposite_bar = signal_bars[opposite][next_opposite] if next_opposite < len(signal_bars[opposite]) else n
+            sl_tp_bar = sl_tp_bars[side][candidate]
+
+            if sl_tp_bar >= 0 and sl_tp_bar <= opposite_bar:
+                # Salida por SL/TP antes del cierre de la vela con señal contraria
+                walked_trades.append((side, candidate, "SLTP", sl_tp_bar, -1))
+                side = None
+                next_bar = sl_tp_bar
+
+            elif opposite_bar < n:
+                # Cierre por señal contraria: se cierra al mismo precio al que se abre la nueva posición
+                walked_trades.append((side, candidate, "SIGNAL", opposite_bar + 1, next_opposite))
+                side = opposite
+                candidate = next_opposite
+
+            else:
+                # La posición sigue abierta al final de los datos
+                walked_trades.append((side, candidate, "END", n - 1, -1))
+                break
+
+        # Construimos el resultado a partir de los índices recorridos
+        bar_times = bars.index.to_numpy()
+        last_close = bars['close'].to_numpy(dtype=float)[-1]
+        last_spread = self.FILL_SIMULATOR._get_spread(bars.iloc[-1:])[0]
+
+        rows = []
+        for side, candidate, exit_kind, exit_bar, opposite_candidate in walked_trades:
+            _, entry_idx, entry_price, _, sl_tp_price, sl_tp_reason = candidates[side]
+            if exit_kind == "SLTP":
+                exit_price, exit_reason = sl_tp_price[candidate], str(sl_tp_reason[candidate])
+            elif exit_kind == "SIGNAL":
+                exit_price, exit_reason = candidates["SELL" if side == "BUY" else "BUY"][2][opposite_candidate], "SIGNAL"
+            else:
+                exit_price, exit_reason = (last_close if side == "BUY" else last_close + last_spread), "END"
+            rows.append((symbol, side, bar_times[entry_idx[candidate]], entry_price[candidate], bar_times[exit_bar], exit_price, exit_reason, 0.0))
+
+        result = pd.DataFrame(rows, columns=columns)
+        direction = np.where(result['signal'] == "BUY", 1.0, -1.0)
+        result['pnl_points'] = (result['exit_price'] - result['entry_price']) * direction / point
+
+        Clock.advance_to(bars.index[-1])
+        print(f"{Utils.dateprint()} - BACKTEST: {type(signal_props).__name__} en {symbol} completado con {len(result)} operaciones")
+        return result
@@ -0,0 +1,432 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.backtester_properties import FillSimulatorProps
+from typing import Tuple
+import pandas as pd
+import numpy as np
+
+
+class FillSimulator():
+
+    # Tamaño de los bloques usados para buscar el primer toque de un precio
+    _BLOCK_SIZE = 64
+
+    def __init__(self, properties: FillSimulatorProps):
+        """
+        Initializes the FillSimulator object.
+
+        Args:
+            properties (FillSimulatorProps): The properties of the fill model.
+
+        Notes:
+            Bars are expected to be MT5 bars (bid prices) with the columns 'open', 'high', 'low', 'close'
+            and, optionally, 'spread' in points. The ask side is rebuilt as bid + spread.
+        """
+        self.point = properties.point
+        self.slippage = properties.slippage_points * properties.point
+        self.min_spread = properties.min_spread_points * properties.point
+
+    def _get_spread(self, bars: pd.DataFrame) -> np.ndarray:
+        """
+        Returns the spread of each bar in price units.
+
+        Args:
+            bars (pd.DataFrame): The bars, with an optional 'spread' column in points.
+
+        Returns:
+            np.ndarray: The spread of each bar in price units.
+        """
+        if 'spread' in bars.columns:
+            spread = bars['spread'].to_numpy(dtype=float) * self.point
+        else:
+            spread = np.zeros(len(bars))
+
+        return np.maximum(spread, self.min_spread)
+
+    def _get_price_arrays(self, bars: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns the bid high, bid low, ask high and ask low arrays of the given data.
+
+        Args:
+            bars (pd.DataFrame): Bars with 'high'/'low' columns, or ticks with 'bid'/'ask' columns.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: bid high, bid low, ask high and ask low.
+        """
+        # Datos de ticks: cada fila es un único precio bid y ask
+        if 'bid' in bars.columns and 'ask' in bars.columns:
+            bid = bars['bid'].to_numpy(dtype=float)
+            ask = bars['ask'].to_numpy(dtype=float)
+            return bid, bid, ask, ask
+
+        # Datos de velas: el ask se reconstruye sumando el spread al bid
+        spread = self._get_spread(bars)
+        high = bars['high'].to_numpy(dtype=float)
+        low = bars['low'].to_numpy(dtype=float)
+        return high, low, high + spread, low + spread
+
+    def _build_touch_index(self, values: np.ndarray, use_min: bool) -> Tuple[np.ndarray, list]:
+        """
+        Builds the index used to find the first bar where a price is touched.
+
+        The values are split in blocks of _BLOCK_SIZE bars and a sparse table of the block extremes is built,
+        so that the memory used stays close to the size of the series.
+
+        Args:
+            values (np.ndarray): The price series (lows if use_min, highs otherwise).
+            use_min (bool): True to look for values <= threshold, False for values >= threshold.
+
+        Returns:
+            Tuple[np.ndarray, list]: The padded blocks of values and the sparse table of block extremes.
+        """
+        pad = np.inf if use_min else -np.inf
+        reduce = np.minimum if use_min else np.maximum
+
+        # Rellenamos hasta un múltiplo del tamaño del bloque con valores que nunca tocan
+        n_blocks = max(1, -(-len(values) // self._BLOCK_SIZE))
+        padded = np.full(n_blocks * self._BLOCK_SIZE, pad)
+        padded[:len(values)] = values
+        blocks = padded.reshape(n_blocks, self._BLOCK_SIZE)
+
+        # Sparse table: el nivel k contiene el extremo de los bloques [i, i + 2^k)
+        table = [blocks.min(axis=1) if use_min else blocks.max(axis=1)]
+        step = 1
+        while step < n_blocks:
+            shifted = np.full(n_blocks, pad)
+            shifted[:n_blocks - step] = table[-1][step:]
+            table.append(reduce(table[-1], shifted))
+            step *= 2
+
+        return padded, table
+
+    def _first_touch(self, touch_index: Tuple[np.ndarray, list], n: int, start: np.ndarray, thresholds: np.ndarray, use_min: bool) -> np.ndarray:
+        """
+        Finds, for every order at once, the first index >= start where the threshold is touched.
+
+        Args:
+            touch_index (Tuple[np.ndarray, list]): The index built by _build_touch_index.
+            n (int): The length of the original series.
+            start (np.ndarray): The first index to look at for each order.
+            thresholds (np.ndarray): The price to be touched for each order.
+            use_min (bool): True to look for values <= threshold, False for values >= threshold.
+
+        Returns:
+            np.ndarray: The index of the first touch for each order, or -1 if it is never touched.
+        """
+        padded, table = touch_index
+        size = self._BLOCK_SIZE
+        n_blocks = len(table[0])
+        start = np.asarray(start, dtype=np.int64)
+        thresholds = np.asarray(thresholds, dtype=float)
+
+        if len(start) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        def touched(values: np.ndarray, thr: np.ndarray) -> np.ndarray:
+            return values <= thr if use_min else values >= thr
+
+        offsets = np.arange(size)
+
+        # 1) Buscamos dentro del bloque donde empieza cada orden
+        start_block = np.minimum(start // size, n_blocks - 1)
+        window_idx = start_block[:, None] * size + offsets
+        window_mask = touched(padded[window_idx], thresholds[:, None]) & (window_idx >= start[:, None])
+        found_in_start_block = window_mask.any(axis=1)
+        first_in_start_block = window_idx[np.arange(len(start)), window_mask.argmax(axis=1)]
+
+        # 2) Binary lifting sobre la sparse table para saltar bloques completos sin toque
+        block = start_block + 1
+        for level in range(len(table) - 1, -1, -1):
+            valid = block < n_blocks
+            extreme = table[level][np.minimum(block, n_blocks - 1)]
+            no_touch = extreme > thresholds if use_min else extreme < thresholds
+            block = np.where(valid & no_touch, block + (1 << level), block)
+
+        # 3) Buscamos dentro del primer bloque que contiene un toque
+        found_block = block < n_blocks
+        block_idx = np.minimum(block, n_blocks - 1)[:, None] * size + offsets
+        block_mask = touched(padded[block_idx], thresholds[:, None])
+        first_in_block = block_idx[np.arange(len(start)), block_mask.argmax(axis=1)]
+
+        result = np.where(found_in_start_block, first_in_start_block, np.where(found_block, first_in_block, -1))
+        return np.where((result >= 0) & (result < n) & (start < n), result, -1)
+
+    def fill_market_orders(self, bars: pd.DataFrame, bar_idx: np.ndarray, signals: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fills a batch of market orders at the open of the bar following the signal bar.
+
+        BUY orders are filled at the ask (open + spread) and SELL orders at the bid, both with slippage against us.
+
+        Args:
+            bars (pd.DataFrame): The bars of the symbol.
+            bar_idx (np.ndarray): The index of the bar whose close generated each order.
+            signals (np.ndarray): The signal of each order ("BUY" or "SELL").
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The fill bar index (-1 if there is no next bar) and the fill price.
+        """
+        n = len(bars)
+        is_buy = np.asarray(signals) == "BUY"
+        fill_idx = np.asarray(bar_idx, dtype=np.int64) + 1
+        safe_idx = np.minimum(fill_idx, n - 1)
+
+        open_bid = bars['open'].to_numpy(dtype=float)[safe_idx]
+        spread = self._get_spread(bars)[safe_idx]
+        fill_price = np.where(is_buy, open_bid + spread + self.slippage, open_bid - self.slippage)
+
+        fill_idx = np.where(fill_idx < n, fill_idx, -1)
+        return fill_idx, np.where(fill_idx >= 0, fill_price, np.nan)
+
+    def fill_pending_orders(self, bars: pd.DataFrame, bar_idx: np.ndarray, signals: np.ndarray,
+                            target_orders: np.ndarray, target_prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fills a batch of pending LIMIT and STOP orders, as placed by OrderExecutor._send_pending_order.
+
+        Orders become active from the bar following the signal bar. BUY orders trigger on the ask and SELL orders on the bid.
+        LIMIT orders are filled at the target price (or better on a gap) and STOP orders at the target price
+        (or worse on a gap) plus slippage.
+
+        Args:
+            bars (pd.DataFrame): The bars of the symbol.
+            bar_idx (np.ndarray): The index of the bar whose close generated each order.
+            signals (np.ndarray): The signal of each order ("BUY" or "SELL").
+            target_orders (np.ndarray): The type of each order ("LIMIT" or "STOP").
+            target_prices (np.ndarray): The price of each pending order.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The fill bar index (-1 if never filled) and the fill price.
+        """
+        n = len(bars)
+        signals = np.asarray(signals)
+        target_orders = np.asarray(target_orders)
+        target_prices = np.asarray(target_prices, dtype=float)
+        start = np.asarray(bar_idx, dtype=np.int64) + 1
+
+        bid_high, bid_low, ask_high, ask_low = self._get_price_arrays(bars)
+        open_bid = bars['open'].to_numpy(dtype=float)
+        open_ask = open_bid + self._get_spread(bars)
+
+        fill_idx = np.full(len(start), -1, dtype=np.int64)
+        fill_price = np.full(len(start), np.nan)
+
+        is_buy = signals == "BUY"
+        is_limit = target_orders == "LIMIT"
+        is_stop = target_orders == "STOP"
+
+        # (máscara, serie que activa la orden, busca mínimos, precio de apertura, es stop)
+        groups = [
+            (is_buy & is_limit, ask_low, True, open_ask, False),
+            (is_buy & is_stop, ask_high, False, open_ask, True),
+            (~is_buy & is_limit, bid_high, False, open_bid, False),
+            (~is_buy & is_stop, bid_low, True, open_bid, True),
+        ]
+
+        for mask, series, use_min, open_price, is_stop_order in groups:
+            if not mask.any():
+                continue
+
+            idx = self._first_touch(self._build_touch_index(series, use_min), n, start[mask], target_prices[mask], use_min)
+            filled = idx >= 0
+            gap_open = open_price[np.maximum(idx, 0)]
+            target = target_prices[mask]
+
+            # Si la vela abre más allá del precio objetivo, la orden se llena en la apertura
+            if use_min:
+                price = np.minimum(target, gap_open)
+            else:
+                price = np.maximum(target, gap_open)
+
+            if is_stop_order:
+                price = price - self.slippage if use_min else price + self.slippage
+
+            fill_idx[mask] = idx
+            fill_price[mask] = np.where(filled, price, np.nan)
+
+        return fill_idx, fill_price
+
+    def resolve_exits(self, bars: pd.DataFrame, entry_idx: np.ndarray, signals: np.ndarray, sl: np.ndarray, tp: np.ndarray,
+                      refine_data: pd.DataFrame | None = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Resolves, for a batch of positions, the bar and price where the SL or TP is hit.
+
+        Long positions close on the bid and short positions on the ask. If both SL and TP are touched inside the
+        same bar, the SL is assumed to be hit first (pessimistic rule) unless refine_data allows to find the real order.
+
+        Args:
+            bars (pd.DataFrame): The bars of the symbol, indexed by time.
+            entry_idx (np.ndarray): The bar where each position was opened (it is included in the search).
+            signals (np.ndarray): The direction of each position ("BUY" or "SELL").
+            sl (np.ndarray): The stop loss of each position (0 if none).
+            tp (np.ndarray): The take profit of each position (0 if none).
+            refine_data (pd.DataFrame | None): Optional M1 bars or ticks (with 'bid'/'ask' columns), indexed by time,
+                used to resolve the bars where both SL and TP are touched.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The exit bar index (-1 if still open), the exit price
+            and the exit reason ("SL", "TP" or "" if still open).
+        """
+        n = len(bars)
+        entry_idx = np.asarray(entry_idx, dtype=np.int64)
+        is_buy = np.asarray(signals) == "BUY"
+        sl = np.asarray(sl, dtype=float)
+        tp = np.asarray(tp, dtype=float)
+
+        sl_idx, tp_idx = self._find_sl_tp_touches(bars, entry_idx, is_buy, sl, tp)
+
+        # Si ambos se tocan en la misma vela, por defecto asumimos que salta antes el SL
+        sl_first = (sl_idx >= 0) & ((tp_idx < 0) | (sl_idx <= tp_idx))
+        both_same_bar = (sl_idx >= 0) & (sl_idx == tp_idx)
+
+        if refine_data is not None and both_same_bar.any():
+            sl_first[both_same_bar] = self._refine_sl_first(bars, refine_data, sl_idx[both_same_bar],
+                                                            is_buy[both_same_bar], sl[both_same_bar], tp[both_same_bar])
+
+        exit_idx = np.where(sl_first, sl_idx, tp_idx)
+        exit_reason = np.where(exit_idx < 0, "", np.where(sl_first, "SL", "TP"))
+
+        # Precio de salida: si la vela abre más allá del nivel (gap), la salida se produce en la apertura
+        safe_idx = np.maximum(exit_idx, 0)
+        open_bid = bars['open'].to_numpy(dtype=float)[safe_idx]
+        open_ask = open_bid + self._get_spread(bars)[safe_idx]
+        gapped = exit_idx > entry_idx
+
+        long_sl = np.where(gapped, np.minimum(sl, open_bid), sl) - self.slippage
+        long_tp = np.where(gapped, np.maximum(tp, open_bid), tp)
+        short_sl = np.where(gapped, np.maximum(sl, open_ask), sl) + self.slippage
+        short_tp = np.where(gapped, np.minimum(tp, open_ask), tp)
+
+        exit_price = np.where(is_buy, np.where(sl_first, long_sl, long_tp), np.where(sl_first, short_sl, short_tp))
+        exit_price = np.where(exit_idx >= 0, exit_price, np.nan)
+
+        return exit_idx, exit_price, exit_reason
+
+    def _find_sl_tp_touches(self, data: pd.DataFrame, start: np.ndarray, is_buy: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the first index >= start where the SL and the TP of each position are touched.
+
+        Args:
+            data (pd.DataFrame): Bars or ticks of the symbol.
+            start (np.ndarray): The first index to look at for each position.
+            is_buy (np.ndarray): True for long positions, False for short positions.
+            sl (np.ndarray): The stop loss of each position (0 if none).
+            tp (np.ndarray): The take profit of each position (0 if none).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The first SL touch and the first TP touch (-1 if never touched).
+        """
+        n = len(data)
+        bid_high, bid_low, ask_high, ask_low = self._get_price_arrays(data)
+
+        # Los niveles a 0 se sustituyen por precios que nunca se tocan
+        sl_idx = np.full(len(start), -1, dtype=np.int64)
+        tp_idx = np.full(len(start), -1, dtype=np.int64)
+
+        # Largos: SL sobre el bid low, TP sobre el bid high. Cortos: SL sobre el ask high, TP sobre el ask low
+        searches = [
+            (sl_idx, is_buy, bid_low, True, np.where(sl > 0, sl, -np.inf)),
+            (tp_idx, is_buy, bid_high, False, np.where(tp > 0, tp, np.inf)),
+            (sl_idx, ~is_buy, ask_high, False, np.where(sl > 0, sl, np.inf)),
+            (tp_idx, ~is_buy, ask_low, True, np.where(tp > 0, tp, -np.inf)),
+        ]
+
+        for output, mask, series, use_min, thresholds in searches:
+            if mask.any():
+                output[mask] = self._first_touch(self._build_touch_index(series, use_min), n, start[mask], thresholds[mask], use_min)
+
+        return sl_idx, tp_idx
+
+    def _refine_sl_first(self, bars: pd.DataFrame, refine_data: pd.DataFrame, bar_idx: np.ndarray, is_buy: np.ndarray, sl: np.ndarray, tp: np.ndarray) -> np.ndarray:
+        """
+        Decides whether the SL or the TP was hit first inside the given bars using lower timeframe data.
+
+        Args:
+            bars (pd.DataFrame): The bars of the symbol, indexed by time.
+            refine_data (pd.DataFrame): M1 bars or ticks, indexed by time.
+            bar_idx (np.ndarray): The bars where both SL and TP are touched.
+            is_buy (np.ndarray): True for long positions, False for short positions.
+            sl (np.ndarray): The stop loss of each position.
+            tp (np.ndarray): The take profit of each position.
+
+        Returns:
+            np.ndarray: True where the SL was hit first (or the order can not be resolved), False otherwise.
+        """
+        bar_times = bars.index.to_numpy()
+        refine_times = refine_data.index.to_numpy()
+
+        # Ventana de datos de menor timeframe que corresponde a cada vela
+        window_start = np.searchsorted(refine_times, bar_times[bar_idx], side='left')
+        next_bar_idx = bar_idx + 1
+        window_end = np.where(next_bar_idx < len(bars),
+                              np.searchsorted(refine_times, bar_times[np.minimum(next_bar_idx, len(bars) - 1)], side='left'),
+                              len(refine_times))
+
+        sl_idx, tp_idx = self._find_sl_tp_touches(refine_data, window_start, is_buy, sl, tp)
+        sl_in_window = (sl_idx >= 0) & (sl_idx < window_end)
+        tp_in_window = (tp_idx >= 0) & (tp_idx < window_end)
+
+        # Empate dentro de la misma vela de menor timeframe o datos insuficientes: regla pesimista
+        tp_first = tp_in_window & (~sl_in_window | (tp_idx < sl_idx))
+        return ~tp_first
+
+    def simulate_orders(self, bars: pd.DataFrame, orders: pd.DataFrame, refine_data: pd.DataFrame | None = None) -> pd.DataFrame:
+        """
+        Simulates the full life of a batch of orders: entry fill and exit through SL, TP or end of data.
+
+        Args:
+            bars (pd.DataFrame): The bars of the symbol, indexed by time.
+            orders (pd.DataFrame): One row per order with the columns 'bar_idx' (bar whose close generated the order),
+                'signal', 'target_order', 'target_price', 'sl' and 'tp'. Extra columns are kept in the result.
+            refine_data (pd.DataFrame | None): Optional M1 bars or ticks used to resolve intrabar SL/TP ambiguity.
+
+        Returns:
+            pd.DataFrame: One row per filled order with the original columns plus 'entry_idx', 'entry_time',
+            'entry_price', 'exit_idx', 'exit_time', 'exit_price' and 'exit_reason' ("SL", "TP" or "END").
+        """
+        n = len(bars)
+        trades = orders.reset_index(drop=True).copy()
+        bar_idx = trades['bar_idx'].to_numpy(dtype=np.int64)
+        signals = trades['signal'].to_numpy()
+        target_orders = trades['target_order'].to_numpy()
+
+        # Entradas: órdenes a mercado y órdenes pendientes
+        entry_idx = np.full(len(trades), -1, dtype=np.int64)
+        entry_price = np.full(len(trades), np.nan)
+
+        is_market = target_orders == "MARKET"
+        if is_market.any():
+            entry_idx[is_market], entry_price[is_market] = self.fill_market_orders(bars, bar_idx[is_market], signals[is_market])
+
+        if (~is_market).any():
+            entry_idx[~is_market], entry_price[~is_market] = self.fill_pending_orders(bars, bar_idx[~is_market], signals[~is_market],
+                                                                                      target_orders[~is_market],
+                                                                                      trades['target_price'].to_numpy(dtype=float)[~is_market])
+
+        # Nos quedamos solo con las órdenes que se han llenado
+        filled = entry_idx >= 0
+        trades = trades[filled].reset_index(drop=True)
+        entry_idx = entry_idx[filled]
+        entry_price = entry_price[filled]
+        signals = signals[filled]
+
+        # Salidas por SL o TP
+        exit_idx, exit_price, exit_reason = self.resolve_exits(bars, entry_idx, signals, trades['sl'].to_numpy(dtype=float),
+                                                               trades['tp'].to_numpy(dtype=float), refine_data)
+
+        # Las posiciones que siguen abiertas se cierran al cierre de la última vela
+        still_open = exit_idx < 0
+        last_close_bid = bars['close'].to_numpy(dtype=float)[-1]
+        last_close_ask = last_close_bid + self._get_spread(bars)[-1]
+        exit_price = np.where(still_open, np.where(signals == "BUY", last_close_bid, last_close_ask), exit_price)
+        exit_reason = np.where(still_open, "END", exit_reason)
+        exit_idx = np.where(still_open, n - 1, exit_idx)
+
+        bar_times = bars.index.to_numpy()
+        trades['entry_idx'] = entry_idx
+        trades['entry_time'] = bar_times[entry_idx]
+        trades['entry_price'] = entry_price
+        trades['exit_idx'] = exit_idx
+        trades['exit_time'] = bar_times[exit_idx]
+        trades['exit_price'] = exit_price
+        trades['exit_reason'] = exit_reason
+
+        return trades
@@ -0,0 +1,349 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .backtester import Backtester
+from .result_cache import BacktestResultCache
+from .properties.backtester_properties import FillSimulatorProps, PortfolioBacktestProps, PortfolioSymbolProps
+from signal_generator.properties.signal_generator_properties import BaseSignalProps
+from performance.performance_metrics import PerformanceMetrics
+from performance.properties.performance_properties import PerformanceMetricsProps
+from events.events import ExecutionEvent, SignalType
+from clock.clock import Clock
+from clock.properties.clock_properties import SimulatedClockProps
+from utils.utils import Utils
+from datetime import timedelta
+from typing import Dict, List
+import pandas as pd
+import numpy as np
+
+
+class PortfolioBacktester():
+
+    def __init__(self, properties: PortfolioBacktestProps, result_cache: BacktestResultCache | None = None,
+                 metrics_properties: PerformanceMetricsProps | None = None):
+        """
+        Initializes the PortfolioBacktester object.
+
+        Args:
+            properties (PortfolioBacktestProps): The properties of the simulated account.
+            result_cache (BacktestResultCache | None): The optional cache used for the backtest of each symbol.
+            metrics_properties (PerformanceMetricsProps | None): The properties of the performance metrics. If None, the
+                ratios are computed over the whole backtest and annualized with 252 days of the bar timeframe.
+        """
+        self.account_currency = properties.account_currency.upper()
+        self.initial_balance = properties.initial_balance
+        self.account_leverage = properties.account_leverage
+        self.max_leverage_factor = properties.max_leverage_factor
+        self.volume = properties.volume
+        self.slippage_points = properties.slippage_points
+        self.RESULT_CACHE = result_cache
+        self.metrics_properties = metrics_properties
+
+    def _align_closes(self, bars: pd.DataFrame, timeline: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Aligns the close prices of some bars to the common timeline, carrying the last known price forward. The points
+        before the first bar are left as NaN (they are never filled with later prices, which would be look-ahead).
+
+        Args:
+            bars (pd.DataFrame): The bars, indexed by time.
+            timeline (pd.DatetimeIndex): The common timeline.
+
+        Returns:
+            np.ndarray: The close price at each point of the timeline (NaN before the first bar).
+        """
+        return bars['close'].reindex(timeline, method='ffill').to_numpy(dtype=float)
+
+    def _build_conversion_matrix(self, symbols: List[PortfolioSymbolProps], bars: Dict[str, pd.DataFrame],
+                                 fx_bars: Dict[str, pd.DataFrame], timeline: pd.DatetimeIndex) -> np.ndarray:
+        """
+        Builds the matrix of historical factors that convert one unit of each symbol's profit currency into the account currency.
+
+        Args:
+            symbols (List[PortfolioSymbolProps]): The symbols of the portfolio.
+            bars (Dict[str, pd.DataFrame]): The bars of the traded symbols.
+            fx_bars (Dict[str, pd.DataFrame]): Extra bars of the FX symbols needed only for the conversion.
+            timeline (pd.DatetimeIndex): The common timeline.
+
+        Returns:
+            np.ndarray: A (timeline, symbols) matrix of conversion factors (NaN before the first bar of the FX symbol).
+
+        Raises:
+            Exception: If the bars of a needed FX symbol are not available.
+        """
+        conversion = np.ones((len(timeline), len(symbols)))
+        aligned_fx: Dict[str, np.ndarray] = {}
+
+        for column, symbol_props in enumerate(symbols):
+            profit_ccy = symbol_props.currency_profit.upper()
+            if profit_ccy == self.account_currency:
+                continue
+
+            # Mismo símbolo de conversión que usa Utils en vivo, pero con sus precios históricos
+            fx_symbol = Utils.get_conversion_fx_symbol(profit_ccy, self.account_currency)
+            if fx_symbol not in aligned_fx:
+                fx_data = fx_bars.get(fx_symbol, bars.get(fx_symbol))
+                if fx_data is None:
+                    raise Exception(f"ERROR: Faltan los datos históricos de {fx_symbol} para convertir {profit_ccy} a {self.account_currency}")
+                aligned_fx[fx_symbol] = self._align_closes(fx_data, timeline)
+
+            conversion[:, column] = Utils.convert_currency_amount_with_fx_price(1.0, aligned_fx[fx_symbol], fx_symbol, self.account_currency)
+
+        return conversion
+
+    def run(self, signal_props: BaseSignalProps, bars: Dict[str, pd.DataFrame], symbols: List[PortfolioSymbolProps],
+            timeframe: str, fx_bars: Dict[str, pd.DataFrame] | None = None) -> Dict[str, object]:
+        """
+        Runs a strategy over several symbols stepping on one aligned timeline with a single shared account.
+
+        The signals, fills and exits of each symbol are simulated by Backtester. Then every entry is checked, in time
+        order, against the margin and the leverage factor of the whole account, valued with historical cross rates.
+        Each check is a vector operation across all symbols. Each symbol starts at its first real bar: before it, the
+        symbol (and any cross rate) has no price, and an entry that cannot be converted to the account currency is
+        rejected.
+
+        Limitation: the trades are replayed from the independent backtest of each symbol, the signals are not stepped
+        on the shared timeline. An entry rejected by the account checks is not signalled again while the symbol
+        backtest keeps that trade open, whereas the live TradingDirector would re-evaluate the signal on the next bars.
+        With frequent rejections the results are therefore more conservative than the live behaviour.
+
+        Args:
+            signal_props (BaseSignalProps): The properties of the strategy, shared by all symbols.
+            bars (Dict[str, pd.DataFrame]): The historical bars of each traded symbol, indexed by time.
+            symbols (List[PortfolioSymbolProps]): The contract specification of each traded symbol.
+            timeframe (str): The timeframe of the bars.
+            fx_bars (Dict[str, pd.DataFrame] | None): Bars of extra FX symbols needed for the currency conversion.
+
+        Returns:
+            Dict[str, object]: A dictionary with:
+                - "trades" (pd.DataFrame): All the trades, with the columns 'accepted', 'rejection_reason' and 'pnl_account_ccy'.
+                - "equity" (pd.Series): The equity of the account along the timeline.
+                - "summary" (Dict[str, float]): Portfolio-level results (the PerformanceMetrics of the account, plus the
+                  final equity, the total return and the accepted and rejected trades).
+        """
+        fx_bars = fx_bars if fx_bars is not None else {}
+
+        # El backtest corre sobre el tiempo simulado del timeline común, no sobre la hora real
+        start_time = min((bars[s.symbol].index[0] for s in symbols if not bars[s.symbol].empty), default=None)
+        if start_time is None:
+            return self._run(signal_props, bars, symbols, timeframe, fx_bars)
+        with Clock.simulated(SimulatedClockProps(start_time=start_time)):
+            return self._run(signal_props, bars, symbols, timeframe, fx_bars)
+
+    def _run(self, signal_props: BaseSignalProps, bars: Dict[str, pd.DataFrame], symbols: List[PortfolioSymbolProps],
+             timeframe: str, fx_bars: Dict[str, pd.DataFrame]) -> Dict[str, object]:
+        """
+        Runs the portfolio backtest (see run), with the simulated clock already installed.
+        """
+        num_symbols = len(symbols)
+
+        # 1) Operaciones candidatas de cada símbolo
+        symbol_trades = []
+        for symbol_props in symbols:
+            backtester = Backtester(FillSimulatorProps(point=symbol_props.point, slippage_points=self.slippage_points), self.RESULT_CACHE)
+            symbol_trades.append(backtester.run(signal_props, bars[symbol_props.symbol], symbol_props.symbol, timeframe))
+
+        # 2) Timeline común y matrices (timeline, símbolos) de precios y de conversión a la divisa de la cuenta
+        timeline = pd.DatetimeIndex(np.unique(np.concatenate([bars[s.symbol].index.to_numpy() for s in symbols])))
+        prices = np.column_stack([self._align_closes(bars[s.symbol], timeline) for s in symbols])
+        conversion = self._build_conversion_matrix(symbols, bars, fx_bars, timeline)
+
+        trades = pd.concat(symbol_trades, ignore_index=True)
+        num_trades = len(trades)
+        column = np.concatenate([np.full(len(t), i) for i, t in enumerate(symbol_trades)]).astype(np.int64)
+        direction = np.where(trades['signal'].to_numpy() == "BUY", 1.0, -1.0)
+        units = self.volume * np.array([s.trade_contract_size for s in symbols])[column]
+        entry_price = trades['entry_price'].to_numpy(dtype=float)
+        exit_price = trades['exit_price'].to_numpy(dtype=float)
+        entry_t = timeline.searchsorted(pd.DatetimeIndex(trades['entry_time']))
+        exit_t = timeline.searchsorted(pd.DatetimeIndex(trades['exit_time']))
+
+        # 3) Recorremos entradas y salidas en orden temporal. En la misma vela van primero las salidas de operaciones
+        #    abiertas antes, luego las entradas y por último las salidas de operaciones abiertas en esa misma vela
+        event_time = np.concatenate([exit_t, entry_t])
+        event_is_entry = np.concatenate([np.zeros(num_trades, dtype=bool), np.ones(num_trades, dtype=bool)])
+        event_priority = np.concatenate([np.where(exit_t > entry_t, 0, 2), np.ones(num_trades, dtype=np.int64)])
+        event_trade = np.concatenate([np.arange(num_trades), np.arange(num_trades)])
+        order = np.lexsort((event_trade, event_priority, event_time))
+
+        # Valor de una unidad de cada símbolo en la divisa de la cuenta a lo largo del timeline. Antes de la primera vela
+        # de un símbolo no hay precio: como no puede haber unidades abiertas, su valor cuenta como 0
+        unit_values = np.nan_to_num(prices * conversion)
+        valued_conversion = np.nan_to_num(conversion)
+
+        balance = self.initial_balance
+        net_units = np.zeros(num_symbols)      # Unidades netas con signo por símbolo
+        cost = np.zeros(num_symbols)           # Unidades con signo por precio de entrada (divisa de profit)
+        gross_units = np.zeros(num_symbols)    # Unidades brutas por símbolo (para el margen)
+        rejection_reason = np.full(num_trades, "", dtype=object)
+        pnl = np.full(num_trades, np.nan)
+
+        # Escalares por operación como listas, para no pagar el acceso a escalares numpy en el bucle
+        signed_units_list = (direction * units).tolist()
+        units_list = units.tolist()
+        column_list = column.tolist()
+        entry_price_list = entry_price.tolist()
+        entry_t_list = entry_t.tolist()
+        exit_value_list = ((exit_price - entry_price) * conversion[exit_t, column]).tolist()
+        accepted_list = [False] * num_trades
+
+        for k, is_entry in zip(event_trade[order].tolist(), event_is_entry[order].tolist()):
+            s = column_list[k]
+            signed_units = signed_units_list[k]
+
+            if not is_entry:
+                if accepted_list[k]:
+                    pnl[k] = signed_units * exit_value_list[k]
+                    balance += pnl[k]
+                    net_units[s] -= signed_units
+                    cost[s] -= signed_units * entry_price_list[k]
+                    gross_units[s] -= units_list[k]
+                continue
+
+            # Valoración de la cuenta en el momento de la entrada, vectorizada sobre todos los símbolos
+            t = entry_t_list[k]
+            open_value = np.dot(net_units, unit_values[t])
+            equity = balance + open_value - np.dot(cost, valued_conversion[t])
+            new_value = signed_units * entry_price_list[k] * conversion[t, s]
+            account_value = open_value + new_value
+            required_margin = (np.dot(gross_units, unit_values[t]) + abs(new_value)) / self.account_leverage
+
+            # Mismos criterios que MaxLeverageFactorRiskManager, más el control de margen del broker
+            if np.isnan(new_value):
+                # Aún no hay precio del símbolo de conversión: la entrada no se puede valorar
+                rejection_reason[k] = "NO_FX_RATE"
+            elif equity <= 0 or abs(account_value) / equity > self.max_leverage_factor:
+                rejection_reason[k] = "LEVERAGE"
+            elif required_margin > equity:
+                rejection_reason[k] = "MARGIN"
+            else:
+                accepted_list[k] = True
+                net_units[s] += signed_units
+                cost[s] += signed_units * entry_price_list[k]
+                gross_units[s] += units_list[k]
+
+        accepted = np.array(accepted_list, dtype=bool)
+
+        # 4) Curva de equity de la cuenta, calculada de una vez sobre todo el timeline
+        equity_curve = self._compute_equity_curve(len(timeline), num_symbols, prices, conversion, column[accepted],
+                                                  direction[accepted] * units[accepted], entry_price[accepted],
+                                                  entry_t[accepted], exit_t[accepted], pnl[accepted])
+
+        trades['accepted'] = accepted
+        trades['rejection_reason'] = rejection_reason
+        trades['pnl_account_ccy'] = pnl
+
+        # 5) Métricas: la curva de equity y las ejecuciones pasan por el mismo PerformanceMetrics que en vivo
+        equity_series = pd.Series(equity_curve, index=timeline, name='equity')
+        execution_events = self._build_execution_events(trades, event_trade[order], event_is_entry[order], accepted, pnl)
+        metrics = PerformanceMetrics(self._get_metrics_properties(len(timeline), timeframe))
+        metrics.replay(execution_events, equity_series)
+
+        summary = metrics.get_metrics()
+        summary["final_equity"] = float(equity_curve[-1]) if len(equity_curve) > 0 else self.initial_balance
+        summary["total_return"] = summary["final_equity"] / self.initial_balance - 1.0
+        summary["accepted_trades"] = int(accepted.sum())
+        summary["rejected_trades"] = num_trades - int(accepted.sum())
+
+        Clock.advance_to(timeline[-1])
+        print(f"{Utils.dateprint()} - BACKTEST PORTFOLIO: {num_symbols} símbolos, {int(accepted.sum())} operaciones aceptadas, equity final {summary['final_equity']:.2f} {self.account_currency}")
+
+        return {"trades": trades, "equity": equity_series, "summary": summary}
+
+    def _get_metrics_properties(self, num_times: int, timeframe: str) -> PerformanceMetricsProps:
+        """
+        Returns the properties of the performance metrics: the configured ones, or a window over the whole backtest.
+
+        Args:
+            num_times (int): The length of the timeline.
+            timeframe (str): The timeframe of the bars.
+
+        Returns:
+            PerformanceMetricsProps: The properties of the performance metrics.
+        """
+        if self.metrics_properties is not None:
+            return self.metrics_properties
+        return PerformanceMetricsProps(rolling_window=max(num_times, 2),
+                                       periods_per_year=252 * (timedelta(days=1) / Utils.get_timeframe_timedelta(timeframe)))
+
+    def _build_execution_events(self, trades: pd.DataFrame, event_trade: np.ndarray, event_is_entry: np.ndarray,
+                                accepted: np.ndarray, pnl: np.ndarray) -> List[ExecutionEvent]:
+        """
+        Builds the entry and exit executions of the accepted trades, in the order they were applied to the account.
+
+        Args:
+            trades (pd.DataFrame): The trades.
+            event_trade (np.ndarray): The trade of each entry and exit, in time order.
+            event_is_entry (np.ndarray): True if the entry or exit is an entry.
+            accepted (np.ndarray): True for the accepted trades.
+            pnl (np.ndarray): The realized profit of each trade in the account currency.
+
+        Returns:
+            List[ExecutionEvent]: The execution events, sorted by fill time.
+        """
+        symbols = trades['symbol'].tolist()
+        signals = trades['signal'].tolist()
+        entry_times = trades['entry_time'].tolist()
+        exit_times = trades['exit_time'].tolist()
+        entry_prices = trades['entry_price'].tolist()
+        exit_prices = trades['exit_price'].tolist()
+        accepted_list = accepted.tolist()
+        pnl_list = pnl.tolist()
+
+        execution_events = []
+        for k, is_entry in zip(event_trade.tolist(), event_is_entry.tolist()):
+            if not accepted_list[k]:
+                continue
+            is_buy = signals[k] == "BUY"
+            if is_entry:
+                execution_events.append(ExecutionEvent(symbol=symbols[k],
+                                                       signal=SignalType.BUY if is_buy else SignalType.SELL,
+                                                       fill_price=entry_prices[k],
+                                                       fill_time=entry_times[k],
+                                                       volume=self.volume))
+            else:
+                execution_events.append(ExecutionEvent(symbol=symbols[k],
+                                                       signal=SignalType.SELL if is_buy else SignalType.BUY,
+                                                       fill_price=exit_prices[k],
+                                                       fill_time=exit_times[k],
+                                                       volume=self.volume,
+                                                       closes_position=True,
+                                                       profit=pnl_list[k]))
+        return execution_events
+
+    def _compute_equity_curve(self, num_times: int, num_symbols: int, prices: np.ndarray, conversion: np.ndarray, column: np.ndarray,
+                              signed_units: np.ndarray, entry_price: np.ndarray, entry_t: np.ndarray, exit_t: np.ndarray, pnl: np.ndarray) -> np.ndarray:
+        """
+        Computes the equity of the account at every point of the timeline from the accepted trades.
+
+        Args:
+            num_times (int): The length of the timeline.
+            num_symbols (int): The number of symbols.
+            prices (np.ndarray): The (timeline, symbols) matrix of close prices.
+            conversion (np.ndarray): The (timeline, symbols) matrix of conversion factors.
+            column (np.ndarray): The symbol column of each trade.
+            signed_units (np.ndarray): The signed units of each trade.
+            entry_price (np.ndarray): The entry price of each trade.
+            entry_t (np.ndarray): The timeline index of the entry of each trade.
+            exit_t (np.ndarray): The timeline index of the exit of each trade.
+            pnl (np.ndarray): The realized profit of each trade in the account currency.
+
+        Returns:
+            np.ndarray: The equity at every point of the timeline.
+        """
+        # Beneficio realizado acumulado
+        realized = np.zeros(num_times)
+        np.add.at(realized, exit_t, pnl)
+
+        # Unidades abiertas y coste de entrada por símbolo a lo largo del timeline
+        delta_units = np.zeros((num_times, num_symbols))
+        delta_cost = np.zeros((num_times, num_symbols))
+        np.add.at(delta_units, (entry_t, column), signed_units)
+        np.add.at(delta_units, (exit_t, column), -signed_units)
+        np.add.at(delta_cost, (entry_t, column), signed_units * entry_price)
+        np.add.at(delta_cost, (exit_t, column), -signed_units * entry_price)
+
+        open_units = np.cumsum(delta_units, axis=0)
+        open_cost = np.cumsum(delta_cost, axis=0)
+        # Sin unidades abiertas el término es 0 aunque aún no haya precio (NaN antes de la primera vela)
+        unrealized = np.nan_to_num((open_units * np.nan_to_num(prices) - open_cost) * conversion).sum(axis=1)
+
+        return self.initial_balance + np.cumsum(realized) + unrealized
@@ -0,0 +1,61 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class FillSimulatorProps(BaseModel):
+    """
+    Properties for the simulated fill model.
+
+    Attributes:
+        point (float): The point size of the symbol (the unit used by the bar 'spread' column).
+        slippage_points (float): The slippage, in points, applied against us on market and stop fills.
+        min_spread_points (float): The minimum spread, in points, used when the bar spread is lower or missing.
+    """
+    point: float
+    slippage_points: float = 0.0
+    min_spread_points: float = 0.0
+
+class ResultCacheProps(BaseModel):
+    """
+    Properties for the on-disk cache of backtest results.
+
+    Attributes:
+        cache_dir (str): The directory where the results are stored.
+        max_size_mb (float): The maximum size of the cache in MB. The least recently used results are evicted first.
+    """
+    cache_dir: str
+    max_size_mb: float = 512.0
+
+class PortfolioSymbolProps(BaseModel):
+    """
+    Contract specification of a symbol traded in a portfolio backtest (the same fields MT5 returns in symbol_info).
+
+    Attributes:
+        symbol (str): The symbol.
+        point (float): The point size of the symbol.
+        trade_contract_size (float): The number of units of one lot.
+        currency_profit (str): The currency in which the profit of the symbol is computed.
+    """
+    symbol: str
+    point: float
+    trade_contract_size: float = 100000.0
+    currency_profit: str
+
+class PortfolioBacktestProps(BaseModel):
+    """
+    Properties for a portfolio backtest with a single shared simulated account.
+
+    Attributes:
+        account_currency (str): The currency of the simulated account.
+        initial_balance (float): The initial balance of the account.
+        account_leverage (float): The leverage granted by the broker, used for the margin check.
+        max_leverage_factor (float): The maximum leverage factor allowed, as in MaxLeverageFactorRiskManager.
+        volume (float): The volume in lots of every trade.
+        slippage_points (float): The slippage, in points, applied to the fills of every symbol.
+    """
+    account_currency: str = "USD"
+    initial_balance: float
+    account_leverage: float = 100.0
+    max_leverage_factor: float
+    volume: float
+    slippage_points: float = 0.0
@@ -0,0 +1,218 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.backtester_properties import ResultCacheProps
+from utils.utils import Utils
+from pydantic import BaseModel
+from collections import OrderedDict
+from datetime import datetime
+import pandas as pd
+import numpy as np
+import hashlib
+import json
+import os
+
+
+class BacktestResultCache():
+
+    # Extensión de los ficheros de resultados (columnas numpy comprimidas)
+    _EXTENSION = ".npz"
+
+    def __init__(self, properties: ResultCacheProps):
+        """
+        Initializes the BacktestResultCache object.
+
+        Results are stored as one compressed columnar file per key. The LRU order is kept in memory and mirrored
+        in the modification time of the files, so it survives restarts.
+
+        Args:
+            properties (ResultCacheProps): The properties of the cache.
+        """
+        self.cache_dir = properties.cache_dir
+        self.max_size_bytes = int(properties.max_size_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Índice LRU: clave -> tamaño en bytes, del menos al más recientemente usado
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_size: int = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """
+        Rebuilds the LRU index from the files already present in the cache directory.
+
+        Returns:
+            None
+        """
+        files = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(self._EXTENSION):
+                stat = os.stat(os.path.join(self.cache_dir, file_name))
+                files.append((stat.st_mtime, file_name[:-len(self._EXTENSION)], stat.st_size))
+
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_size += size
+
+    def _get_path(self, key: str) -> str:
+        """
+        Returns the path of the file that stores the given key.
+
+        Args:
+            key (str): The key of the result.
+
+        Returns:
+            str: The path of the file.
+        """
+        return os.path.join(self.cache_dir, key + self._EXTENSION)
+
+    @staticmethod
+    def build_key(signal_props: BaseModel, symbol: str, timeframe: str, start: datetime, end: datetime,
+                  data_checksum: str, engine_version: str) -> str:
+        """
+        Builds the content-addressed key of a backtest run.
+
+        Args:
+            signal_props (BaseModel): The properties model of the strategy.
+            symbol (str): The symbol of the data.
+            timeframe (str): The timeframe of the data.
+            start (datetime): The first bar of the data slice.
+            end (datetime): The last bar of the data slice.
+            data_checksum (str): The checksum of the data.
+            engine_version (str): The version of the backtest engine.
+
+        Returns:
+            str: The hexadecimal SHA-256 key.
+        """
+        content = {
+            "strategy": type(signal_props).__name__,
+            "properties": signal_props.model_dump(mode='json'),
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "start": str(start),
+            "end": str(end),
+            "data_checksum": data_checksum,
+            "engine_version": engine_version,
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def compute_file_checksum(path: str) -> str:
+        """
+        Computes the checksum of a data file, reading it in chunks.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            str: The hexadecimal SHA-256 of the file.
+        """
+        sha = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def compute_data_checksum(bars: pd.DataFrame) -> str:
+        """
+        Computes the checksum of the bars held in memory.
+
+        Args:
+            bars (pd.DataFrame): The bars.
+
+        Returns:
+            str: The hexadecimal SHA-256 of the bars (index and values).
+        """
+        row_hashes = pd.util.hash_pandas_object(bars, index=True).to_numpy()
+        return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        """
+        Returns the result stored under the given key, if any.
+
+        Args:
+            key (str): The key of the result.
+
+        Returns:
+            pd.DataFrame | None: The stored result, or None if it is not in the cache.
+        """
+        if key not in self._entries:
+            return None
+
+        path = self._get_path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = [str(column) for column in data['__columns__']]
+                result = pd.DataFrame({column: data[column] for column in columns}, columns=columns)
+
+        except Exception as e:
+            print(f"{Utils.dateprint()} - CACHE: No se ha podido leer el resultado {key}. Exception: {e}")
+            self._remove(key)
+            return None
+
+        # Marcamos la entrada como la más recientemente usada
+        self._entries.move_to_end(key)
+        os.utime(path)
+        return result
+
+    def put(self, key: str, result: pd.DataFrame) -> None:
+        """
+        Stores a result under the given key, evicting the least recently used results if needed.
+
+        Args:
+            key (str): The key of the result.
+            result (pd.DataFrame): The result to store.
+
+        Returns:
+            None
+        """
+        # Guardamos cada columna como un array numpy (las columnas de texto como unicode, sin pickle)
+        arrays = {}
+        for column in result.columns:
+            values = result[column].to_numpy()
+            arrays[str(column)] = values.astype(str) if values.dtype == object else values
+        arrays['__columns__'] = np.array([str(column) for column in result.columns], dtype=str)
+
+        # Escritura atómica: fichero temporal y renombrado
+        path = self._get_path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(tmp_path, path)
+
+        if key in self._entries:
+            self._total_size -= self._entries[key]
+        self._entries[key] = os.path.getsize(path)
+        self._entries.move_to_end(key)
+        self._total_size += self._entries[key]
+
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        """
+        Removes a result from the cache.
+
+        Args:
+            key (str): The key of the result.
+
+        Returns:
+            None
+        """
+        self._total_size -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._get_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Evicts the least recently used results until the cache fits in its maximum size.
+
+        The most recent entry is always kept, even if it is bigger than the maximum size.
+
+        Returns:
+            None
+        """
+        while self._total_size > self.max_size_bytes and len(self._entries) > 1:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
@@ -0,0 +1,33 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from enum import IntFlag
+
+class CandlestickPattern(IntFlag):
+    """
+    Bit flags of the candlestick patterns detected on a bar. Several patterns can be combined in one mask with |.
+
+    Attributes:
+        BULLISH_ENGULFING: Bullish bar whose body engulfs the body of the previous bearish bar.
+        BEARISH_ENGULFING: Bearish bar whose body engulfs the body of the previous bullish bar.
+        BULLISH_PIN_BAR: Long lower wick and small upper wick (rejection of lower prices).
+        BEARISH_PIN_BAR: Long upper wick and small lower wick (rejection of higher prices).
+        INSIDE_BAR: The range of the bar is inside the range of the previous bar.
+        OUTSIDE_BAR: The range of the bar contains the range of the previous bar.
+        DOJI: The body of the bar is very small compared with its range.
+        UPTREND_STRUCTURE: The last swing_bars bars made higher highs and higher lows.
+        DOWNTREND_STRUCTURE: The last swing_bars bars made lower highs and lower lows.
+        SWING_HIGH: The bar swing_bars bars ago is confirmed as a swing high by this bar.
+        SWING_LOW: The bar swing_bars bars ago is confirmed as a swing low by this bar.
+    """
+    NONE = 0
+    BULLISH_ENGULFING = 1
+    BEARISH_ENGULFING = 2
+    BULLISH_PIN_BAR = 4
+    BEARISH_PIN_BAR = 8
+    INSIDE_BAR = 16
+    OUTSIDE_BAR = 32
+    DOJI = 64
+    UPTREND_STRUCTURE = 128
+    DOWNTREND_STRUCTURE = 256
+    SWING_HIGH = 512
+    SWING_LOW = 1024
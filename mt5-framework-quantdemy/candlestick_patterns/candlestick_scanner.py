@@ -0,0 +1,184 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.candlestick_properties import CandlestickScannerProps
+from .candlestick_pattern import CandlestickPattern
+from events.events import DataEvent
+from collections import deque
+from typing import Dict
+import pandas as pd
+import numpy as np
+
+
+class CandlestickScanner():
+
+    def __init__(self, properties: CandlestickScannerProps):
+        """
+        Initializes the CandlestickScanner object.
+
+        All the patterns are evaluated with boolean array expressions over whole OHLC arrays. Every pattern only looks at
+        a fixed number of previous bars, so the live scanner keeps that many bars per symbol and applies the same
+        expressions to them: the results are the same as in the full-history scan, at a constant cost per bar.
+
+        Args:
+            properties (CandlestickScannerProps): The properties of the scanner.
+        """
+        self.doji_body_ratio = properties.doji_body_ratio
+        self.pin_bar_wick_ratio = properties.pin_bar_wick_ratio
+        self.pin_bar_nose_ratio = properties.pin_bar_nose_ratio
+        self.swing_bars = properties.swing_bars if properties.swing_bars > 0 else 1
+
+        # Número de velas que necesita el patrón con más memoria (swing high/low: swing_bars a cada lado)
+        self.window = 2 * self.swing_bars + 1
+
+        self._bars: Dict[str, deque] = {}
+        self._patterns: Dict[str, int] = {}
+
+    def scan_arrays(self, open: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """
+        Detects the patterns of every bar.
+
+        The comparisons with previous bars are done on aligned slices of the arrays (no copies), and each pattern is
+        added to the bitmask with a shift of its boolean array.
+
+        Args:
+            open (np.ndarray): The opens.
+            high (np.ndarray): The highs.
+            low (np.ndarray): The lows.
+            close (np.ndarray): The closes.
+
+        Returns:
+            np.ndarray: The bitmask of CandlestickPattern flags of each bar (uint32).
+        """
+        open, high, low, close = (np.asarray(values, dtype=float) for values in (open, high, low, close))
+        n = len(close)
+        k = self.swing_bars
+        patterns = np.zeros(n, dtype=np.uint32)
+        if n == 0:
+            return patterns
+
+        def add(pattern: CandlestickPattern, condition: np.ndarray, first_bar: int = 0) -> None:
+            # Cada patrón ocupa un bit: desplazamos la condición booleana a su posición
+            patterns[first_bar:] |= condition.astype(np.uint32) << np.uint32(int(pattern).bit_length() - 1)
+
+        body = np.abs(close - open)
+        bar_range = high - low
+        upper_wick = high - np.maximum(open, close)
+        lower_wick = np.minimum(open, close) - low
+        bullish = close > open
+        bearish = close < open
+
+        # Patrones de una vela
+        has_range = bar_range > 0
+        add(CandlestickPattern.DOJI, has_range & (body <= self.doji_body_ratio * bar_range))
+        add(CandlestickPattern.BULLISH_PIN_BAR, has_range & (body > 0) & (lower_wick >= self.pin_bar_wick_ratio * body) & (upper_wick <= self.pin_bar_nose_ratio * bar_range))
+        add(CandlestickPattern.BEARISH_PIN_BAR, has_range & (body > 0) & (upper_wick >= self.pin_bar_wick_ratio * body) & (lower_wick <= self.pin_bar_nose_ratio * bar_range))
+
+        if n < 2:
+            return patterns
+
+        # Patrones de dos velas: la vela actual ([1:]) frente a la anterior ([:-1])
+        bigger_body = body[1:] > body[:-1]
+        add(CandlestickPattern.BULLISH_ENGULFING, bearish[:-1] & bullish[1:] & (open[1:] <= close[:-1]) & (close[1:] >= open[:-1]) & bigger_body, 1)
+        add(CandlestickPattern.BEARISH_ENGULFING, bullish[:-1] & bearish[1:] & (open[1:] >= close[:-1]) & (close[1:] <= open[:-1]) & bigger_body, 1)
+        add(CandlestickPattern.INSIDE_BAR, (high[1:] <= high[:-1]) & (low[1:] >= low[:-1]) & (bar_range[1:] < bar_range[:-1]), 1)
+        add(CandlestickPattern.OUTSIDE_BAR, (high[1:] > high[:-1]) & (low[1:] < low[:-1]), 1)
+
+        # Estructura: swing_bars máximos y mínimos crecientes (o decrecientes) consecutivos
+        if n > k:
+            higher_high = high[1:] > high[:-1]
+            higher_low = low[1:] > low[:-1]
+            lower_high = high[1:] < high[:-1]
+            lower_low = low[1:] < low[:-1]
+            uptrend = np.ones(n - k, dtype=bool)
+            downtrend = np.ones(n - k, dtype=bool)
+            for lag in range(k):
+                # Cambio de la vela t - lag respecto a la anterior, para las velas t >= k
+                start, end = k - 1 - lag, n - 1 - lag
+                uptrend &= higher_high[start:end] & higher_low[start:end]
+                downtrend &= lower_high[start:end] & lower_low[start:end]
+            add(CandlestickPattern.UPTREND_STRUCTURE, uptrend, k)
+            add(CandlestickPattern.DOWNTREND_STRUCTURE, downtrend, k)
+
+        # Swing high/low de la vela de hace swing_bars velas, confirmado con las swing_bars velas posteriores
+        if n > 2 * k:
+            pivot_high = high[k:n - k]
+            pivot_low = low[k:n - k]
+            swing_high = np.ones(n - 2 * k, dtype=bool)
+            swing_low = np.ones(n - 2 * k, dtype=bool)
+            for lag in range(2 * k + 1):
+                if lag == k:
+                    continue
+                swing_high &= pivot_high > high[2 * k - lag:n - lag]
+                swing_low &= pivot_low < low[2 * k - lag:n - lag]
+            add(CandlestickPattern.SWING_HIGH, swing_high, 2 * k)
+            add(CandlestickPattern.SWING_LOW, swing_low, 2 * k)
+
+        return patterns
+
+    def scan(self, bars: pd.DataFrame) -> pd.Series:
+        """
+        Detects the patterns of every bar of a history.
+
+        Args:
+            bars (pd.DataFrame): The bars, with 'open', 'high', 'low' and 'close' columns.
+
+        Returns:
+            pd.Series: The 'patterns' bitmask of each bar, indexed like the bars.
+        """
+        patterns = self.scan_arrays(bars['open'].to_numpy(dtype=float), bars['high'].to_numpy(dtype=float),
+                                    bars['low'].to_numpy(dtype=float), bars['close'].to_numpy(dtype=float))
+        return pd.Series(patterns, index=bars.index, name='patterns')
+
+    def update(self, symbol: str, bar: pd.Series) -> CandlestickPattern:
+        """
+        Detects the patterns of a new closed bar of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+            bar (pd.Series): The closed bar.
+
+        Returns:
+            CandlestickPattern: The patterns of the bar.
+        """
+        if symbol not in self._bars:
+            self._bars[symbol] = deque(maxlen=self.window)
+
+        bars = self._bars[symbol]
+        bars.append((float(bar['open']), float(bar['high']), float(bar['low']), float(bar['close'])))
+
+        # Aplicamos las mismas expresiones a la ventana de velas y nos quedamos con la última
+        open, high, low, close = np.array(bars).T
+        self._patterns[symbol] = CandlestickPattern(int(self.scan_arrays(open, high, low, close)[-1]))
+        return self._patterns[symbol]
+
+    def on_data_event(self, data_event: DataEvent) -> CandlestickPattern:
+        """
+        Detects the patterns of the closed bar of a data event.
+
+        Args:
+            data_event (DataEvent): The data event.
+
+        Returns:
+            CandlestickPattern: The patterns of the bar.
+        """
+        return self.update(data_event.symbol, data_event.data)
+
+    def get_patterns(self, symbol: str) -> CandlestickPattern:
+        """
+        Returns the patterns of the last bar processed for a symbol.
+        """
+        return self._patterns.get(symbol, CandlestickPattern.NONE)
+
+    @staticmethod
+    def has_patterns(patterns: int | np.ndarray, required: CandlestickPattern) -> bool | np.ndarray:
+        """
+        Returns True where all the required patterns are present in the bitmask.
+
+        Args:
+            patterns (int | np.ndarray): The bitmask of one bar, or the bitmasks of several bars.
+            required (CandlestickPattern): The required patterns, combined with |.
+
+        Returns:
+            bool | np.ndarray: True where all the required patterns are present.
+        """
+        return (patterns & required) == required
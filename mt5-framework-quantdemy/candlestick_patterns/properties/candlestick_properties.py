@@ -0,0 +1,19 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class CandlestickScannerProps(BaseModel):
+    """
+    Properties of the candlestick pattern scanner.
+
+    Attributes:
+        doji_body_ratio (float): The maximum body of a doji, as a fraction of the bar range.
+        pin_bar_wick_ratio (float): The minimum length of the rejection wick of a pin bar, as a multiple of its body.
+        pin_bar_nose_ratio (float): The maximum length of the opposite wick of a pin bar, as a fraction of the bar range.
+        swing_bars (int): The number of bars at each side of a swing high/low, and the number of consecutive higher
+            (lower) highs and lows of a trend structure.
+    """
+    doji_body_ratio: float = 0.1
+    pin_bar_wick_ratio: float = 2.0
+    pin_bar_nose_ratio: float = 0.25
+    swing_bars: int = 2
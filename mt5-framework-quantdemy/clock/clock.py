@@ -0,0 +1,104 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .interfaces.clock_interface import IClock
+from .properties.clock_properties import BaseClockProps, LiveClockProps, SimulatedClockProps
+from .clocks.live_clock import LiveClock
+from .clocks.simulated_clock import SimulatedClock
+from contextlib import contextmanager
+from datetime import datetime, tzinfo
+from typing import Iterator
+
+class Clock():
+
+    # Reloj activo, compartido por todos los módulos del framework (por defecto, la hora real)
+    _clock: IClock = LiveClock()
+
+    @staticmethod
+    def _get_clock(properties: BaseClockProps) -> IClock:
+        """
+        Returns an instance of the appropriate clock based on the provided properties.
+
+        Args:
+            properties (BaseClockProps): The properties of the clock.
+
+        Returns:
+            IClock: An instance of the clock.
+
+        Raises:
+            Exception: If the clock type is unknown.
+        """
+        if isinstance(properties, LiveClockProps):
+            return LiveClock()
+
+        elif isinstance(properties, SimulatedClockProps):
+            return SimulatedClock(properties)
+
+        else:
+            raise Exception(f"ERROR: Tipo de reloj desconocido: {properties}")
+
+    @staticmethod
+    def set_clock(properties: BaseClockProps) -> None:
+        """
+        Sets the clock used by every module of the framework.
+
+        Args:
+            properties (BaseClockProps): The properties of the clock (LiveClockProps or SimulatedClockProps).
+        """
+        Clock._clock = Clock._get_clock(properties)
+
+    @staticmethod
+    @contextmanager
+    def simulated(properties: SimulatedClockProps) -> Iterator[None]:
+        """
+        Installs a simulated clock for the duration of a backtest or replay, and restores the previous clock afterwards.
+
+        Args:
+            properties (SimulatedClockProps): The properties of the simulated clock.
+        """
+        previous_clock = Clock._clock
+        Clock.set_clock(properties)
+        try:
+            yield
+        finally:
+            Clock._clock = previous_clock
+
+    @staticmethod
+    def is_simulated() -> bool:
+        """
+        Returns True if the active clock is a simulated clock.
+        """
+        return isinstance(Clock._clock, SimulatedClock)
+
+    @staticmethod
+    def now(tz: tzinfo | None = None) -> datetime:
+        """
+        Returns the current time of the active clock.
+
+        Args:
+            tz (tzinfo | None): The timezone of the result. If None, UTC is used.
+
+        Returns:
+            datetime: The current (wall or virtual) time, timezone-aware.
+        """
+        now = Clock._clock.now()
+        return now.astimezone(tz) if tz is not None else now
+
+    @staticmethod
+    def sleep(seconds: float) -> None:
+        """
+        Sleeps using the active clock: a real wait in live mode, an instant advance of the virtual time otherwise.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+        """
+        Clock._clock.sleep(seconds)
+
+    @staticmethod
+    def advance_to(event_time: datetime) -> None:
+        """
+        Moves the active clock to the time of the last consumed event (no effect in live mode).
+
+        Args:
+            event_time (datetime): The time of the last consumed event.
+        """
+        Clock._clock.advance_to(event_time)
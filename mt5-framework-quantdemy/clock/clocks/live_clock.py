@@ -0,0 +1,34 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.clock_interface import IClock
+from datetime import datetime, timezone
+import time
+
+class LiveClock(IClock):
+
+    def now(self) -> datetime:
+        """
+        Returns the current wall time.
+
+        Returns:
+            datetime: The current time in UTC (timezone-aware).
+        """
+        return datetime.now(timezone.utc)
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Blocks the execution for the given number of seconds.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+        """
+        time.sleep(seconds)
+
+    def advance_to(self, event_time: datetime) -> None:
+        """
+        Does nothing: the wall time can not be moved.
+
+        Args:
+            event_time (datetime): The time of the last consumed event.
+        """
+        pass
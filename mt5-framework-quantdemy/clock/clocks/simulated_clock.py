@@ -0,0 +1,63 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.clock_interface import IClock
+from ..properties.clock_properties import SimulatedClockProps
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+class SimulatedClock(IClock):
+
+    def __init__(self, properties: SimulatedClockProps):
+        """
+        Initializes the SimulatedClock object.
+
+        Args:
+            properties (SimulatedClockProps): The properties of the simulated clock.
+        """
+        self.server_timezone = ZoneInfo(properties.server_timezone)
+        self._now = self._to_utc(properties.start_time)
+
+    def _to_utc(self, time: datetime) -> datetime:
+        """
+        Converts a datetime to a timezone-aware UTC datetime. Naive datetimes (like the MT5 bar times) are in the
+        broker server time, so they are localized to the server timezone first (the same UTC that LiveClock returns).
+
+        Args:
+            time (datetime): The datetime to convert.
+
+        Returns:
+            datetime: The timezone-aware UTC datetime.
+        """
+        if time.tzinfo is None:
+            return time.replace(tzinfo=self.server_timezone).astimezone(timezone.utc)
+        return time.astimezone(timezone.utc)
+
+    def now(self) -> datetime:
+        """
+        Returns the current virtual time.
+
+        Returns:
+            datetime: The virtual time in UTC (timezone-aware).
+        """
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Advances the virtual time by the given number of seconds without blocking.
+
+        Args:
+            seconds (float): The number of seconds to sleep.
+        """
+        if seconds > 0:
+            self._now += timedelta(seconds=seconds)
+
+    def advance_to(self, event_time: datetime) -> None:
+        """
+        Moves the virtual time to the time of the last consumed event. The clock never goes backwards.
+
+        Args:
+            event_time (datetime): The time of the last consumed event.
+        """
+        event_time = self._to_utc(event_time)
+        if event_time > self._now:
+            self._now = event_time
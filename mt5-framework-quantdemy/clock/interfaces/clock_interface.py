@@ -0,0 +1,15 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from typing import Protocol
+from datetime import datetime
+
+class IClock(Protocol):
+
+    def now(self) -> datetime:
+        ...
+
+    def sleep(self, seconds: float) -> None:
+        ...
+
+    def advance_to(self, event_time: datetime) -> None:
+        ...
@@ -0,0 +1,21 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+from datetime import datetime
+
+class BaseClockProps(BaseModel):
+    pass
+
+class LiveClockProps(BaseClockProps):
+    pass
+
+class SimulatedClockProps(BaseClockProps):
+    """
+    Properties for the simulated (virtual) clock used in backtests and replays.
+
+    Attributes:
+        start_time (datetime): The initial virtual time. Naive datetimes are interpreted in the server timezone.
+        server_timezone (str): The timezone of the broker server, in which MT5 returns the (naive) bar times.
+    """
+    start_time: datetime
+    server_timezone: str = "Asia/Nicosia"
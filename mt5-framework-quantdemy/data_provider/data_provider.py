@@ -1,7 +1,7 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
 from utils.utils import Utils
-import MetaTrader5 as mt5
+from utils.terminal import mt5
 import pandas as pd
 from typing import Dict
 from datetime import datetime
@@ -33,6 +33,9 @@ class DataProvider():
         # Creamos un diccionario para guardar el datetime de la última vela que habíamos visto para cada símbolo
         self.last_bar_datetime: Dict[str, datetime] = {symbol: datetime.min for symbol in self.symbols}
 
+        # Cierre de la última vela vista de cada símbolo (para comprobar la consistencia de un estado guardado)
+        self.last_bar_close: Dict[str, float] = {}
+
     def _map_timeframes(self, timeframe: str) -> int:
         """
         Maps a string timeframe to its corresponding integer value.
@@ -170,6 +173,51 @@ class DataProvider():
             # Si todo OK, devolvemos el dataframe con las num_bars
             return bars
         
+    def get_bulk_history(self, symbols: list, timeframe: str, num_bars: int) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieves, in one pass, the latest closed bars of several symbols.
+
+        Args:
+            symbols (list): The symbols to retrieve bars for.
+            timeframe (str): The timeframe of the bars.
+            num_bars (int): The number of bars to retrieve for each symbol.
+
+        Returns:
+            Dict[str, pd.DataFrame]: The bars of each symbol that could be retrieved.
+        """
+        history = {}
+        for symbol in symbols:
+            bars = self.get_latest_closed_bars(symbol, timeframe, num_bars)
+            if bars is not None and not bars.empty:
+                history[symbol] = bars
+
+        return history
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the data provider to be checkpointed.
+
+        Returns:
+            dict: The datetime and close of the last bar seen for each symbol.
+        """
+        return {"last_bar_datetime": dict(self.last_bar_datetime), "last_bar_close": dict(self.last_bar_close)}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state. Only the symbols of this data provider are restored.
+
+        Args:
+            state (dict): The state returned by get_state.
+
+        Returns:
+            None
+        """
+        for symbol in self.symbols:
+            if symbol in state["last_bar_datetime"]:
+                self.last_bar_datetime[symbol] = state["last_bar_datetime"][symbol]
+            if symbol in state["last_bar_close"]:
+                self.last_bar_close[symbol] = state["last_bar_close"][symbol]
+
     def get_latest_tick(self, symbol: str) -> dict:
         """
         Retrieves the latest tick for the given symbol.
@@ -210,5 +258,6 @@ class DataProvider():
 
             if not latest_bar.empty and latest_bar.name > self.last_bar_datetime[symbol]:
                 self.last_bar_datetime[symbol] = latest_bar.name
+                self.last_bar_close[symbol] = float(latest_bar['close'])
                 data_event = DataEvent(symbol=symbol, data=latest_bar)
                 self.events_queue.put(data_event)
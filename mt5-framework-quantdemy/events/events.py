@@ -17,6 +17,7 @@ class EventType(str, Enum):
         ORDER: Represents an order event.
         EXECUTION: Represents an execution event.
         PENDING: Represents a pending event.
+        REJECTION: Represents an order rejection event.
     """
     DATA = "DATA"
     SIGNAL = "SIGNAL"
@@ -24,6 +25,7 @@ class EventType(str, Enum):
     ORDER = "ORDER"
     EXECUTION = "EXECUTION"
     PENDING = "PENDING"
+    REJECTION = "REJECTION"
 
 class SignalType(str, Enum):
     """
@@ -150,6 +152,10 @@ class ExecutionEvent(BaseEvent):
         fill_price (float): The price at which the trade was executed.
         fill_time (datetime): The timestamp of the trade execution.
         volume (float): The volume of the executed trade.
+        closes_position (bool): True if the execution closes (totally or partially) an existing position.
+        profit (float): The realized profit of the execution in the account currency (0 for opening executions).
+        magic_number (int): The magic number of the executed order.
+        position_id (int): The ticket of the position opened, modified or closed by the execution (0 if unknown).
     """
     event_type: EventType = EventType.EXECUTION
     symbol: str
@@ -157,6 +163,10 @@ class ExecutionEvent(BaseEvent):
     fill_price: float
     fill_time: datetime
     volume: float
+    closes_position: bool = False
+    profit: float = 0.0
+    magic_number: int = 0
+    position_id: int = 0
 
 
 class PlacedPendingOrderEvent(BaseEvent):
@@ -182,4 +192,35 @@ class PlacedPendingOrderEvent(BaseEvent):
     magic_number: int
     sl: float
     tp: float
-    volume: float
\ No newline at end of file
+    volume: float
+
+class OrderRejectedEvent(BaseEvent):
+    """
+    Represents an event for an order that was rejected by the broker, failed or timed out.
+
+    Attributes:
+        event_type (EventType): The type of the event (EventType.REJECTION).
+        client_id (int): The id assigned to the order when it was submitted.
+        symbol (str): The symbol of the order.
+        signal (SignalType): The type of signal for the order.
+        target_order (OrderType): The type of order.
+        target_price (float): The target price for the order.
+        magic_number (int): The magic number associated with the order.
+        sl (float): The stop loss level for the order.
+        tp (float): The take profit level for the order.
+        volume (float): The volume of the order.
+        retcode (int): The return code of the trade server (0 if there was no response).
+        reason (str): The description of the rejection.
+    """
+    event_type: EventType = EventType.REJECTION
+    client_id: int
+    symbol: str
+    signal: SignalType
+    target_order: OrderType
+    target_price: float
+    magic_number: int
+    sl: float
+    tp: float
+    volume: float
+    retcode: int = 0
+    reason: str
@@ -0,0 +1,295 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.feature_properties import FeatureBuilderProps
+from indicators.vectorized_indicators import VectorizedIndicators
+from indicators.properties.indicator_properties import (BaseIndicatorProps, SMAIndicatorProps, EMAIndicatorProps, RSIIndicatorProps, MACDIndicatorProps,
+                                                        ATRIndicatorProps, BollingerIndicatorProps, RollingMinMaxIndicatorProps)
+from support_resistance.support_resistance_detector import SupportResistanceDetector
+from utils.utils import Utils
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List
+import pandas as pd
+import numpy as np
+import os
+
+
+class FeatureBuilder():
+
+    # Extensión de los ficheros de cada bloque de features (columnas numpy comprimidas)
+    _EXTENSION = ".npz"
+
+    def __init__(self, properties: FeatureBuilderProps):
+        """
+        Initializes the FeatureBuilder object.
+
+        The bars of each symbol are read and processed in chunks. Each chunk is computed together with the last bars of
+        the previous one (lookback, so the indicators are warmed up), and its last bars are held back until the next
+        chunk arrives (lookahead, so the pivots that need future bars are confirmed). Only one chunk per symbol is kept
+        in memory, and symbols are processed in parallel processes.
+
+        Args:
+            properties (FeatureBuilderProps): The properties of the builder.
+        """
+        self.output_dir = properties.output_dir
+        self.indicators = list(dict.fromkeys(properties.indicators))
+        self.support_resistance = properties.support_resistance
+        self.peak_order = properties.peak_order if properties.peak_order > 0 else 0
+        self.chunk_size = properties.chunk_size if properties.chunk_size > 0 else 1_000_000
+        self.max_workers = properties.max_workers if properties.max_workers > 0 else 1
+        self.csv_separator = properties.csv_separator
+        self.float_dtype = np.dtype(properties.float_dtype)
+
+        # Velas de contexto necesarias antes y después de cada vela
+        self.lookback = max([props.warm_up_bars() for props in self.indicators] + [self.peak_order, 1])
+        self.lookahead = self.peak_order
+        if self.support_resistance is not None:
+            self.lookback = max(self.lookback, self.support_resistance.n1 + 1)
+            self.lookahead = max(self.lookahead, self.support_resistance.n2)
+
+    @staticmethod
+    def _get_indicator_columns(properties: BaseIndicatorProps) -> List[str]:
+        """
+        Returns the names of the output columns of an indicator.
+
+        Args:
+            properties (BaseIndicatorProps): The properties of the indicator.
+
+        Returns:
+            List[str]: The column names (one per line of the indicator).
+
+        Raises:
+            Exception: If the indicator properties are of an unknown type.
+        """
+        if isinstance(properties, SMAIndicatorProps):
+            return [f"sma_{properties.period}"]
+
+        elif isinstance(properties, EMAIndicatorProps):
+            return [f"ema_{properties.period}"]
+
+        elif isinstance(properties, RSIIndicatorProps):
+            return [f"rsi_{properties.period}"]
+
+        elif isinstance(properties, MACDIndicatorProps):
+            name = f"macd_{properties.fast_period}_{properties.slow_period}_{properties.signal_period}"
+            return [name, f"{name}_signal", f"{name}_hist"]
+
+        elif isinstance(properties, ATRIndicatorProps):
+            return [f"atr_{properties.period}"]
+
+        elif isinstance(properties, BollingerIndicatorProps):
+            name = f"bb_{properties.period}_{properties.num_std:g}"
+            return [f"{name}_lower", f"{name}_middle", f"{name}_upper"]
+
+        elif isinstance(properties, RollingMinMaxIndicatorProps):
+            return [f"min_low_{properties.period}", f"max_high_{properties.period}"]
+
+        else:
+            raise Exception(f"ERROR: Indicador desconocido: {properties}")
+
+    @staticmethod
+    def _normalize_bars(raw: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts raw bars to the framework format: lowercase OHLC columns indexed by time.
+
+        Accepts the CSV files saved from the framework or from copy_rates (a 'time' column in seconds or as text), the
+        files exported from the MT5 terminal ('<DATE>' and '<TIME>' columns) and capitalized columns ('Open', 'High'...).
+
+        Args:
+            raw (pd.DataFrame): The raw bars.
+
+        Returns:
+            pd.DataFrame: The bars indexed by time.
+        """
+        bars = raw.rename(columns=lambda column: str(column).strip().strip('<>').lower())
+        bars = bars.rename(columns={'tick_volume': 'tickvol', 'real_volume': 'vol', 'volume': 'tickvol'})
+        bars = bars.loc[:, [column for column in bars.columns if not column.startswith('unnamed')]]
+
+        if 'date' in bars.columns and 'time' in bars.columns:
+            bars['time'] = pd.to_datetime(bars['date'].astype(str) + ' ' + bars['time'].astype(str))
+            bars = bars.drop(columns='date')
+        elif 'date' in bars.columns:
+            bars = bars.rename(columns={'date': 'time'})
+
+        if pd.api.types.is_numeric_dtype(bars['time']):
+            bars['time'] = pd.to_datetime(bars['time'], unit='s')
+        else:
+            bars['time'] = pd.to_datetime(bars['time'])
+
+        return bars.set_index('time')
+
+    def _read_csv_chunks(self, path: str) -> Iterator[pd.DataFrame]:
+        """
+        Reads the bars of a CSV file in chunks.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            Iterator[pd.DataFrame]: The chunks of normalized bars.
+        """
+        for raw in pd.read_csv(path, sep=self.csv_separator, chunksize=self.chunk_size):
+            yield self._normalize_bars(raw)
+
+    def compute_features(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Computes all the features over a block of bars held in memory.
+
+        Args:
+            bars (pd.DataFrame): The bars, with 'high', 'low' and 'close' columns, indexed by time.
+
+        Returns:
+            pd.DataFrame: The bars plus one column per feature.
+        """
+        features = {}
+
+        for properties in self.indicators:
+            values = VectorizedIndicators.compute(properties, bars)
+            values = values if isinstance(values, tuple) else (values,)
+            for column, column_values in zip(self._get_indicator_columns(properties), values):
+                features[column] = column_values
+
+        high = bars['high'].to_numpy(dtype=float)
+        low = bars['low'].to_numpy(dtype=float)
+
+        # Picos: máximo (mínimo) de las peak_order velas a cada lado
+        if self.peak_order > 0:
+            window = 2 * self.peak_order + 1
+            rolling_max = pd.Series(high).rolling(window, center=True).max().to_numpy()
+            rolling_min = pd.Series(low).rolling(window, center=True).min().to_numpy()
+            features['picos_maximos_high'] = np.where(high == rolling_max, high, np.nan)
+            features['picos_minimos_low'] = np.where(low == rolling_min, low, np.nan)
+
+        # Soportes y resistencias (mismas columnas que generaba el notebook)
+        if self.support_resistance is not None:
+            detector = SupportResistanceDetector(bars)
+            features['Support'] = np.where(detector.detect_supports(self.support_resistance.n1, self.support_resistance.n2), low, np.nan)
+            features['Resistance'] = np.where(detector.detect_resistances(self.support_resistance.n1, self.support_resistance.n2), high, np.nan)
+
+        features = pd.DataFrame({column: np.asarray(values, dtype=self.float_dtype) for column, values in features.items()}, index=bars.index)
+        return pd.concat([bars, features], axis=1)
+
+    def _get_symbol_dir(self, symbol: str) -> str:
+        """
+        Returns the directory where the features of a symbol are written.
+        """
+        return os.path.join(self.output_dir, symbol)
+
+    def _write_part(self, symbol_dir: str, part_number: int, features: pd.DataFrame) -> None:
+        """
+        Writes a block of features as a compressed columnar file.
+
+        Args:
+            symbol_dir (str): The output directory of the symbol.
+            part_number (int): The number of the block.
+            features (pd.DataFrame): The features, indexed by time.
+
+        Returns:
+            None
+        """
+        arrays = {str(column): features[column].to_numpy() for column in features.columns}
+        arrays['time'] = features.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        arrays['__columns__'] = np.array([str(column) for column in features.columns], dtype=str)
+
+        # Escritura atómica: fichero temporal y renombrado
+        path = os.path.join(symbol_dir, f"part-{part_number:05d}{self._EXTENSION}")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as file:
+            np.savez_compressed(file, **arrays)
+        os.replace(tmp_path, path)
+
+    def build_symbol(self, symbol: str, path: str) -> int:
+        """
+        Builds the features of a symbol from a CSV file, chunk by chunk.
+
+        Args:
+            symbol (str): The symbol.
+            path (str): The path of the CSV file with the bars.
+
+        Returns:
+            int: The number of bars written.
+        """
+        symbol_dir = self._get_symbol_dir(symbol)
+        os.makedirs(symbol_dir, exist_ok=True)
+        for file_name in os.listdir(symbol_dir):
+            if file_name.endswith(self._EXTENSION):
+                os.remove(os.path.join(symbol_dir, file_name))
+
+        # carry: velas del bloque anterior necesarias como contexto; emit_start: primera de ellas aún no escrita
+        carry = None
+        emit_start = 0
+        part_number = 0
+        written = 0
+
+        for chunk in self._read_csv_chunks(path):
+            data = chunk if carry is None else pd.concat([carry, chunk])
+
+            # Las últimas lookahead velas esperan al siguiente bloque para confirmar sus pivotes
+            emit_end = len(data) - self.lookahead
+            if emit_end > emit_start:
+                features = self.compute_features(data)
+                self._write_part(symbol_dir, part_number, features.iloc[emit_start:emit_end])
+                part_number += 1
+                written += emit_end - emit_start
+
+                carry_start = max(emit_end - self.lookback, 0)
+                carry = data.iloc[carry_start:]
+                emit_start = emit_end - carry_start
+            else:
+                carry = data
+
+        # Último bloque: ya no llegan más velas, escribimos las pendientes
+        if carry is not None and len(carry) > emit_start:
+            features = self.compute_features(carry)
+            self._write_part(symbol_dir, part_number, features.iloc[emit_start:])
+            written += len(carry) - emit_start
+
+        return written
+
+    def build(self, sources: Dict[str, str]) -> Dict[str, int]:
+        """
+        Builds the features of several symbols in parallel processes.
+
+        On Windows, it must be called from code protected by if __name__ == "__main__".
+
+        Args:
+            sources (Dict[str, str]): The path of the CSV file of each symbol.
+
+        Returns:
+            Dict[str, int]: The number of bars written for each symbol (0 if it failed).
+        """
+        results = {}
+        with ProcessPoolExecutor(max_workers=min(self.max_workers, max(len(sources), 1))) as executor:
+            futures = {symbol: executor.submit(self.build_symbol, symbol, path) for symbol, path in sources.items()}
+
+            for symbol, future in futures.items():
+                try:
+                    results[symbol] = future.result()
+                    print(f"{Utils.dateprint()} - FEATURES: {symbol} completado con {results[symbol]} velas")
+                except Exception as e:
+                    print(f"{Utils.dateprint()} - ERROR: No se han podido generar las features de {symbol}. Exception: {e}")
+                    results[symbol] = 0
+
+        return results
+
+    def load_features(self, symbol: str, columns: List[str] | None = None) -> pd.DataFrame:
+        """
+        Loads the features of a symbol written by build.
+
+        Args:
+            symbol (str): The symbol.
+            columns (List[str] | None): The columns to load. If None, all the columns are loaded.
+
+        Returns:
+            pd.DataFrame: The features, indexed by time.
+        """
+        symbol_dir = self._get_symbol_dir(symbol)
+        parts = []
+        for file_name in sorted(os.listdir(symbol_dir)):
+            if not file_name.endswith(self._EXTENSION):
+                continue
+            with np.load(os.path.join(symbol_dir, file_name), allow_pickle=False) as data:
+                part_columns = [str(column) for column in data['__columns__']] if columns is None else columns
+                index = pd.DatetimeIndex(data['time'].astype('datetime64[ns]'), name='time')
+                parts.append(pd.DataFrame({column: data[column] for column in part_columns}, index=index, columns=part_columns))
+
+        return pd.concat(parts) if parts else pd.DataFrame()
@@ -0,0 +1,30 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from indicators.properties.indicator_properties import BaseIndicatorProps
+from support_resistance.properties.support_resistance_properties import SupportResistanceProps
+from pydantic import BaseModel
+from typing import List
+
+class FeatureBuilderProps(BaseModel):
+    """
+    Properties of the batch feature builder for research datasets.
+
+    Attributes:
+        output_dir (str): The directory where the features of each symbol are written.
+        indicators (List[BaseIndicatorProps]): The framework indicators to be computed.
+        support_resistance (SupportResistanceProps | None): The settings of the 'Support'/'Resistance' columns. None to skip them.
+        peak_order (int): The number of bars at each side of a bar to mark it in the 'picos_maximos_high'/'picos_minimos_low'
+            columns (0 to skip them).
+        chunk_size (int): The number of bars read and processed at once.
+        max_workers (int): The number of symbols processed in parallel.
+        csv_separator (str): The separator of the CSV files ("\\t" for the files exported from the MT5 terminal).
+        float_dtype (str): The dtype of the feature columns in the output ("float64" or "float32").
+    """
+    output_dir: str
+    indicators: List[BaseIndicatorProps] = []
+    support_resistance: SupportResistanceProps | None = SupportResistanceProps()
+    peak_order: int = 5
+    chunk_size: int = 1_000_000
+    max_workers: int = 4
+    csv_separator: str = ","
+    float_dtype: str = "float64"
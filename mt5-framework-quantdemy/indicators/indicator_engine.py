@@ -0,0 +1,388 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .interfaces.indicator_interface import IIndicator
+from .properties.indicator_properties import (BaseIndicatorProps, SMAIndicatorProps, EMAIndicatorProps, RSIIndicatorProps, MACDIndicatorProps,
+                                              ATRIndicatorProps, BollingerIndicatorProps, RollingMinMaxIndicatorProps)
+from .streaming_indicators.sma_indicator import SMAIndicator
+from .streaming_indicators.ema_indicator import EMAIndicator
+from .streaming_indicators.rsi_indicator import RSIIndicator
+from .streaming_indicators.macd_indicator import MACDIndicator
+from .streaming_indicators.atr_indicator import ATRIndicator
+from .streaming_indicators.bollinger_indicator import BollingerIndicator
+from .streaming_indicators.rolling_min_max_indicator import RollingMinMaxIndicator
+from data_provider.data_provider import DataProvider
+from events.events import DataEvent
+from utils.utils import Utils
+from datetime import datetime
+from typing import Dict, List, Tuple
+import pandas as pd
+
+
+class IndicatorEngine():
+
+    def __init__(self):
+        """
+        Initializes the IndicatorEngine object.
+
+        The engine is shared by all the strategies. Each strategy subscribes the indicators it needs for a timeframe, and
+        the engine builds, for each (symbol, timeframe), a computation graph with one node per distinct indicator. Each
+        node is evaluated once per closed bar (memoized by the bar time) and its value is shared by all the subscribers.
+        """
+        # Suscripciones: id -> (timeframe, indicadores solicitados)
+        self._subscriptions: Dict[int, Tuple[str, List[BaseIndicatorProps]]] = {}
+        self._next_subscription_id: int = 0
+
+        # Nodos (indicadores sin duplicados) de los grafos de cada timeframe
+        self._graph_props: Dict[str, List[BaseIndicatorProps]] = {}
+
+        # Grafos por (símbolo, timeframe) y fecha de la última vela evaluada en cada uno
+        self._graphs: Dict[Tuple[str, str], Dict[BaseIndicatorProps, IIndicator]] = {}
+        self._last_bar_datetime: Dict[Tuple[str, str], datetime] = {}
+
+        # Memoización: fecha de la vela del último data event con el que se ha sincronizado cada grafo
+        self._last_event_datetime: Dict[Tuple[str, str], datetime] = {}
+
+        # Estadísticas: cálculos solicitados por los suscriptores y cálculos realmente hechos
+        self.requested_computations: int = 0
+        self.performed_computations: int = 0
+
+    def subscribe(self, timeframe: str, indicator_props: List[BaseIndicatorProps]) -> int:
+        """
+        Subscribes a strategy to a set of indicators.
+
+        Args:
+            timeframe (str): The timeframe of the indicators.
+            indicator_props (List[BaseIndicatorProps]): The properties of the indicators needed by the strategy.
+
+        Returns:
+            int: The id of the subscription, used in on_data_event.
+        """
+        subscription_id = self._next_subscription_id
+        self._next_subscription_id += 1
+        self._subscriptions[subscription_id] = (timeframe, list(dict.fromkeys(indicator_props)))
+        self._build_graph_props(timeframe)
+        return subscription_id
+
+    def unsubscribe(self, subscription_id: int) -> None:
+        """
+        Removes a subscription. The nodes no other strategy needs are removed from the graphs.
+
+        Args:
+            subscription_id (int): The id of the subscription.
+
+        Returns:
+            None
+        """
+        subscription = self._subscriptions.pop(subscription_id, None)
+        if subscription is not None:
+            self._build_graph_props(subscription[0])
+
+    def _build_graph_props(self, timeframe: str) -> None:
+        """
+        Rebuilds the deduplicated list of nodes of a timeframe from its subscriptions and updates the existing graphs.
+        Graphs that need new nodes are left out of sync, so they are warmed up again in the next data event.
+
+        Args:
+            timeframe (str): The timeframe.
+
+        Returns:
+            None
+        """
+        # Eliminamos duplicados manteniendo el orden (las propiedades son inmutables y hashables)
+        graph_props = list(dict.fromkeys(props for tf, indicator_props in self._subscriptions.values() if tf == timeframe for props in indicator_props))
+        self._graph_props[timeframe] = graph_props
+
+        for (symbol, tf), graph in self._graphs.items():
+            if tf != timeframe:
+                continue
+            for props in [props for props in graph if props not in graph_props]:
+                del graph[props]
+            if any(props not in graph for props in graph_props):
+                self._last_bar_datetime.pop((symbol, tf), None)
+
+    def get_warm_up_bars(self, timeframe: str) -> int:
+        """
+        Returns the number of historical bars needed to warm up all the nodes of a timeframe.
+        """
+        return max([props.warm_up_bars() for props in self._graph_props.get(timeframe, [])], default=1)
+
+    def _get_indicator_method(self, properties: BaseIndicatorProps) -> IIndicator:
+        """
+        Returns a new streaming indicator based on the provided properties.
+
+        Args:
+            properties (BaseIndicatorProps): The properties of the indicator.
+
+        Returns:
+            IIndicator: The streaming indicator.
+
+        Raises:
+            Exception: If the indicator properties are of an unknown type.
+        """
+        if isinstance(properties, SMAIndicatorProps):
+            return SMAIndicator(properties=properties)
+
+        elif isinstance(properties, EMAIndicatorProps):
+            return EMAIndicator(properties=properties)
+
+        elif isinstance(properties, RSIIndicatorProps):
+            return RSIIndicator(properties=properties)
+
+        elif isinstance(properties, MACDIndicatorProps):
+            return MACDIndicator(properties=properties)
+
+        elif isinstance(properties, ATRIndicatorProps):
+            return ATRIndicator(properties=properties)
+
+        elif isinstance(properties, BollingerIndicatorProps):
+            return BollingerIndicator(properties=properties)
+
+        elif isinstance(properties, RollingMinMaxIndicatorProps):
+            return RollingMinMaxIndicator(properties=properties)
+
+        else:
+            raise Exception(f"ERROR: Indicador desconocido: {properties}")
+
+    def warm_up(self, symbol: str, timeframe: str, bars: pd.DataFrame) -> None:
+        """
+        Rebuilds the graph of a symbol and timeframe and feeds its nodes with historical bars.
+
+        Args:
+            symbol (str): The symbol.
+            timeframe (str): The timeframe of the bars.
+            bars (pd.DataFrame): The historical closed bars, oldest first.
+
+        Returns:
+            None
+        """
+        key = (symbol, timeframe)
+        graph = {props: self._get_indicator_method(props) for props in self._graph_props.get(timeframe, [])}
+        self._graphs[key] = graph
+        self._last_bar_datetime.pop(key, None)
+
+        if bars is None or bars.empty:
+            return
+
+        highs = bars['high'].to_numpy(dtype=float).tolist()
+        lows = bars['low'].to_numpy(dtype=float).tolist()
+        closes = bars['close'].to_numpy(dtype=float).tolist()
+        for indicator in graph.values():
+            for high, low, close in zip(highs, lows, closes):
+                indicator.update(high, low, close)
+
+        # Cada nodo se ha evaluado una vez por vela del histórico
+        self.performed_computations += len(graph) * len(bars)
+        self._last_bar_datetime[key] = bars.index[-1]
+
+    def warm_up_symbols(self, timeframe: str, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Warms up the graphs of several symbols from bulk history. Graphs already in sync with the last bar of the
+        history (for example, warmed up by another strategy) are not computed again.
+
+        Args:
+            timeframe (str): The timeframe of the bars.
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, oldest first.
+
+        Returns:
+            None
+        """
+        for symbol, bars in history.items():
+            key = (symbol, timeframe)
+            if bars.empty:
+                continue
+            if self._last_bar_datetime.get(key) == bars.index[-1] and all(props in self._graphs[key] for props in self._graph_props.get(timeframe, [])):
+                continue
+            self.warm_up(symbol, timeframe, bars)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the graphs to be checkpointed.
+
+        Returns:
+            dict: The nodes of every graph and the bars they are in sync with.
+        """
+        return {
+            "graphs": self._graphs,
+            "last_bar_datetime": self._last_bar_datetime,
+            "last_event_datetime": self._last_event_datetime,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state. The restored graphs are reconciled with the current subscriptions: nodes
+        nobody needs are removed, and graphs missing nodes are warmed up again in the next data event.
+
+        Args:
+            state (dict): The state returned by get_state.
+
+        Returns:
+            None
+        """
+        self._graphs = {key: graph for key, graph in state["graphs"].items() if key[1] in self._graph_props}
+        self._last_bar_datetime = {key: value for key, value in state["last_bar_datetime"].items() if key in self._graphs}
+        self._last_event_datetime = {key: value for key, value in state["last_event_datetime"].items() if key in self._graphs}
+
+        for timeframe in self._graph_props:
+            self._build_graph_props(timeframe)
+
+    def update(self, symbol: str, timeframe: str, bar: pd.Series) -> bool:
+        """
+        Evaluates every node of the graph of a symbol and timeframe with the next closed bar, in O(1) per node.
+
+        Args:
+            symbol (str): The symbol.
+            timeframe (str): The timeframe of the bar.
+            bar (pd.Series): The closed bar, named by its time.
+
+        Returns:
+            bool: False if the graph has to be warmed up again before the update (never warmed up, new nodes, or at
+            least one bar may have been missed since the last update). True otherwise.
+        """
+        key = (symbol, timeframe)
+        last_bar_datetime = self._last_bar_datetime.get(key)
+        if last_bar_datetime is None:
+            return False
+
+        # Vela ya evaluada
+        if bar.name <= last_bar_datetime:
+            return True
+
+        # Si ha pasado más de una vela desde la última actualización puede que nos hayamos saltado alguna
+        if bar.name - last_bar_datetime > Utils.get_timeframe_timedelta(timeframe):
+            return False
+
+        self._apply_bar(key, bar)
+        return True
+
+    def _apply_bar(self, key: Tuple[str, str], bar: pd.Series) -> None:
+        """
+        Evaluates every node of a graph with a closed bar, without checking for missed bars.
+
+        Args:
+            key (Tuple[str, str]): The symbol and timeframe of the graph.
+            bar (pd.Series): The closed bar, named by its time.
+
+        Returns:
+            None
+        """
+        graph = self._graphs[key]
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        for indicator in graph.values():
+            indicator.update(high, low, close)
+
+        self.performed_computations += len(graph)
+        self._last_bar_datetime[key] = bar.name
+
+    def _catch_up(self, symbol: str, timeframe: str, bar: pd.Series, data_provider: DataProvider) -> bool:
+        """
+        Brings a graph up to date after a gap (a weekend, a bar without ticks or a missed event) by replaying only the
+        bars since the last evaluated one.
+
+        Args:
+            symbol (str): The symbol.
+            timeframe (str): The timeframe of the graph.
+            bar (pd.Series): The new closed bar.
+            data_provider (DataProvider): The data provider used to retrieve the missing bars.
+
+        Returns:
+            bool: False if the graph has to be warmed up again (never warmed up, new nodes, or a gap longer than the
+            warm-up history). True otherwise.
+        """
+        key = (symbol, timeframe)
+        last_bar_datetime = self._last_bar_datetime.get(key)
+        if last_bar_datetime is None or bar is None or bar.empty:
+            return False
+
+        timeframe_delta = Utils.get_timeframe_timedelta(timeframe)
+        num_bars = min(int((bar.name - last_bar_datetime) / timeframe_delta) + 1, self.get_warm_up_bars(timeframe))
+        bars = data_provider.get_latest_closed_bars(symbol, timeframe, num_bars)
+        if bars is None or bars.empty:
+            return False
+
+        # Si las velas recuperadas no llegan hasta la última evaluada, el hueco es mayor que el histórico
+        missing_bars = bars[bars.index > last_bar_datetime]
+        if len(missing_bars) == len(bars):
+            return False
+
+        for _, missing_bar in missing_bars.iterrows():
+            self._apply_bar(key, missing_bar)
+        return True
+
+    def on_data_event(self, subscription_id: int, data_event: DataEvent, data_provider: DataProvider) -> bool:
+        """
+        Brings the graph of the event symbol up to date for a subscriber. The first subscriber that receives a data event
+        evaluates the graph (warming it up from the history of the data provider when needed). The rest of subscribers of
+        the same timeframe reuse the memoized result for that bar.
+
+        Args:
+            subscription_id (int): The id of the subscription.
+            data_event (DataEvent): The data event with the new closed bar.
+            data_provider (DataProvider): The data provider used to retrieve the bars.
+
+        Returns:
+            bool: True if all the indicators of the subscription have a value.
+        """
+        timeframe, indicator_props = self._subscriptions[subscription_id]
+        symbol = data_event.symbol
+        key = (symbol, timeframe)
+        self.requested_computations += len(indicator_props)
+
+        # Memoización: el grafo ya se ha evaluado para la vela de este evento
+        if key in self._last_bar_datetime and self._last_event_datetime.get(key) == data_event.data.name:
+            return self.is_ready(symbol, timeframe, indicator_props)
+
+        # La vela del evento solo sirve si es del mismo timeframe que los indicadores
+        if data_provider.timeframe == timeframe:
+            bar = data_event.data
+        else:
+            bar = data_provider.get_latest_closed_bar(symbol, timeframe)
+
+        if bar is None or bar.empty or not self.update(symbol, timeframe, bar):
+            # Tras un hueco procesamos solo las velas que faltan; si no es posible, calentamos el grafo de nuevo
+            if not self._catch_up(symbol, timeframe, bar, data_provider):
+                bars = data_provider.get_latest_closed_bars(symbol, timeframe, self.get_warm_up_bars(timeframe))
+                self.warm_up(symbol, timeframe, bars)
+
+        self._last_event_datetime[key] = data_event.data.name
+        return self.is_ready(symbol, timeframe, indicator_props)
+
+    def is_ready(self, symbol: str, timeframe: str, indicator_props: List[BaseIndicatorProps] | None = None) -> bool:
+        """
+        Returns True if the given indicators (all the nodes of the graph if None) of a symbol and timeframe have a value.
+        """
+        graph = self._graphs.get((symbol, timeframe))
+        if graph is None:
+            return False
+        if indicator_props is None:
+            return all(indicator.is_ready for indicator in graph.values())
+        return all(props in graph and graph[props].is_ready for props in indicator_props)
+
+    def get_value(self, symbol: str, timeframe: str, properties: BaseIndicatorProps) -> float | Tuple[float, ...]:
+        """
+        Returns the current value of an indicator node.
+
+        Args:
+            symbol (str): The symbol.
+            timeframe (str): The timeframe.
+            properties (BaseIndicatorProps): The properties of the indicator.
+
+        Returns:
+            float | Tuple[float, ...]: The value of the indicator after the last evaluated bar.
+        """
+        return self._graphs[(symbol, timeframe)][properties].value
+
+    def get_statistics(self) -> Dict[str, int]:
+        """
+        Returns the statistics of the engine.
+
+        Returns:
+            Dict[str, int]: The number of nodes of all the graphs, the indicator computations requested by the
+            subscribers, the computations actually performed and the computations saved by the deduplication.
+        """
+        return {
+            "subscriptions": len(self._subscriptions),
+            "nodes": sum(len(graph) for graph in self._graphs.values()),
+            "requested_computations": self.requested_computations,
+            "performed_computations": self.performed_computations,
+            "saved_computations": max(self.requested_computations - self.performed_computations, 0),
+        }
@@ -0,0 +1,16 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from typing import Protocol, Tuple
+
+class IIndicator(Protocol):
+
+    @property
+    def is_ready(self) -> bool:
+        ...
+
+    @property
+    def value(self) -> float | Tuple[float, ...]:
+        ...
+
+    def update(self, high: float, low: float, close: float) -> float | Tuple[float, ...]:
+        ...
@@ -0,0 +1,108 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class BaseIndicatorProps(BaseModel):
+    """
+    Base class for the indicator properties. They are immutable so they can be used as keys of the indicator state.
+    """
+
+    class Config:
+        frozen = True
+
+    def warm_up_bars(self) -> int:
+        """
+        Returns the number of historical bars needed to warm up the indicator.
+        """
+        return 1
+
+class SMAIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of a simple moving average of the close.
+
+    Attributes:
+        period (int): The number of bars of the average.
+    """
+    period: int
+
+    def warm_up_bars(self) -> int:
+        return self.period
+
+class EMAIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of an exponential moving average of the close, seeded with the SMA of the first period bars.
+
+    Attributes:
+        period (int): The period of the average (alpha = 2 / (period + 1)).
+    """
+    period: int
+
+    def warm_up_bars(self) -> int:
+        # Con 10 periodos el peso de la semilla es despreciable
+        return 10 * self.period
+
+class RSIIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of the RSI with Wilder smoothing.
+
+    Attributes:
+        period (int): The period of the RSI.
+    """
+    period: int
+
+    def warm_up_bars(self) -> int:
+        return 10 * self.period + 1
+
+class MACDIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of the MACD.
+
+    Attributes:
+        fast_period (int): The period of the fast EMA.
+        slow_period (int): The period of the slow EMA.
+        signal_period (int): The period of the EMA of the MACD line (signal line).
+    """
+    fast_period: int = 12
+    slow_period: int = 26
+    signal_period: int = 9
+
+    def warm_up_bars(self) -> int:
+        return 10 * (self.slow_period + self.signal_period)
+
+class ATRIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of the Average True Range with Wilder smoothing.
+
+    Attributes:
+        period (int): The period of the ATR.
+    """
+    period: int = 14
+
+    def warm_up_bars(self) -> int:
+        return 10 * self.period + 1
+
+class BollingerIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of the Bollinger Bands.
+
+    Attributes:
+        period (int): The number of bars of the middle band (SMA of the close).
+        num_std (float): The number of standard deviations of the upper and lower bands.
+    """
+    period: int = 20
+    num_std: float = 2.0
+
+    def warm_up_bars(self) -> int:
+        return self.period
+
+class RollingMinMaxIndicatorProps(BaseIndicatorProps):
+    """
+    Properties of the rolling minimum of the lows and maximum of the highs.
+
+    Attributes:
+        period (int): The number of bars of the window.
+    """
+    period: int
+
+    def warm_up_bars(self) -> int:
+        return self.period
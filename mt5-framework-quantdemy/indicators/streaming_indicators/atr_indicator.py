@@ -0,0 +1,51 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import ATRIndicatorProps, EMAIndicatorProps
+from .ema_indicator import EMAIndicator
+import math
+
+class ATRIndicator(IIndicator):
+
+    def __init__(self, properties: ATRIndicatorProps):
+        """
+        Initializes the ATRIndicator object.
+
+        The true range is smoothed with Wilder smoothing (alpha = 1 / period), seeded with the simple average of the
+        first period true ranges. The true range of the first bar is its high - low.
+
+        Args:
+            properties (ATRIndicatorProps): The properties of the indicator.
+        """
+        self.period = properties.period if properties.period > 0 else 1
+
+        self._average_tr = EMAIndicator(EMAIndicatorProps(period=self.period), alpha=1.0 / self.period)
+        self._last_close: float = math.nan
+
+    @property
+    def is_ready(self) -> bool:
+        return self._average_tr.is_ready
+
+    @property
+    def value(self) -> float:
+        return self._average_tr.value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            float: The ATR (NaN during the warm-up).
+        """
+        if math.isnan(self._last_close):
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self._last_close), abs(low - self._last_close))
+
+        self._last_close = close
+        return self._average_tr.update_value(true_range)
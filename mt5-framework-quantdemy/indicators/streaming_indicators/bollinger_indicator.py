@@ -0,0 +1,78 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import BollingerIndicatorProps
+from typing import Tuple
+import math
+
+class BollingerIndicator(IIndicator):
+
+    def __init__(self, properties: BollingerIndicatorProps):
+        """
+        Initializes the BollingerIndicator object.
+
+        The mean and the (population) standard deviation of the window are kept with Welford's algorithm over a ring
+        buffer, adding the new close and removing the oldest one in O(1).
+
+        Args:
+            properties (BollingerIndicatorProps): The properties of the indicator.
+        """
+        self.period = properties.period if properties.period > 1 else 2
+        self.num_std = properties.num_std
+
+        self._buffer = [0.0] * self.period
+        self._pos: int = 0
+        self._count: int = 0
+        self._mean: float = 0.0
+        self._m2: float = 0.0
+        self._value: Tuple[float, float, float] = (math.nan, math.nan, math.nan)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        return self._value
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            Tuple[float, float, float]: The lower, middle and upper bands (NaN during the warm-up).
+        """
+        # Si la ventana está llena, eliminamos el valor más antiguo (Welford inverso)
+        if self._count >= self.period:
+            old = self._buffer[self._pos]
+            delta = old - self._mean
+            self._mean -= delta / (self.period - 1)
+            self._m2 -= delta * (old - self._mean)
+            count = self.period - 1
+        else:
+            count = self._count
+
+        # Añadimos el nuevo valor (Welford)
+        self._buffer[self._pos] = close
+        self._pos = (self._pos + 1) % self.period
+        self._count += 1
+        count += 1
+        delta = close - self._mean
+        self._mean += delta / count
+        self._m2 += delta * (close - self._mean)
+
+        # Cada vuelta completa del buffer recalculamos el estado para que no se acumule error de redondeo
+        if self._pos == 0:
+            self._mean = math.fsum(self._buffer) / self.period
+            self._m2 = math.fsum((value - self._mean) ** 2 for value in self._buffer)
+
+        if self._count >= self.period:
+            std = math.sqrt(max(self._m2, 0.0) / self.period)
+            self._value = (self._mean - self.num_std * std, self._mean, self._mean + self.num_std * std)
+
+        return self._value
@@ -0,0 +1,70 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import EMAIndicatorProps
+import math
+
+class EMAIndicator(IIndicator):
+
+    def __init__(self, properties: EMAIndicatorProps, alpha: float | None = None):
+        """
+        Initializes the EMAIndicator object.
+
+        The average is seeded with the SMA of the first period values and then updated recursively in O(1).
+
+        Args:
+            properties (EMAIndicatorProps): The properties of the indicator.
+            alpha (float | None): The smoothing factor. If None, 2 / (period + 1) is used (1 / period gives Wilder smoothing).
+        """
+        self.period = properties.period if properties.period > 0 else 1
+        self.alpha = alpha if alpha is not None else 2.0 / (self.period + 1)
+
+        self._count: int = 0
+        self._seed_sum: float = 0.0
+        self._value: float = math.nan
+
+    @property
+    def is_ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            float: The EMA of the closes (NaN during the warm-up).
+        """
+        return self.update_value(close)
+
+    def update_value(self, value: float) -> float:
+        """
+        Updates the average with a new value.
+
+        Args:
+            value (float): The new value.
+
+        Returns:
+            float: The EMA of the values (NaN during the warm-up).
+        """
+        self._count += 1
+
+        if self._count < self.period:
+            self._seed_sum += value
+
+        elif self._count == self.period:
+            # Semilla: media simple de los primeros valores
+            self._value = (self._seed_sum + value) / self.period
+
+        else:
+            self._value = (1.0 - self.alpha) * self._value + self.alpha * value
+
+        return self._value
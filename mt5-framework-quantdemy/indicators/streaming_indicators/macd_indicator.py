@@ -0,0 +1,58 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import MACDIndicatorProps, EMAIndicatorProps
+from .ema_indicator import EMAIndicator
+from typing import Tuple
+import math
+
+class MACDIndicator(IIndicator):
+
+    def __init__(self, properties: MACDIndicatorProps):
+        """
+        Initializes the MACDIndicator object.
+
+        Args:
+            properties (MACDIndicatorProps): The properties of the indicator.
+
+        Raises:
+            Exception: If the fast period is greater than or equal to the slow period.
+        """
+        if properties.fast_period >= properties.slow_period:
+            raise Exception(f"ERROR: el periodo rápido ({properties.fast_period}) es mayor o igual al periodo lento ({properties.slow_period}) para el cálculo del MACD")
+
+        self._fast_ema = EMAIndicator(EMAIndicatorProps(period=properties.fast_period))
+        self._slow_ema = EMAIndicator(EMAIndicatorProps(period=properties.slow_period))
+        self._signal_ema = EMAIndicator(EMAIndicatorProps(period=properties.signal_period))
+        self._value: Tuple[float, float, float] = (math.nan, math.nan, math.nan)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._signal_ema.is_ready
+
+    @property
+    def value(self) -> Tuple[float, float, float]:
+        return self._value
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            Tuple[float, float, float]: The MACD line, the signal line and the histogram (NaN during the warm-up).
+        """
+        fast = self._fast_ema.update_value(close)
+        slow = self._slow_ema.update_value(close)
+
+        # La línea de señal empieza a calcularse cuando la EMA lenta ya tiene valor
+        if self._slow_ema.is_ready:
+            macd = fast - slow
+            signal = self._signal_ema.update_value(macd)
+            self._value = (macd, signal, macd - signal)
+
+        return self._value
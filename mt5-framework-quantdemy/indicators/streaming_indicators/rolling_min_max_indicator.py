@@ -0,0 +1,70 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import RollingMinMaxIndicatorProps
+from collections import deque
+from typing import Tuple
+import math
+
+class RollingMinMaxIndicator(IIndicator):
+
+    def __init__(self, properties: RollingMinMaxIndicatorProps):
+        """
+        Initializes the RollingMinMaxIndicator object.
+
+        The minimum of the lows and the maximum of the highs of the window are kept with monotonic queues, so each
+        update costs O(1) amortized.
+
+        Args:
+            properties (RollingMinMaxIndicatorProps): The properties of the indicator.
+        """
+        self.period = properties.period if properties.period > 0 else 1
+
+        # Colas monotónicas de (índice de la vela, precio)
+        self._lows: deque = deque()
+        self._highs: deque = deque()
+        self._count: int = 0
+        self._value: Tuple[float, float] = (math.nan, math.nan)
+
+    @property
+    def is_ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> Tuple[float, float]:
+        return self._value
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float]:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            Tuple[float, float]: The minimum low and the maximum high of the window (NaN during the warm-up).
+        """
+        index = self._count
+        self._count += 1
+
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((index, low))
+
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((index, high))
+
+        # Descartamos las velas que ya han salido de la ventana
+        oldest = index - self.period + 1
+        if self._lows[0][0] < oldest:
+            self._lows.popleft()
+        if self._highs[0][0] < oldest:
+            self._highs.popleft()
+
+        if self._count >= self.period:
+            self._value = (self._lows[0][1], self._highs[0][1])
+
+        return self._value
@@ -0,0 +1,74 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import RSIIndicatorProps, EMAIndicatorProps
+from .ema_indicator import EMAIndicator
+import math
+
+class RSIIndicator(IIndicator):
+
+    def __init__(self, properties: RSIIndicatorProps):
+        """
+        Initializes the RSIIndicator object.
+
+        Average gains and losses use Wilder smoothing (alpha = 1 / period), seeded with the simple average of the
+        first period changes.
+
+        Args:
+            properties (RSIIndicatorProps): The properties of the indicator.
+        """
+        self.period = properties.period if properties.period > 1 else 2
+
+        average_props = EMAIndicatorProps(period=self.period)
+        self._average_gain = EMAIndicator(average_props, alpha=1.0 / self.period)
+        self._average_loss = EMAIndicator(average_props, alpha=1.0 / self.period)
+        self._last_close: float = math.nan
+        self._value: float = math.nan
+
+    @property
+    def is_ready(self) -> bool:
+        return self._average_loss.is_ready
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    @staticmethod
+    def compute_rsi(average_gain: float, average_loss: float) -> float:
+        """
+        Computes the RSI from the average gain and loss.
+
+        Args:
+            average_gain (float): The average gain.
+            average_loss (float): The average loss.
+
+        Returns:
+            float: The RSI (100 when there are no losses, 50 when there are neither gains nor losses).
+        """
+        if average_loss > 0:
+            # RSI = 100 – [100 ÷ ( 1 + (Average Gain ÷ Average Loss))]
+            return 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+        return 100.0 if average_gain > 0 else 50.0
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            float: The RSI (NaN during the warm-up).
+        """
+        if not math.isnan(self._last_close):
+            delta = close - self._last_close
+            average_gain = self._average_gain.update_value(delta if delta > 0 else 0.0)
+            average_loss = self._average_loss.update_value(-delta if delta < 0 else 0.0)
+
+            if self._average_loss.is_ready:
+                self._value = self.compute_rsi(average_gain, average_loss)
+
+        self._last_close = close
+        return self._value
@@ -0,0 +1,70 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from ..interfaces.indicator_interface import IIndicator
+from ..properties.indicator_properties import SMAIndicatorProps
+import math
+
+class SMAIndicator(IIndicator):
+
+    def __init__(self, properties: SMAIndicatorProps):
+        """
+        Initializes the SMAIndicator object.
+
+        The average is kept as a running sum over a ring buffer of the last closes, so each update costs O(1).
+
+        Args:
+            properties (SMAIndicatorProps): The properties of the indicator.
+        """
+        self.period = properties.period if properties.period > 0 else 1
+
+        self._buffer = [0.0] * self.period
+        self._pos: int = 0
+        self._count: int = 0
+        self._sum: float = 0.0
+        self._value: float = math.nan
+
+    @property
+    def is_ready(self) -> bool:
+        return self._count >= self.period
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Updates the indicator with a new closed bar.
+
+        Args:
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+
+        Returns:
+            float: The SMA of the last period closes (NaN during the warm-up).
+        """
+        return self.update_value(close)
+
+    def update_value(self, value: float) -> float:
+        """
+        Updates the average with a new value.
+
+        Args:
+            value (float): The new value.
+
+        Returns:
+            float: The average of the last period values (NaN during the warm-up).
+        """
+        self._sum += value - self._buffer[self._pos]
+        self._buffer[self._pos] = value
+        self._pos = (self._pos + 1) % self.period
+        self._count += 1
+
+        # Cada vuelta completa del buffer recalculamos la suma para que no se acumule error de redondeo
+        if self._pos == 0:
+            self._sum = math.fsum(self._buffer)
+
+        if self._count >= self.period:
+            self._value = self._sum / self.period
+
+        return self._value
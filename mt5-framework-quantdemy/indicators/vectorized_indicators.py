@@ -0,0 +1,167 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.indicator_properties import (BaseIndicatorProps, SMAIndicatorProps, EMAIndicatorProps, RSIIndicatorProps, MACDIndicatorProps,
+                                              ATRIndicatorProps, BollingerIndicatorProps, RollingMinMaxIndicatorProps)
+from typing import Tuple
+import pandas as pd
+import numpy as np
+
+
+class VectorizedIndicators():
+    """
+    Vectorized versions of the streaming indicators, for backtests over the whole history at once.
+
+    Each method applies the same definitions (seeds, smoothing and warm-up) as its streaming counterpart, so the value at
+    each bar is the one the streaming indicator would return after being updated with that bar (up to floating point rounding).
+    """
+
+    @staticmethod
+    def compute(properties: BaseIndicatorProps, bars: pd.DataFrame) -> np.ndarray | Tuple[np.ndarray, ...]:
+        """
+        Computes the indicator defined by the given properties over the bars.
+
+        Args:
+            properties (BaseIndicatorProps): The properties of the indicator.
+            bars (pd.DataFrame): The bars, with 'high', 'low' and 'close' columns.
+
+        Returns:
+            np.ndarray | Tuple[np.ndarray, ...]: The values of the indicator at each bar (a tuple for multi-line indicators).
+
+        Raises:
+            Exception: If the indicator properties are of an unknown type.
+        """
+        close = bars['close'].to_numpy(dtype=float)
+
+        if isinstance(properties, SMAIndicatorProps):
+            return VectorizedIndicators.sma(close, properties.period)
+
+        elif isinstance(properties, EMAIndicatorProps):
+            return VectorizedIndicators.ema(close, properties.period)
+
+        elif isinstance(properties, RSIIndicatorProps):
+            return VectorizedIndicators.rsi(close, properties.period)
+
+        elif isinstance(properties, MACDIndicatorProps):
+            return VectorizedIndicators.macd(close, properties.fast_period, properties.slow_period, properties.signal_period)
+
+        elif isinstance(properties, ATRIndicatorProps):
+            return VectorizedIndicators.atr(bars['high'].to_numpy(dtype=float), bars['low'].to_numpy(dtype=float), close, properties.period)
+
+        elif isinstance(properties, BollingerIndicatorProps):
+            return VectorizedIndicators.bollinger(close, properties.period, properties.num_std)
+
+        elif isinstance(properties, RollingMinMaxIndicatorProps):
+            return VectorizedIndicators.rolling_min_max(bars['high'].to_numpy(dtype=float), bars['low'].to_numpy(dtype=float), properties.period)
+
+        else:
+            raise Exception(f"ERROR: Indicador desconocido: {properties}")
+
+    @staticmethod
+    def _seeded_ema(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+        """
+        Computes an exponential average seeded with the simple average of the first period valid values.
+
+        Args:
+            values (np.ndarray): The values. Leading NaNs are skipped.
+            period (int): The number of values of the seed.
+            alpha (float): The smoothing factor.
+
+        Returns:
+            np.ndarray: The exponential average (NaN until the seed is available).
+        """
+        values = np.asarray(values, dtype=float)
+        result = np.full(len(values), np.nan)
+
+        valid = np.flatnonzero(~np.isnan(values))
+        if len(valid) == 0:
+            return result
+
+        first = valid[0]
+        seed_idx = first + period - 1
+        if seed_idx >= len(values):
+            return result
+
+        smoothed = values[seed_idx:].copy()
+        smoothed[0] = values[first:seed_idx + 1].mean()
+        result[seed_idx:] = pd.Series(smoothed).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+        return result
+
+    @staticmethod
+    def sma(close: np.ndarray, period: int) -> np.ndarray:
+        """
+        Computes the simple moving average.
+        """
+        period = period if period > 0 else 1
+        return pd.Series(close, dtype=float).rolling(period).mean().to_numpy()
+
+    @staticmethod
+    def ema(close: np.ndarray, period: int) -> np.ndarray:
+        """
+        Computes the exponential moving average (alpha = 2 / (period + 1)) seeded with the SMA.
+        """
+        period = period if period > 0 else 1
+        return VectorizedIndicators._seeded_ema(close, period, 2.0 / (period + 1))
+
+    @staticmethod
+    def rsi(close: np.ndarray, period: int) -> np.ndarray:
+        """
+        Computes the RSI with Wilder smoothing.
+        """
+        period = period if period > 1 else 2
+        close = np.asarray(close, dtype=float)
+        deltas = np.concatenate(([np.nan], np.diff(close)))
+        gains = np.where(deltas > 0, deltas, 0.0)
+        losses = np.where(deltas < 0, -deltas, 0.0)
+        gains[0] = losses[0] = np.nan
+
+        average_gain = VectorizedIndicators._seeded_ema(gains, period, 1.0 / period)
+        average_loss = VectorizedIndicators._seeded_ema(losses, period, 1.0 / period)
+
+        # RSI = 100 – [100 ÷ ( 1 + (Average Gain ÷ Average Loss))], 100 sin pérdidas y 50 sin movimiento
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + average_gain / average_loss)
+        rsi = np.where(average_loss > 0, rsi, np.where(average_gain > 0, 100.0, 50.0))
+        return np.where(np.isnan(average_loss), np.nan, rsi)
+
+    @staticmethod
+    def macd(close: np.ndarray, fast_period: int, slow_period: int, signal_period: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes the MACD line, the signal line and the histogram.
+        """
+        macd = VectorizedIndicators.ema(close, fast_period) - VectorizedIndicators.ema(close, slow_period)
+        signal = VectorizedIndicators.ema(macd, signal_period)
+        return macd, signal, macd - signal
+
+    @staticmethod
+    def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+        """
+        Computes the Average True Range with Wilder smoothing.
+        """
+        period = period if period > 0 else 1
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        previous_close = np.concatenate(([np.nan], np.asarray(close, dtype=float)[:-1]))
+
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+        return VectorizedIndicators._seeded_ema(true_range, period, 1.0 / period)
+
+    @staticmethod
+    def bollinger(close: np.ndarray, period: int, num_std: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes the lower, middle and upper Bollinger Bands (population standard deviation).
+        """
+        period = period if period > 1 else 2
+        rolling = pd.Series(close, dtype=float).rolling(period)
+        middle = rolling.mean().to_numpy()
+        std = rolling.std(ddof=0).to_numpy()
+        return middle - num_std * std, middle, middle + num_std * std
+
+    @staticmethod
+    def rolling_min_max(high: np.ndarray, low: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the rolling minimum of the lows and maximum of the highs.
+        """
+        period = period if period > 0 else 1
+        rolling_min = pd.Series(low, dtype=float).rolling(period).min().to_numpy()
+        rolling_max = pd.Series(high, dtype=float).rolling(period).max().to_numpy()
+        return rolling_min, rolling_max
@@ -0,0 +1,222 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .quantile_sketch import QuantileSketch
+from .properties.market_statistics_properties import BarStatisticsProps
+from events.events import DataEvent
+from data_provider.data_provider import DataProvider
+from utils.utils import Utils
+from datetime import datetime
+from typing import Dict, Tuple
+import pandas as pd
+import math
+
+
+class BarStatisticsTracker():
+
+    # Estadísticos disponibles para cada vela
+    METRICS = ("spread", "tickvol", "true_range")
+
+    def __init__(self, properties: BarStatisticsProps):
+        """
+        Initializes the BarStatisticsTracker object.
+
+        For every symbol and metric, one quantile sketch is kept per hour of day (plus one for all hours, used while
+        an hour has too few samples), so the memory is bounded regardless of the number of bars seen.
+
+        Args:
+            properties (BarStatisticsProps): The properties of the tracker.
+        """
+        self.timeframe = properties.timeframe
+        self.quantiles = list(properties.quantiles)
+        self.min_samples = properties.min_samples
+        self.warm_up_bars = properties.warm_up_bars
+
+        # Sketches por (símbolo, métrica, hora). La hora None agrupa todas las horas del día
+        self._sketches: Dict[Tuple[str, str, int | None], QuantileSketch] = {}
+
+        # Último cierre (para el true range) y última vela procesada de cada símbolo
+        self._last_close: Dict[str, float] = {}
+        self.last_bar_datetime: Dict[str, datetime] = {}
+
+    def _get_sketch(self, symbol: str, metric: str, hour: int | None) -> QuantileSketch:
+        """
+        Returns the sketch of a symbol, metric and hour, creating it if it does not exist.
+        """
+        key = (symbol, metric, hour)
+        sketch = self._sketches.get(key)
+        if sketch is None:
+            sketch = QuantileSketch(self.quantiles)
+            self._sketches[key] = sketch
+        return sketch
+
+    def _add_bar(self, symbol: str, bar_datetime: datetime, high: float, low: float, close: float, tickvol: float, spread: float) -> None:
+        """
+        Adds the values of a closed bar of a symbol to its statistics. Bars not newer than the last one processed are ignored.
+
+        Args:
+            symbol (str): The symbol.
+            bar_datetime (datetime): The datetime of the bar.
+            high (float): The high of the bar.
+            low (float): The low of the bar.
+            close (float): The close of the bar.
+            tickvol (float): The tick volume of the bar.
+            spread (float): The spread of the bar, in points.
+
+        Returns:
+            None
+        """
+        if bar_datetime <= self.last_bar_datetime.get(symbol, datetime.min):
+            return
+
+        previous_close = self._last_close.get(symbol, close)
+        values = (("spread", spread), ("tickvol", tickvol), ("true_range", max(high, previous_close) - min(low, previous_close)))
+
+        hour = bar_datetime.hour
+        for metric, value in values:
+            self._get_sketch(symbol, metric, hour).update(value)
+            self._get_sketch(symbol, metric, None).update(value)
+
+        self._last_close[symbol] = close
+        self.last_bar_datetime[symbol] = bar_datetime
+
+    def update(self, symbol: str, bar: pd.Series) -> None:
+        """
+        Adds a closed bar of a symbol to its statistics.
+
+        Args:
+            symbol (str): The symbol.
+            bar (pd.Series): The closed bar, with 'high', 'low', 'close', 'tickvol' and 'spread' and named by its datetime.
+
+        Returns:
+            None
+        """
+        self._add_bar(symbol, bar.name, float(bar['high']), float(bar['low']), float(bar['close']), float(bar['tickvol']), float(bar['spread']))
+
+    def on_data_event(self, data_event: DataEvent, data_provider: DataProvider) -> None:
+        """
+        Updates the statistics with the bar of a data event. If the data provider works in another timeframe, the latest
+        closed bar in the tracker timeframe is retrieved instead.
+
+        Args:
+            data_event (DataEvent): The data event.
+            data_provider (DataProvider): The data provider.
+
+        Returns:
+            None
+        """
+        bar = data_event.data
+        if data_provider.timeframe != self.timeframe:
+            bar = data_provider.get_latest_closed_bar(data_event.symbol, self.timeframe)
+            if bar.empty:
+                return
+
+        self.update(data_event.symbol, bar)
+
+    def warm_up(self, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Builds the statistics from historical bars of several symbols.
+
+        Args:
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, oldest first.
+
+        Returns:
+            None
+        """
+        for symbol, bars in history.items():
+            columns = [bars[column].to_numpy(dtype=float).tolist() for column in ('high', 'low', 'close', 'tickvol', 'spread')]
+            for bar_datetime, high, low, close, tickvol, spread in zip(bars.index, *columns):
+                self._add_bar(symbol, bar_datetime, high, low, close, tickvol, spread)
+
+        print(f"{Utils.dateprint()} - Estadísticos de spread y volatilidad inicializados para {len(history)} símbolos")
+
+    def _get_valid_sketch(self, symbol: str, metric: str, hour: int | None) -> QuantileSketch | None:
+        """
+        Returns the sketch with enough samples to answer about a symbol, metric and hour: the one of the hour or, if it
+        has too few samples, the one of all hours.
+
+        Raises:
+            Exception: If the metric is unknown.
+        """
+        if metric not in self.METRICS:
+            raise Exception(f"ERROR: Estadístico desconocido: {metric}")
+
+        for key in ((symbol, metric, hour), (symbol, metric, None)):
+            sketch = self._sketches.get(key)
+            if sketch is not None and sketch.count >= self.min_samples:
+                return sketch
+        return None
+
+    def get_quantile(self, symbol: str, metric: str, q: float, hour: int | None = None) -> float:
+        """
+        Returns the estimate of a quantile of a metric of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+            metric (str): The metric ("spread", "tickvol" or "true_range").
+            q (float): The quantile, between 0 and 1.
+            hour (int | None): The hour of day (in the time of the bars). If None, all hours.
+
+        Returns:
+            float: The estimate, or NaN if there are not enough samples yet.
+        """
+        sketch = self._get_valid_sketch(symbol, metric, hour)
+        return sketch.get_quantile(q) if sketch is not None else math.nan
+
+    def get_rank(self, symbol: str, metric: str, value: float, hour: int | None = None) -> float:
+        """
+        Returns the estimated percentile rank (between 0 and 1) of a value of a metric of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+            metric (str): The metric ("spread", "tickvol" or "true_range").
+            value (float): The value.
+            hour (int | None): The hour of day (in the time of the bars). If None, all hours.
+
+        Returns:
+            float: The rank, or NaN if there are not enough samples yet.
+        """
+        sketch = self._get_valid_sketch(symbol, metric, hour)
+        return sketch.get_rank(value) if sketch is not None else math.nan
+
+    def is_above_quantile(self, symbol: str, metric: str, value: float, q: float, hour: int | None = None) -> bool:
+        """
+        Checks if a value of a metric is above a quantile, e.g. if the current spread is abnormally wide for this hour.
+
+        Args:
+            symbol (str): The symbol.
+            metric (str): The metric ("spread", "tickvol" or "true_range").
+            value (float): The current value.
+            q (float): The quantile, between 0 and 1.
+            hour (int | None): The hour of day (in the time of the bars). If None, all hours.
+
+        Returns:
+            bool: True if the value is above the quantile. False if it is not, or if there are not enough samples yet.
+        """
+        quantile = self.get_quantile(symbol, metric, q, hour)
+        return not math.isnan(quantile) and value > quantile
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the tracker to be checkpointed.
+        """
+        return {
+            "quantiles": self.quantiles,
+            "sketches": {key: sketch.get_state() for key, sketch in self._sketches.items()},
+            "last_close": dict(self._last_close),
+            "last_bar_datetime": dict(self.last_bar_datetime),
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state. It is ignored if the tracked quantiles have changed.
+        """
+        if state["quantiles"] != self.quantiles:
+            return
+
+        self._sketches = {}
+        for key, sketch_state in state["sketches"].items():
+            sketch = QuantileSketch(self.quantiles)
+            sketch.set_state(sketch_state)
+            self._sketches[key] = sketch
+        self._last_close = dict(state["last_close"])
+        self.last_bar_datetime = dict(state["last_bar_datetime"])
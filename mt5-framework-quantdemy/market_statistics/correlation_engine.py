@@ -0,0 +1,314 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.market_statistics_properties import CorrelationEngineProps
+from events.events import DataEvent
+from data_provider.data_provider import DataProvider
+from datetime import datetime
+from typing import Dict
+import pandas as pd
+import numpy as np
+
+
+class CorrelationEngine():
+
+    def __init__(self, properties: CorrelationEngineProps):
+        """
+        Initializes the CorrelationEngine object.
+
+        The log returns of every symbol are kept in a shared ring buffer (one row per bar, one column per symbol).
+        On each bar, the sums and the cross-product matrix of the window are updated with two rank-one updates (add
+        the new row, remove the oldest one), so the cost is O(n²) in the number of symbols instead of recomputing
+        the statistics over the whole window.
+
+        Args:
+            properties (CorrelationEngineProps): The properties of the engine.
+        """
+        self.symbols = list(properties.symbols)
+        self.timeframe = properties.timeframe
+        self.window = properties.window if properties.window > 2 else 3
+        self._index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        # Ventana móvil de retornos compartida por todos los símbolos
+        self._returns = np.zeros((self.window, n))
+        self._pos: int = 0
+        self._count: int = 0
+
+        # Estadísticos suficientes de la ventana: suma de retornos y matriz de productos cruzados
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._updates_since_refresh: int = 0
+
+        # Vela en curso: cierres recibidos de cada símbolo hasta que se completa
+        self._last_close = np.full(n, np.nan)
+        self._pending_datetime: datetime = datetime.min
+        self._pending_close = np.full(n, np.nan)
+        self._pending_count: int = 0
+        self.last_bar_datetime: datetime = datetime.min
+
+        # Caché de la matriz de correlación (se recalcula como mucho una vez por vela)
+        self._correlation: np.ndarray | None = None
+
+        # Versión de los estadísticos: se incrementa con cada cambio de la ventana, para que otros módulos detecten cuándo recalcular
+        self.version: int = 0
+
+    def _add_returns(self, returns: np.ndarray) -> None:
+        """
+        Adds a row of returns to the rolling window, removing the oldest one when the window is full.
+
+        Args:
+            returns (np.ndarray): The return of every symbol in the new bar.
+
+        Returns:
+            None
+        """
+        if self._count == self.window:
+            old = self._returns[self._pos]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        else:
+            self._count += 1
+
+        self._returns[self._pos] = returns
+        self._pos = (self._pos + 1) % self.window
+        self._sum += returns
+        self._cross += np.outer(returns, returns)
+        self._correlation = None
+        self.version += 1
+
+        # Recalculamos los estadísticos desde la ventana periódicamente para eliminar el error acumulado
+        self._updates_since_refresh += 1
+        if self._updates_since_refresh >= self.window:
+            self._refresh()
+
+    def _refresh(self) -> None:
+        """
+        Recomputes the sums and the cross-product matrix from the returns in the window.
+
+        Returns:
+            None
+        """
+        returns = self._returns if self._count == self.window else self._returns[:self._count]
+        self._sum = returns.sum(axis=0)
+        self._cross = returns.T @ returns
+        self._updates_since_refresh = 0
+
+    def _commit_bar(self) -> None:
+        """
+        Closes the pending bar: computes the return of every symbol and adds them to the window. The symbols that did
+        not report the bar keep their last close (zero return).
+
+        Returns:
+            None
+        """
+        close = np.where(np.isnan(self._pending_close), self._last_close, self._pending_close)
+
+        # La primera vela de cada símbolo solo sirve como referencia del cierre
+        if not np.isnan(self._last_close).all():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                returns = np.log(close / self._last_close)
+            self._add_returns(np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0))
+
+        self._last_close = close
+        self.last_bar_datetime = self._pending_datetime
+        self._pending_close.fill(np.nan)
+        self._pending_count = 0
+
+    def update(self, symbol: str, bar_datetime: datetime, close: float) -> None:
+        """
+        Adds the close of a symbol in a bar. The row of returns is added to the window when every symbol has reported
+        the bar, or when the first close of a newer bar arrives.
+
+        Args:
+            symbol (str): The symbol.
+            bar_datetime (datetime): The datetime of the bar.
+            close (float): The close price of the bar.
+
+        Returns:
+            None
+        """
+        i = self._index.get(symbol)
+        if i is None or bar_datetime <= self.last_bar_datetime:
+            return
+
+        if self._pending_count > 0 and bar_datetime > self._pending_datetime:
+            self._commit_bar()
+
+        if np.isnan(self._pending_close[i]):
+            self._pending_count += 1
+        self._pending_close[i] = close
+        self._pending_datetime = bar_datetime
+
+        if self._pending_count == len(self.symbols):
+            self._commit_bar()
+
+    def on_data_event(self, data_event: DataEvent, data_provider: DataProvider) -> None:
+        """
+        Updates the engine with the bar of a data event. If the data provider works in another timeframe, the latest
+        closed bar in the engine timeframe is retrieved instead.
+
+        Args:
+            data_event (DataEvent): The data event.
+            data_provider (DataProvider): The data provider.
+
+        Returns:
+            None
+        """
+        bar = data_event.data
+        if data_provider.timeframe != self.timeframe:
+            bar = data_provider.get_latest_closed_bar(data_event.symbol, self.timeframe)
+            if bar.empty:
+                return
+
+        self.update(data_event.symbol, bar.name, float(bar['close']))
+
+    def warm_up(self, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Fills the rolling window from historical bars of the symbols, aligned by time.
+
+        Args:
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, in the engine timeframe.
+
+        Returns:
+            None
+        """
+        closes = pd.DataFrame({symbol: bars['close'] for symbol, bars in history.items() if symbol in self._index and not bars.empty})
+        if closes.empty:
+            return
+
+        # Alineamos los cierres por tiempo (arrastrando el último cierre de cada símbolo) y calculamos los retornos
+        closes = closes.reindex(columns=self.symbols).sort_index().ffill().iloc[-(self.window + 1):]
+        returns = np.nan_to_num(np.log(closes.to_numpy(dtype=float)[1:] / closes.to_numpy(dtype=float)[:-1]), nan=0.0, posinf=0.0, neginf=0.0)
+
+        count = len(returns)
+        self._returns.fill(0.0)
+        self._returns[:count] = returns
+        self._pos = count % self.window
+        self._count = count
+        self._refresh()
+        self._correlation = None
+        self.version += 1
+
+        self._last_close = closes.iloc[-1].to_numpy(dtype=float)
+        self.last_bar_datetime = closes.index[-1]
+        self._pending_close.fill(np.nan)
+        self._pending_count = 0
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        Returns True if the rolling window is full.
+        """
+        return self._count == self.window
+
+    def get_mean(self) -> pd.Series:
+        """
+        Returns the mean return of every symbol in the rolling window.
+        """
+        mean = self._sum / self._count if self._count > 0 else np.zeros(len(self.symbols))
+        return pd.Series(mean, index=self.symbols)
+
+    def _get_covariance_array(self) -> np.ndarray:
+        """
+        Returns the sample covariance matrix of the returns in the rolling window, as an array.
+        """
+        n = len(self.symbols)
+        if self._count < 2:
+            return np.zeros((n, n))
+        return (self._cross - np.outer(self._sum, self._sum) / self._count) / (self._count - 1)
+
+    def get_covariance_matrix(self) -> np.ndarray:
+        """
+        Returns the sample covariance matrix of the returns in the rolling window, as an array in the order of the symbols.
+        """
+        return self._get_covariance_array()
+
+    def get_covariance(self) -> pd.DataFrame:
+        """
+        Returns the sample covariance matrix of the returns in the rolling window.
+
+        Returns:
+            pd.DataFrame: The covariance matrix, indexed by symbol in both axes.
+        """
+        return pd.DataFrame(self._get_covariance_array(), index=self.symbols, columns=self.symbols)
+
+    def get_volatility(self) -> pd.Series:
+        """
+        Returns the standard deviation of the returns of every symbol in the rolling window (per bar).
+        """
+        return pd.Series(np.sqrt(np.maximum(np.diag(self._get_covariance_array()), 0.0)), index=self.symbols)
+
+    def get_correlation_matrix(self) -> np.ndarray:
+        """
+        Returns the correlation matrix of the returns in the rolling window, as an array in the order of the symbols.
+        Symbols without variance have zero correlation with the rest.
+
+        Returns:
+            np.ndarray: The correlation matrix. It must not be modified, as it is cached until the next bar.
+        """
+        if self._correlation is None:
+            covariance = self._get_covariance_array()
+            std = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = covariance / np.outer(std, std)
+            correlation = np.clip(np.nan_to_num(correlation, nan=0.0, posinf=0.0, neginf=0.0), -1.0, 1.0)
+            np.fill_diagonal(correlation, 1.0)
+            self._correlation = correlation
+
+        return self._correlation
+
+    def get_correlation(self) -> pd.DataFrame:
+        """
+        Returns the correlation matrix of the returns in the rolling window.
+
+        Returns:
+            pd.DataFrame: The correlation matrix, indexed by symbol in both axes.
+        """
+        return pd.DataFrame(self.get_correlation_matrix(), index=self.symbols, columns=self.symbols)
+
+    def get_pair_correlation(self, symbol_a: str, symbol_b: str) -> float:
+        """
+        Returns the correlation between the returns of two symbols.
+
+        Args:
+            symbol_a (str): The first symbol.
+            symbol_b (str): The second symbol.
+
+        Returns:
+            float: The correlation, or 0.0 if any of the symbols is not tracked.
+        """
+        if symbol_a not in self._index or symbol_b not in self._index:
+            return 0.0
+        return float(self.get_correlation_matrix()[self._index[symbol_a], self._index[symbol_b]])
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the engine to be checkpointed.
+        """
+        return {
+            "symbols": self.symbols,
+            "window": self.window,
+            "returns": self._returns,
+            "pos": self._pos,
+            "count": self._count,
+            "last_close": self._last_close,
+            "last_bar_datetime": self.last_bar_datetime,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state. It is ignored if the universe or the window have changed.
+        """
+        if state["symbols"] != self.symbols or state["window"] != self.window:
+            return
+
+        self._returns = np.array(state["returns"], dtype=float)
+        self._pos = state["pos"]
+        self._count = state["count"]
+        self._last_close = np.array(state["last_close"], dtype=float)
+        self.last_bar_datetime = state["last_bar_datetime"]
+        self._pending_close.fill(np.nan)
+        self._pending_count = 0
+        self._refresh()
+        self._correlation = None
+        self.version += 1
@@ -0,0 +1,31 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class CorrelationEngineProps(BaseModel):
+    """
+    Properties for the incremental correlation engine.
+
+    Attributes:
+        symbols (list[str]): The traded universe.
+        timeframe (str): The timeframe of the bars whose returns are tracked.
+        window (int): The number of bar returns of the rolling window.
+    """
+    symbols: list[str]
+    timeframe: str
+    window: int = 500
+
+class BarStatisticsProps(BaseModel):
+    """
+    Properties for the streaming statistics of spread, tick volume and true range per symbol and hour of day.
+
+    Attributes:
+        timeframe (str): The timeframe of the bars whose statistics are tracked.
+        quantiles (list[float]): The quantiles tracked exactly by the sketches (the rest are interpolated).
+        min_samples (int): The minimum number of bars of a symbol and hour before its statistics are used.
+        warm_up_bars (int): The number of historical bars used to build the statistics on start.
+    """
+    timeframe: str
+    quantiles: list[float] = [0.5, 0.9, 0.95, 0.99]
+    min_samples: int = 30
+    warm_up_bars: int = 10000
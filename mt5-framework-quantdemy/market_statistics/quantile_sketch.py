@@ -0,0 +1,176 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from typing import List
+import bisect
+import math
+
+
+class QuantileSketch():
+
+    def __init__(self, quantiles: List[float]):
+        """
+        Initializes the QuantileSketch object: a streaming estimator of several quantiles with constant memory
+        (the extended P² algorithm of Jain & Chlamtac / Raatikainen).
+
+        A marker is kept at every tracked quantile, at the midpoints between them, and at the minimum and maximum.
+        Each new value moves the marker heights with a piecewise-parabolic interpolation, so the cost of an update
+        is O(markers) and no value is stored.
+
+        Args:
+            quantiles (List[float]): The quantiles to be tracked, between 0 and 1.
+        """
+        quantiles = sorted(set(q for q in quantiles if 0.0 < q < 1.0))
+
+        # Probabilidades de los marcadores: 0, puntos medios, cuantiles y 1
+        probabilities = [0.0]
+        for q in quantiles:
+            probabilities.append((probabilities[-1] + q) / 2.0)
+            probabilities.append(q)
+        probabilities.append((probabilities[-1] + 1.0) / 2.0)
+        probabilities.append(1.0)
+        self.probabilities: List[float] = probabilities
+
+        # Alturas, posiciones reales y posiciones deseadas de los marcadores
+        self.heights: List[float] = []
+        self.positions: List[float] = []
+        self.desired: List[float] = []
+        self.count: int = 0
+
+    def update(self, value: float) -> None:
+        """
+        Adds a value to the sketch.
+
+        Args:
+            value (float): The new value.
+
+        Returns:
+            None
+        """
+        m = len(self.probabilities)
+        self.count += 1
+
+        # Mientras no hay un valor por marcador, guardamos los valores ordenados
+        if self.count <= m:
+            bisect.insort(self.heights, value)
+            if self.count == m:
+                self.positions = [float(i + 1) for i in range(m)]
+                self.desired = [1.0 + (m - 1) * p for p in self.probabilities]
+            return
+
+        heights = self.heights
+        positions = self.positions
+
+        # Celda del nuevo valor (ampliando los extremos si es necesario)
+        if value < heights[0]:
+            heights[0] = value
+            k = 0
+        elif value >= heights[-1]:
+            heights[-1] = value
+            k = m - 2
+        else:
+            k = bisect.bisect_right(heights, value) - 1
+
+        for i in range(k + 1, m):
+            positions[i] += 1.0
+        for i in range(m):
+            self.desired[i] += self.probabilities[i]
+
+        # Ajuste de los marcadores interiores que se han alejado de su posición deseada
+        for i in range(1, m - 1):
+            d = self.desired[i] - positions[i]
+            if (d >= 1.0 and positions[i + 1] - positions[i] > 1.0) or (d <= -1.0 and positions[i - 1] - positions[i] < -1.0):
+                d = 1.0 if d > 0.0 else -1.0
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    j = i + int(d)
+                    height = heights[i] + d * (heights[j] - heights[i]) / (positions[j] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i: int, d: float) -> float:
+        """
+        Returns the piecewise-parabolic prediction of the height of a marker moved d positions.
+
+        Args:
+            i (int): The index of the marker.
+            d (float): The movement (+1 or -1).
+
+        Returns:
+            float: The new height of the marker.
+        """
+        h, n = self.heights, self.positions
+        return h[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1]))
+
+    def get_quantile(self, q: float) -> float:
+        """
+        Returns the estimate of a quantile. Tracked quantiles are read from their marker, the rest are interpolated
+        between the neighbouring markers.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimate, or NaN if the sketch is empty.
+        """
+        if self.count == 0:
+            return math.nan
+
+        q = min(max(q, 0.0), 1.0)
+        if self.count < len(self.probabilities):
+            # Cuantil exacto de los valores guardados
+            position = q * (self.count - 1)
+            lower = int(position)
+            upper = min(lower + 1, self.count - 1)
+            return self.heights[lower] + (position - lower) * (self.heights[upper] - self.heights[lower])
+
+        i = bisect.bisect_right(self.probabilities, q) - 1
+        if i >= len(self.probabilities) - 1:
+            return self.heights[-1]
+        p0, p1 = self.probabilities[i], self.probabilities[i + 1]
+        return self.heights[i] + (q - p0) / (p1 - p0) * (self.heights[i + 1] - self.heights[i])
+
+    def get_rank(self, value: float) -> float:
+        """
+        Returns the estimated fraction of values lower than or equal to the given one (its percentile rank).
+
+        Args:
+            value (float): The value.
+
+        Returns:
+            float: The rank, between 0 and 1, or NaN if the sketch is empty.
+        """
+        if self.count == 0:
+            return math.nan
+
+        if self.count < len(self.probabilities):
+            return bisect.bisect_right(self.heights, value) / self.count
+
+        heights = self.heights
+        if value < heights[0]:
+            return 0.0
+        if value >= heights[-1]:
+            return 1.0
+        i = bisect.bisect_right(heights, value) - 1
+        p0, p1 = self.probabilities[i], self.probabilities[i + 1]
+        if heights[i + 1] <= heights[i]:
+            return p1
+        return p0 + (value - heights[i]) / (heights[i + 1] - heights[i]) * (p1 - p0)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the sketch to be persisted.
+        """
+        return {"probabilities": self.probabilities, "heights": self.heights, "positions": self.positions,
+                "desired": self.desired, "count": self.count}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a persisted state of the sketch.
+        """
+        self.probabilities = list(state["probabilities"])
+        self.heights = list(state["heights"])
+        self.positions = list(state["positions"])
+        self.desired = list(state["desired"])
+        self.count = state["count"]
@@ -0,0 +1,24 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel, Field
+from typing import List
+
+class BulkCloseResult(BaseModel):
+    """
+    The aggregated result of closing a set of positions.
+
+    Attributes:
+        requested (int): The number of positions whose close was sent.
+        closed_tickets (List[int]): The tickets of the positions closed.
+        failed_tickets (List[int]): The tickets of the positions that could not be closed.
+        closed_volume (float): The total volume closed, in lots.
+        profit (float): The realized profit of the closes in the account currency (including commissions and swaps).
+        unknown_profit_tickets (List[int]): The tickets of the positions closed whose deal could not be retrieved, so
+            their profit is not included in profit.
+    """
+    requested: int = 0
+    closed_tickets: List[int] = Field(default_factory=list)
+    failed_tickets: List[int] = Field(default_factory=list)
+    closed_volume: float = 0.0
+    profit: float = 0.0
+    unknown_profit_tickets: List[int] = Field(default_factory=list)
@@ -1,24 +1,30 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
+from .close_result import BulkCloseResult
 from portfolio.portfolio import Portfolio
+from portfolio.position import Position
 from events.events import OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, SignalType
 from utils.utils import Utils
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
 from queue import Queue 
-import MetaTrader5 as mt5
+from utils.terminal import mt5, TERMINAL_LOCK
 
 class OrderExecutor():
 
-    def __init__(self, events_queue: Queue, portfolio: Portfolio) -> None:
+    def __init__(self, events_queue: Queue, portfolio: Portfolio, max_parallel_closes: int = 8) -> None:
         """
         Initialize the OrderExecutor object.
 
         Args:
             events_queue (Queue): The queue to receive events from.
             portfolio (Portfolio): The portfolio object to execute orders on.
+            max_parallel_closes (int): The maximum number of closes sent to the platform at the same time in a bulk close.
         """
         self.events_queue = events_queue
         self.PORTFOLIO = portfolio
+        self.max_parallel_closes = max_parallel_closes if max_parallel_closes > 0 else 1
 
     def execute_order(self, order_event: OrderEvent) -> None:
         """
@@ -39,9 +45,9 @@ class OrderExecutor():
             # Llamamos al método que coloque órdenes pendientes
             self._send_pending_order(order_event)
 
-    def _execute_market_order(self, order_event: OrderEvent) -> None:
+    def _build_market_order_request(self, order_event: OrderEvent) -> dict:
         """
-        Executes a market order based on the given order event.
+        Builds the trade request of a market order.
 
         Args:
             order_event (OrderEvent): The order event containing the details of the market order.
@@ -50,7 +56,7 @@ class OrderExecutor():
             Exception: If the order event signal is not valid.
 
         Returns:
-            None
+            dict: The trade request.
         """
         # Comprobamos si la orden es de compra o de venta
         if order_event.signal == "BUY":
@@ -63,7 +69,7 @@ class OrderExecutor():
             raise Exception(f"ORD EXEC: La señal {order_event.signal} no es válida")
 
         # Creación del market order request
-        market_order_request = {
+        return {
             "action": mt5.TRADE_ACTION_DEAL,
             "symbol": order_event.symbol,
             "volume": order_event.volume,
@@ -76,6 +82,21 @@ class OrderExecutor():
             "type_filling": mt5.ORDER_FILLING_FOK,
         }
 
+    def _execute_market_order(self, order_event: OrderEvent) -> None:
+        """
+        Executes a market order based on the given order event.
+
+        Args:
+            order_event (OrderEvent): The order event containing the details of the market order.
+
+        Raises:
+            Exception: If the order event signal is not valid.
+
+        Returns:
+            None
+        """
+        market_order_request = self._build_market_order_request(order_event)
+
         # Mandamos el trade request para ser ejecutado
         result = mt5.order_send(market_order_request)
 
@@ -88,9 +109,9 @@ class OrderExecutor():
             #Mandaremos un mensaje de error
             print(f"{Utils.dateprint()} - Ha habido un error al ejecutar la Market Order {order_event.signal} para {order_event.symbol}: {result.comment}")
 
-    def _send_pending_order(self, order_event: OrderEvent) -> None:
+    def _build_pending_order_request(self, order_event: OrderEvent) -> dict:
         """
-        Sends a pending order based on the given order event.
+        Builds the trade request of a pending order.
 
         Args:
             order_event (OrderEvent): The order event containing the details of the pending order.
@@ -99,7 +120,7 @@ class OrderExecutor():
             Exception: If the target order of the order event is not valid.
 
         Returns:
-            None
+            dict: The trade request.
         """
         # Comprobar si es de tipo STOP o de tipo LIMITE
         if order_event.target_order == "STOP":
@@ -110,7 +131,7 @@ class OrderExecutor():
             raise Exception(f"ORD EXEC: La orden pendiente objetivo {order_event.target_order} no es válida")
         
         # Creación de la pending order request
-        pending_order_request = {
+        return {
             "action": mt5.TRADE_ACTION_PENDING,
             "symbol": order_event.symbol,
             "volume": order_event.volume,
@@ -125,6 +146,21 @@ class OrderExecutor():
             "type_time": mt5.ORDER_TIME_GTC
         }
 
+    def _send_pending_order(self, order_event: OrderEvent) -> None:
+        """
+        Sends a pending order based on the given order event.
+
+        Args:
+            order_event (OrderEvent): The order event containing the details of the pending order.
+
+        Raises:
+            Exception: If the target order of the order event is not valid.
+
+        Returns:
+            None
+        """
+        pending_order_request = self._build_pending_order_request(order_event)
+
         # Mandamos el trade request para colocar la orden pendiente
         result = mt5.order_send(pending_order_request)
 
@@ -148,12 +184,13 @@ class OrderExecutor():
             None
         """
         # Accedemos a la orden pendiente de interés
-        order = mt5.orders_get(ticket=ticket)[0]
+        orders = mt5.orders_get(ticket=ticket)
 
-        # Verificamos que la orden exista
-        if order is None:
+        # Verificamos que la orden exista (puede haberse ejecutado o cancelado ya)
+        if not orders:
             print(f"{Utils.dateprint()} - ORD EXEC: No existe ninguna orden pendiente con el ticket {ticket}")
             return
+        order = orders[0]
         
         # Creamos el trade request para cancelar la orden pendiente
         cancel_request = {
@@ -183,22 +220,17 @@ class OrderExecutor():
             None
         """
         # Accedemos a la posición de interés
-        position = mt5.positions_get(ticket=ticket)[0]
+        positions = mt5.positions_get(ticket=ticket)
 
-        # Verificamos que la posición exista
-        if position is None:
+        # Verificamos que la posición exista (puede haberse cerrado en la plataforma, p. ej. por SL o TP)
+        if not positions:
             print(f"{Utils.dateprint()} - ORD EXEC: No existe ninguna posición con el ticket {ticket}")
+            self.PORTFOLIO.request_reconciliation()
             return
+        position = positions[0]
         
         # Creamos el trade request para cerrar dicha posición
-        close_request = {
-            'action': mt5.TRADE_ACTION_DEAL,
-            'position': position.ticket,
-            'symbol': position.symbol,
-            'volume': position.volume,
-            'type': mt5.ORDER_TYPE_BUY if position.type == mt5.ORDER_TYPE_SELL else mt5.ORDER_TYPE_SELL,
-            'type_filling': mt5.ORDER_FILLING_FOK
-        }
+        close_request = self._build_close_request(position)
 
         # Mandamos el close_request
         result = mt5.order_send(close_request)
@@ -212,7 +244,123 @@ class OrderExecutor():
             # Mandaremos un mensaje de error
             print(f"{Utils.dateprint()} - Ha habido un error al cerrar la posición {ticket} en {position.symbol} con volumen {position.volume}: {result.comment}")
     
-    def close_strategy_long_positions_by_symbol(self, symbol: str) -> None:
+    def _build_close_request(self, position: Position) -> dict:
+        """
+        Builds the trade request that closes a position.
+
+        Args:
+            position (Position): The position to be closed.
+
+        Returns:
+            dict: The trade request.
+        """
+        return {
+            'action': mt5.TRADE_ACTION_DEAL,
+            'position': position.ticket,
+            'symbol': position.symbol,
+            'volume': position.volume,
+            'type': mt5.ORDER_TYPE_BUY if position.type == mt5.ORDER_TYPE_SELL else mt5.ORDER_TYPE_SELL,
+            'type_filling': mt5.ORDER_FILLING_FOK
+        }
+
+    def _send_close(self, position: Position) -> Tuple[Position, object, ExecutionEvent | None, str | None]:
+        """
+        Sends the close of a position and retrieves its deal (runs in a worker thread of a bulk close).
+
+        Args:
+            position (Position): The position to be closed.
+
+        Returns:
+            Tuple[Position, object, ExecutionEvent | None, str | None]: The position, the result of order_send, the
+            execution event if the position was closed and its deal was found, and the error, if any.
+        """
+        try:
+            result, last_error = mt5.order_send_with_error(self._build_close_request(position))
+        except Exception as e:
+            return position, None, None, str(e)
+
+        if result is None:
+            return position, None, None, f"MT5 error: {last_error}"
+        if not self._check_execution_status(result):
+            return position, result, None, result.comment
+
+        # La búsqueda del deal va aparte: si falla, la posición se ha cerrado igualmente
+        try:
+            return position, result, self._create_execution_event(result), None
+        except Exception as e:
+            print(f"{Utils.dateprint()} - ORD EXEC: No se ha podido recuperar el deal {result.deal} del cierre de la posición {position.ticket}. Exception: {e}")
+            return position, result, None, None
+
+    def close_positions(self, positions: Iterable[Position]) -> BulkCloseResult:
+        """
+        Closes a set of positions, sending the closes concurrently (at most max_parallel_closes at the same time).
+
+        The closes are built from the position data already available, without querying each position again. The
+        execution events are applied to the portfolio and put into the queue from the calling thread, once all the
+        closes have been answered.
+
+        Args:
+            positions (Iterable[Position]): The positions to be closed.
+
+        Returns:
+            BulkCloseResult: The aggregated result of the closes.
+        """
+        positions: List[Position] = list(positions)
+        result = BulkCloseResult(requested=len(positions))
+        if not positions:
+            return result
+
+        # Enviamos los cierres en paralelo: el tiempo total es el de unas pocas idas y vueltas, no uno por posición (y el
+        # deal de cada cierre se busca en los workers)
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_closes, len(positions)), thread_name_prefix="bulk_close") as executor:
+            responses = list(executor.map(self._send_close, positions))
+
+        reconcile = False
+        for position, order_result, execution_event, error in responses:
+            if error is not None:
+                result.failed_tickets.append(position.ticket)
+                reconcile = True
+                print(f"{Utils.dateprint()} - Ha habido un error al cerrar la posición {position.ticket} en {position.symbol} con volumen {position.volume}: {error}")
+                continue
+
+            result.closed_tickets.append(position.ticket)
+            if execution_event is not None:
+                result.closed_volume += execution_event.volume
+                result.profit += execution_event.profit
+                self._put_execution_event(execution_event)
+            else:
+                # Cerrada sin deal: el beneficio es desconocido y el libro se actualiza con una reconciliación
+                result.closed_volume += order_result.volume if getattr(order_result, 'volume', 0.0) else position.volume
+                result.unknown_profit_tickets.append(position.ticket)
+                reconcile = True
+
+        # Las posiciones que no se han podido cerrar pueden haberse cerrado ya en la plataforma (p. ej. por SL o TP)
+        if reconcile:
+            self.PORTFOLIO.request_reconciliation()
+
+        print(f"{Utils.dateprint()} - ORD EXEC: Cerradas {len(result.closed_tickets)} de {result.requested} posiciones ({result.closed_volume:.2f} lotes)")
+        return result
+
+    def close_positions_by_filter(self, symbol: str | None = None, side: str | None = None, magic: int | None = None) -> BulkCloseResult:
+        """
+        Closes all the open positions that match the given filters (None matches everything).
+
+        Args:
+            symbol (str | None): The symbol of the positions to be closed.
+            side (str | None): The side of the positions to be closed ("LONG" or "SHORT").
+            magic (int | None): The magic number of the positions to be closed.
+
+        Returns:
+            BulkCloseResult: The aggregated result of the closes.
+        """
+        position_type = None if side is None else (mt5.ORDER_TYPE_BUY if side == "LONG" else mt5.ORDER_TYPE_SELL)
+        positions = [position for position in self.PORTFOLIO.get_open_positions()
+                     if (symbol is None or position.symbol == symbol)
+                     and (position_type is None or position.type == position_type)
+                     and (magic is None or position.magic == magic)]
+        return self.close_positions(positions)
+
+    def close_strategy_long_positions_by_symbol(self, symbol: str) -> BulkCloseResult:
         """
         Closes all long positions for a specific symbol in the strategy's portfolio.
 
@@ -220,17 +368,11 @@ class OrderExecutor():
         symbol (str): The symbol of the positions to be closed.
 
         Returns:
-        None
+        BulkCloseResult: The aggregated result of the closes.
         """
-        # Accedemos a todas las posiciones abiertas por nuestra estrategia
-        positions = self.PORTFOLIO.get_strategy_open_positions()
-
-        # Filtrar posiciones por símbolo y por dirección
-        for position in positions:
-            if position.symbol == symbol and position.type == mt5.ORDER_TYPE_BUY:
-                self.close_position_by_ticket(position.ticket)
+        return self.close_positions_by_filter(symbol=symbol, side="LONG", magic=self.PORTFOLIO.magic)
 
-    def close_strategy_short_positions_by_symbol(self, symbol: str) -> None:
+    def close_strategy_short_positions_by_symbol(self, symbol: str) -> BulkCloseResult:
         """
         Closes all short positions for a specific symbol in the strategy's portfolio.
 
@@ -238,15 +380,9 @@ class OrderExecutor():
         symbol (str): The symbol of the positions to be closed.
 
         Returns:
-        None
+        BulkCloseResult: The aggregated result of the closes.
         """
-        # Accedemos a todas las posiciones abiertas por nuestra estrategia
-        positions = self.PORTFOLIO.get_strategy_open_positions()
-
-        # Filtrar posiciones por símbolo y por dirección
-        for position in positions:
-            if position.symbol == symbol and position.type == mt5.ORDER_TYPE_SELL:
-                self.close_position_by_ticket(position.ticket)
+        return self.close_positions_by_filter(symbol=symbol, side="SHORT", magic=self.PORTFOLIO.magic)
 
     def _create_and_put_placed_pending_order_event(self, order_event: OrderEvent) -> None:
         """
@@ -269,32 +405,75 @@ class OrderExecutor():
                                                         tp=order_event.tp,
                                                         volume=order_event.volume)
         
+        # La orden puede ejecutarse en cualquier momento: el portfolio se reconcilia con más frecuencia mientras exista
+        self.PORTFOLIO.on_pending_order_placed()
+
         # Lo colocamos en la events queue
         self.events_queue.put(placed_pending_order_event)
     
-    def _create_and_put_execution_event(self, order_result) -> None:
+    def _create_execution_event(self, order_result) -> ExecutionEvent | None:
         """
-        Creates an execution event based on the order result and puts it into the events queue.
+        Creates an execution event from the deal of an order result.
 
         Args:
             order_result (OrderResult): The result of the order execution.
 
         Returns:
-            None
+            ExecutionEvent | None: The execution event, or None if the deal could not be retrieved.
         """
-        # Obtenemos la información del deal resultado de la ejecución de la orden
-        deal = mt5.history_deals_get(ticket=order_result.deal)[0]
+        # Obtenemos la información del deal resultado de la ejecución de la orden (con su error, en la misma sección crítica)
+        with TERMINAL_LOCK:
+            deals = mt5.history_deals_get(ticket=order_result.deal)
+            last_error = mt5.last_error()
+        if not deals:
+            print(f"{Utils.dateprint()} - ORD EXEC: No se ha podido recuperar el deal {order_result.deal}. MT5 error: {last_error}")
+            return None
+        deal = deals[0]
         
         # Creamos el execution event
-        execution_event = ExecutionEvent(symbol=deal.symbol,
-                                        signal=SignalType.BUY if deal.type == mt5.DEAL_TYPE_BUY else SignalType.SELL,
-                                        fill_price=deal.price,
-                                        fill_time=pd.to_datetime(deal.time_msc, unit='ms'),
-                                        volume=deal.volume)
+        return ExecutionEvent(symbol=deal.symbol,
+                                signal=SignalType.BUY if deal.type == mt5.DEAL_TYPE_BUY else SignalType.SELL,
+                                fill_price=deal.price,
+                                fill_time=pd.to_datetime(deal.time_msc, unit='ms'),
+                                volume=deal.volume,
+                                closes_position=deal.entry in (mt5.DEAL_ENTRY_OUT, mt5.DEAL_ENTRY_OUT_BY, mt5.DEAL_ENTRY_INOUT),
+                                profit=deal.profit + deal.commission + deal.swap,
+                                magic_number=deal.magic,
+                                position_id=deal.position_id)
+
+    def _put_execution_event(self, execution_event: ExecutionEvent) -> None:
+        """
+        Applies an execution event to the position book of the portfolio and puts it into the events queue.
+
+        Args:
+            execution_event (ExecutionEvent): The execution event.
+
+        Returns:
+            None
+        """
+        # Actualizamos el libro de posiciones del portfolio antes de que se procese cualquier otra señal
+        self.PORTFOLIO.on_execution(execution_event)
         
         # Colocar el execution event a la cola de eventos
         self.events_queue.put(execution_event)
 
+    def _create_and_put_execution_event(self, order_result) -> None:
+        """
+        Creates an execution event based on the order result and puts it into the events queue.
+
+        Args:
+            order_result (OrderResult): The result of the order execution.
+
+        Returns:
+            None
+        """
+        execution_event = self._create_execution_event(order_result)
+        if execution_event is None:
+            # La orden se ha ejecutado aunque no tengamos el deal: reconciliamos el libro de posiciones con la plataforma
+            self.PORTFOLIO.request_reconciliation()
+            return
+        self._put_execution_event(execution_event)
+
     def _check_execution_status(self, order_result) -> bool:
         """
         Checks the execution status of an order.
@@ -0,0 +1,227 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .order_executor import OrderExecutor
+from .properties.order_executor_properties import OrderGatewayProps
+from events.events import OrderEvent, ExecutionEvent, OrderRejectedEvent
+from utils.utils import Utils
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+from queue import Queue, Empty
+from utils.terminal import mt5
+import time
+
+
+class OrderGateway():
+
+    def __init__(self, events_queue: Queue, order_executor: OrderExecutor, properties: OrderGatewayProps):
+        """
+        Initializes the OrderGateway object.
+
+        Orders are sent to the platform from a pool of worker threads, so the trading loop keeps processing events while
+        the broker responds. The workers only talk to the platform (order_send and, for market orders, the deal of the
+        fill): their results are left in a completion queue and applied from the trading loop in process_completions,
+        so the portfolio and the rest of the modules are only ever touched from the main thread.
+
+        Args:
+            events_queue (Queue): The main events queue, where the completion events are put.
+            order_executor (OrderExecutor): The order executor that builds the requests and the execution events.
+            properties (OrderGatewayProps): The properties of the gateway.
+        """
+        self.events_queue = events_queue
+        self.ORDER_EXECUTOR = order_executor
+        self.max_in_flight = properties.max_in_flight if properties.max_in_flight > 0 else 1
+        self.timeout_seconds = properties.timeout_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=properties.num_workers if properties.num_workers > 0 else 1,
+                                            thread_name_prefix="order_gateway")
+
+        # Resultados de los workers pendientes de aplicar: (client id, es orden a mercado, resultado, execution event, error)
+        self._completions: Queue = Queue()
+
+        # Órdenes enviadas y no completadas: client id -> (order event, instante de envío). El timeout se mide con el
+        # reloj monótono, ya que es el tiempo real de respuesta del bróker (también con el reloj simulado)
+        self._in_flight: Dict[int, Tuple[OrderEvent, float]] = {}
+        self._timed_out: set = set()
+        self._next_client_id: int = 1
+
+    @property
+    def in_flight_count(self) -> int:
+        """
+        Returns the number of orders sent and not yet completed.
+        """
+        return len(self._in_flight)
+
+    def submit(self, order_event: OrderEvent) -> int:
+        """
+        Submits an order to be sent to the platform by a worker. It does not wait for the response.
+
+        Args:
+            order_event (OrderEvent): The order event to be sent.
+
+        Returns:
+            int: The client id assigned to the order.
+        """
+        client_id = self._next_client_id
+        self._next_client_id += 1
+
+        if len(self._in_flight) >= self.max_in_flight:
+            self._create_and_put_rejection_event(client_id, order_event, 0, f"Límite de {self.max_in_flight} órdenes en curso alcanzado")
+            return client_id
+
+        try:
+            if order_event.target_order == "MARKET":
+                request = self.ORDER_EXECUTOR._build_market_order_request(order_event)
+            else:
+                request = self.ORDER_EXECUTOR._build_pending_order_request(order_event)
+        except Exception as e:
+            self._create_and_put_rejection_event(client_id, order_event, 0, str(e))
+            return client_id
+
+        self._in_flight[client_id] = (order_event, time.monotonic())
+        self._executor.submit(self._send, client_id, order_event.target_order == "MARKET", request)
+        return client_id
+
+    def _send(self, client_id: int, is_market_order: bool, request: dict) -> None:
+        """
+        Sends a trade request to the platform (runs in a worker thread).
+
+        Args:
+            client_id (int): The client id of the order.
+            is_market_order (bool): True if the request is a market order, whose fill is retrieved too.
+            request (dict): The trade request.
+
+        Returns:
+            None
+        """
+        # Sin respuesta, leemos last_error justo después del envío (el envío no bloquea las consultas del bucle principal)
+        try:
+            result, last_error = mt5.order_send_with_error(request)
+        except Exception as e:
+            self._completions.put((client_id, is_market_order, None, None, str(e)))
+            return
+
+        if result is None:
+            self._completions.put((client_id, is_market_order, None, None, f"Sin respuesta de la plataforma. MT5 error: {last_error}"))
+            return
+
+        # La búsqueda del deal va aparte: si falla, la orden se ha ejecutado igualmente y el resultado no se descarta
+        execution_event = None
+        if is_market_order and self.ORDER_EXECUTOR._check_execution_status(result):
+            try:
+                execution_event = self.ORDER_EXECUTOR._create_execution_event(result)
+            except Exception as e:
+                print(f"{Utils.dateprint()} - ORDER GATEWAY: No se ha podido recuperar el deal {result.deal} de la orden {client_id}. Exception: {e}")
+        self._completions.put((client_id, is_market_order, result, execution_event, None))
+
+    def process_completions(self) -> None:
+        """
+        Applies the orders completed by the workers, putting their execution, placed pending order or rejection events
+        into the events queue, and reports as rejected the orders that exceeded the timeout. It must be called from
+        the trading loop.
+
+        Returns:
+            None
+        """
+        while True:
+            try:
+                client_id, is_market_order, result, execution_event, error = self._completions.get(block=False)
+            except Empty:
+                break
+            self._apply_completion(client_id, is_market_order, result, execution_event, error)
+
+        self._check_timeouts()
+
+    def _apply_completion(self, client_id: int, is_market_order: bool, result, execution_event: ExecutionEvent | None, error: str | None) -> None:
+        """
+        Applies the response of the platform to an order.
+
+        Args:
+            client_id (int): The client id of the order.
+            is_market_order (bool): True if the order is a market order.
+            result (mt5.TradeResult | None): The result of order_send, or None if there was no response.
+            execution_event (ExecutionEvent | None): The execution event of a filled market order (None if its deal could not be retrieved).
+            error (str | None): The error raised while sending the order or the platform error if there was no response, if any.
+
+        Returns:
+            None
+        """
+        order_event, _ = self._in_flight.pop(client_id)
+        late = client_id in self._timed_out
+        self._timed_out.discard(client_id)
+
+        if error is None and result is not None and self.ORDER_EXECUTOR._check_execution_status(result):
+            if late:
+                # Ya se notificó como rechazada por timeout, pero el bróker la ha ejecutado: la aplicamos igualmente
+                print(f"{Utils.dateprint()} - ORDER GATEWAY: La orden {client_id} ({order_event.signal} {order_event.target_order} en {order_event.symbol}) se ha completado después del timeout")
+
+            if is_market_order:
+                print(f"{Utils.dateprint()} - Market Order {order_event.signal} para {order_event.symbol} de {order_event.volume} lotes ejecutada correctamente")
+                if execution_event is not None:
+                    self.ORDER_EXECUTOR._put_execution_event(execution_event)
+                else:
+                    # Ejecutada pero sin deal: la posición existe, la incorporamos al libro con una reconciliación
+                    self.ORDER_EXECUTOR.PORTFOLIO.request_reconciliation()
+            else:
+                print(f"{Utils.dateprint()} - Pending Order {order_event.signal} {order_event.target_order} para {order_event.symbol} de {order_event.volume} lotes colocada en {order_event.target_price} correctamente")
+                self.ORDER_EXECUTOR._create_and_put_placed_pending_order_event(order_event)
+            return
+
+        if late:
+            return
+
+        reason = error if error is not None else result.comment
+        self._create_and_put_rejection_event(client_id, order_event, result.retcode if result is not None else 0, reason)
+
+    def _check_timeouts(self) -> None:
+        """
+        Reports as rejected the orders in flight for longer than the timeout. If one of them completes later, its
+        execution is still applied.
+
+        Returns:
+            None
+        """
+        now = time.monotonic()
+        for client_id, (order_event, sent_at) in self._in_flight.items():
+            if client_id not in self._timed_out and now - sent_at >= self.timeout_seconds:
+                self._timed_out.add(client_id)
+                self._create_and_put_rejection_event(client_id, order_event, 0, f"Sin respuesta tras {self.timeout_seconds} segundos")
+
+                # El estado real de la orden es desconocido: reconciliamos el portfolio en la siguiente consulta
+                self.ORDER_EXECUTOR.PORTFOLIO.request_reconciliation()
+
+    def _create_and_put_rejection_event(self, client_id: int, order_event: OrderEvent, retcode: int, reason: str) -> None:
+        """
+        Creates an OrderRejectedEvent from an order event and puts it into the events queue.
+
+        Args:
+            client_id (int): The client id of the order.
+            order_event (OrderEvent): The rejected order event.
+            retcode (int): The return code of the trade server (0 if there was no response).
+            reason (str): The description of the rejection.
+
+        Returns:
+            None
+        """
+        print(f"{Utils.dateprint()} - Ha habido un error al enviar la orden {order_event.signal} {order_event.target_order} para {order_event.symbol}: {reason}")
+        rejection_event = OrderRejectedEvent(client_id=client_id,
+                                             symbol=order_event.symbol,
+                                             signal=order_event.signal,
+                                             target_order=order_event.target_order,
+                                             target_price=order_event.target_price,
+                                             magic_number=order_event.magic_number,
+                                             sl=order_event.sl,
+                                             tp=order_event.tp,
+                                             volume=order_event.volume,
+                                             retcode=retcode,
+                                             reason=reason)
+        self.events_queue.put(rejection_event)
+
+    def shutdown(self) -> None:
+        """
+        Waits for the orders in flight to complete and applies them.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=True)
+        self.process_completions()
@@ -0,0 +1,16 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class OrderGatewayProps(BaseModel):
+    """
+    Properties for the asynchronous order gateway.
+
+    Attributes:
+        num_workers (int): The number of worker threads that send the orders to the platform.
+        max_in_flight (int): The maximum number of orders sent and not yet completed. Orders above it are rejected.
+        timeout_seconds (float): The time after which an order without response is reported as rejected.
+    """
+    num_workers: int = 1
+    max_in_flight: int = 8
+    timeout_seconds: float = 10.0
@@ -0,0 +1,270 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.performance_properties import PerformanceMetricsProps
+from events.events import ExecutionEvent, SignalType
+from datetime import datetime
+from typing import Dict, Iterable, List
+import pandas as pd
+import numpy as np
+import math
+
+
+class PerformanceMetrics():
+
+    def __init__(self, properties: PerformanceMetricsProps):
+        """
+        Initializes the PerformanceMetrics object.
+
+        Every update (equity mark or execution) costs O(1): the rolling statistics use Welford's
+        algorithm over a ring buffer of returns instead of recomputing over the full history.
+
+        Args:
+            properties (PerformanceMetricsProps): The properties of the metrics engine.
+        """
+        self.rolling_window = properties.rolling_window if properties.rolling_window > 1 else 2
+        self.periods_per_year = properties.periods_per_year
+
+        # Curva de equity
+        self._equity_times: List[datetime] = []
+        self._equity_values: List[float] = []
+        self.equity: float = 0.0
+        self.peak_equity: float = 0.0
+        self.max_drawdown: float = 0.0
+
+        # Estado de Welford para la ventana móvil de retornos
+        self._returns = np.zeros(self.rolling_window)
+        self._returns_pos: int = 0
+        self._returns_count: int = 0
+        self._returns_mean: float = 0.0
+        self._returns_m2: float = 0.0
+        self._downside_sq_sum: float = 0.0
+
+        # Estadísticas de las operaciones cerradas
+        self.total_trades: int = 0
+        self.winning_trades: int = 0
+        self.gross_profit: float = 0.0
+        self.gross_loss: float = 0.0
+
+        # Exposición: volumen neto (con signo, compras positivas) por símbolo y número de marcas con posiciones abiertas
+        self._net_volume: Dict[str, float] = {}
+        self._symbols_with_exposure: int = 0
+        self._marks: int = 0
+        self._marks_with_exposure: int = 0
+
+        # PnL no realizado de las posiciones abiertas en la última revaloración
+        self.unrealized_pnl: float = 0.0
+
+    def update_equity(self, time: datetime, equity: float) -> None:
+        """
+        Adds a new equity mark and updates drawdown, rolling returns statistics and exposure.
+
+        Args:
+            time (datetime): The time of the mark.
+            equity (float): The equity of the account at that time.
+
+        Returns:
+            None
+        """
+        if self._equity_values and self.equity > 0.0:
+            self._add_return(equity / self.equity - 1.0)
+
+        self._equity_times.append(time)
+        self._equity_values.append(equity)
+        self.equity = equity
+
+        # Drawdown respecto al máximo de equity
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+        if self.peak_equity > 0.0:
+            self.max_drawdown = max(self.max_drawdown, 1.0 - equity / self.peak_equity)
+
+        self._marks += 1
+        if self._symbols_with_exposure > 0:
+            self._marks_with_exposure += 1
+
+    def on_execution(self, execution_event: ExecutionEvent) -> None:
+        """
+        Updates the trade statistics and the exposure from an execution event. The exposure is the net volume by
+        symbol: a buy adds to it and a sell subtracts from it, whether the execution opens or closes a position.
+
+        Args:
+            execution_event (ExecutionEvent): The execution event.
+
+        Returns:
+            None
+        """
+        symbol = execution_event.symbol
+        previous_volume = self._net_volume.get(symbol, 0.0)
+        signed_volume = execution_event.volume if execution_event.signal == SignalType.BUY else -execution_event.volume
+        new_volume = previous_volume + signed_volume
+        if abs(new_volume) < 1e-9:
+            new_volume = 0.0
+
+        if execution_event.closes_position:
+            # Operación cerrada: actualizamos las estadísticas de trades
+            self.total_trades += 1
+            if execution_event.profit > 0.0:
+                self.winning_trades += 1
+                self.gross_profit += execution_event.profit
+            else:
+                self.gross_loss += -execution_event.profit
+
+        # Mantenemos el contador de símbolos con exposición
+        if previous_volume == 0.0 and new_volume != 0.0:
+            self._symbols_with_exposure += 1
+        elif new_volume == 0.0 and previous_volume != 0.0:
+            self._symbols_with_exposure -= 1
+
+        self._net_volume[symbol] = new_volume
+
+    def replay(self, execution_events: Iterable[ExecutionEvent], equity_curve: pd.Series) -> None:
+        """
+        Feeds the executions and the equity curve of a backtest, merged in time order. The executions of a time are
+        applied before its equity mark, as in a live run.
+
+        Args:
+            execution_events (Iterable[ExecutionEvent]): The executions, sorted by fill time.
+            equity_curve (pd.Series): The equity of the account indexed by time.
+
+        Returns:
+            None
+        """
+        executions = iter(execution_events)
+        next_execution = next(executions, None)
+        for time, equity in zip(equity_curve.index, equity_curve.to_numpy(dtype=float).tolist()):
+            while next_execution is not None and next_execution.fill_time <= time:
+                self.on_execution(next_execution)
+                next_execution = next(executions, None)
+            self.update_equity(time, equity)
+
+        while next_execution is not None:
+            self.on_execution(next_execution)
+            next_execution = next(executions, None)
+
+    def update_unrealized_pnl(self, unrealized_pnl: float) -> None:
+        """
+        Updates the unrealized PnL of the open positions (from the mark-to-market revaluation).
+
+        Args:
+            unrealized_pnl (float): The unrealized PnL in the account currency.
+
+        Returns:
+            None
+        """
+        self.unrealized_pnl = unrealized_pnl
+
+    def _add_return(self, value: float) -> None:
+        """
+        Adds a return to the rolling window, removing the oldest one when the window is full.
+
+        Args:
+            value (float): The new return.
+
+        Returns:
+            None
+        """
+        # Si la ventana está llena, eliminamos el retorno más antiguo (Welford inverso)
+        if self._returns_count == self.rolling_window:
+            old = self._returns[self._returns_pos]
+            self._returns_count -= 1
+            if self._returns_count > 0:
+                delta = old - self._returns_mean
+                self._returns_mean -= delta / self._returns_count
+                self._returns_m2 -= delta * (old - self._returns_mean)
+            else:
+                self._returns_mean = 0.0
+                self._returns_m2 = 0.0
+            self._downside_sq_sum -= min(old, 0.0) ** 2
+
+        # Añadimos el nuevo retorno (Welford)
+        self._returns[self._returns_pos] = value
+        self._returns_pos = (self._returns_pos + 1) % self.rolling_window
+        self._returns_count += 1
+        delta = value - self._returns_mean
+        self._returns_mean += delta / self._returns_count
+        self._returns_m2 += delta * (value - self._returns_mean)
+        self._downside_sq_sum += min(value, 0.0) ** 2
+
+    @property
+    def drawdown(self) -> float:
+        """
+        Returns the current drawdown from the equity high-water mark, as a fraction.
+        """
+        return 1.0 - self.equity / self.peak_equity if self.peak_equity > 0.0 else 0.0
+
+    @property
+    def rolling_sharpe(self) -> float:
+        """
+        Returns the annualized Sharpe ratio of the returns in the rolling window.
+        """
+        if self._returns_count < 2:
+            return 0.0
+        variance = max(self._returns_m2 / (self._returns_count - 1), 0.0)
+        if variance <= 0.0:
+            return 0.0
+        return self._returns_mean / math.sqrt(variance) * math.sqrt(self.periods_per_year)
+
+    @property
+    def rolling_sortino(self) -> float:
+        """
+        Returns the annualized Sortino ratio of the returns in the rolling window.
+        """
+        if self._returns_count < 2:
+            return 0.0
+        downside_deviation = math.sqrt(max(self._downside_sq_sum, 0.0) / self._returns_count)
+        if downside_deviation <= 0.0:
+            return 0.0
+        return self._returns_mean / downside_deviation * math.sqrt(self.periods_per_year)
+
+    @property
+    def win_rate(self) -> float:
+        """
+        Returns the fraction of closed trades with a positive profit.
+        """
+        return self.winning_trades / self.total_trades if self.total_trades > 0 else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        """
+        Returns the gross profit divided by the gross loss of the closed trades.
+        """
+        if self.gross_loss <= 0.0:
+            return math.inf if self.gross_profit > 0.0 else 0.0
+        return self.gross_profit / self.gross_loss
+
+    @property
+    def exposure(self) -> float:
+        """
+        Returns the fraction of equity marks taken while there were open positions.
+        """
+        return self._marks_with_exposure / self._marks if self._marks > 0 else 0.0
+
+    def get_equity_curve(self) -> pd.Series:
+        """
+        Returns the equity curve.
+
+        Returns:
+            pd.Series: The equity marks indexed by time.
+        """
+        return pd.Series(self._equity_values, index=pd.Index(self._equity_times, name='time'), name='equity', dtype=float)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """
+        Returns a snapshot of all the metrics.
+
+        Returns:
+            Dict[str, float]: The current value of every metric.
+        """
+        return {
+            "equity": self.equity,
+            "peak_equity": self.peak_equity,
+            "drawdown": self.drawdown,
+            "max_drawdown": self.max_drawdown,
+            "rolling_sharpe": self.rolling_sharpe,
+            "rolling_sortino": self.rolling_sortino,
+            "total_trades": self.total_trades,
+            "win_rate": self.win_rate,
+            "profit_factor": self.profit_factor,
+            "exposure": self.exposure,
+            "unrealized_pnl": self.unrealized_pnl,
+        }
@@ -0,0 +1,14 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class PerformanceMetricsProps(BaseModel):
+    """
+    Properties for the incremental performance metrics engine.
+
+    Attributes:
+        rolling_window (int): The number of equity marks used for the rolling Sharpe and Sortino ratios.
+        periods_per_year (float): The number of equity marks per year, used to annualize the ratios.
+    """
+    rolling_window: int = 252
+    periods_per_year: float = 252.0
@@ -1,7 +1,7 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
 from utils.utils import Utils
-import MetaTrader5 as mt5
+from utils.terminal import mt5
 import os
 from dotenv import load_dotenv, find_dotenv
 
@@ -0,0 +1,168 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .portfolio import Portfolio
+from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+from typing import Dict, Tuple
+from utils.terminal import mt5
+import pandas as pd
+import numpy as np
+
+
+class MarkToMarket():
+
+    def __init__(self, portfolio: Portfolio):
+        """
+        Initializes the MarkToMarket object.
+
+        The open positions of the portfolio are kept in parallel numpy arrays (one element per position), rebuilt only
+        when the position book changes. A revaluation fetches one quote per symbol (not per position) and computes the
+        unrealized PnL of every position in the account currency with a single vectorized expression.
+
+        Args:
+            portfolio (Portfolio): The portfolio whose positions are valued.
+        """
+        self.PORTFOLIO = portfolio
+
+        # Universo de símbolos de las posiciones abiertas y símbolos de conversión a la divisa de la cuenta
+        self._symbols: list = []
+        self._fx_symbols: list = []
+        self._fx_index = np.zeros(0, dtype=np.int64)         # índice del símbolo de conversión de cada símbolo (-1 si no hace falta)
+        self._fx_invert = np.zeros(0, dtype=bool)            # True si hay que dividir por el precio del símbolo de conversión
+
+        # Arrays paralelos de posiciones
+        self.tickets = np.zeros(0, dtype=np.int64)
+        self.magics = np.zeros(0, dtype=np.int64)
+        self._symbol_index = np.zeros(0, dtype=np.int64)
+        self._side = np.zeros(0)                             # +1 largos, -1 cortos
+        self._units = np.zeros(0)                            # volumen x tamaño de contrato
+        self._price_open = np.zeros(0)
+
+        # Último resultado
+        self.unrealized_pnl = np.zeros(0)
+        self.total_unrealized_pnl: float = 0.0
+
+        self._portfolio_version: int = -1
+
+    def _rebuild(self) -> None:
+        """
+        Rebuilds the position arrays from the position book of the portfolio, if it changed since the last rebuild.
+
+        Returns:
+            None
+        """
+        self.PORTFOLIO.reconcile_if_due()
+        if self.PORTFOLIO.version == self._portfolio_version:
+            return
+        self._portfolio_version = self.PORTFOLIO.version
+
+        positions = self.PORTFOLIO.get_open_positions()
+        account_currency = SymbolMetadataCache.get_account_currency()
+
+        # Universo de símbolos y sus símbolos de conversión
+        self._symbols = sorted({position.symbol for position in positions})
+        symbol_index = {symbol: i for i, symbol in enumerate(self._symbols)}
+        fx_symbols: Dict[str, int] = {}
+        fx_index = np.full(len(self._symbols), -1, dtype=np.int64)
+        fx_invert = np.zeros(len(self._symbols), dtype=bool)
+        for i, symbol in enumerate(self._symbols):
+            currency_profit = SymbolMetadataCache.get(symbol).currency_profit
+            if currency_profit != account_currency:
+                fx_symbol = Utils.get_conversion_fx_symbol(currency_profit, account_currency)
+                fx_index[i] = fx_symbols.setdefault(fx_symbol, len(fx_symbols))
+                fx_invert[i] = fx_symbol[:3] == account_currency.upper()
+        self._fx_symbols = list(fx_symbols)
+        self._fx_index = fx_index
+        self._fx_invert = fx_invert
+
+        # Arrays paralelos de posiciones
+        n = len(positions)
+        self.tickets = np.fromiter((position.ticket for position in positions), dtype=np.int64, count=n)
+        self.magics = np.fromiter((position.magic for position in positions), dtype=np.int64, count=n)
+        self._symbol_index = np.fromiter((symbol_index[position.symbol] for position in positions), dtype=np.int64, count=n)
+        self._side = np.fromiter((1.0 if position.type == mt5.ORDER_TYPE_BUY else -1.0 for position in positions), dtype=float, count=n)
+        self._units = np.fromiter((position.volume * SymbolMetadataCache.get(position.symbol).trade_contract_size for position in positions), dtype=float, count=n)
+        self._price_open = np.fromiter((position.price_open for position in positions), dtype=float, count=n)
+        self.unrealized_pnl = np.zeros(n)
+
+    def _get_quotes(self, symbols: list) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the current bid and ask of several symbols (NaN if a quote cannot be retrieved).
+        """
+        bid = np.full(len(symbols), np.nan)
+        ask = np.full(len(symbols), np.nan)
+        for i, symbol in enumerate(symbols):
+            tick = mt5.symbol_info_tick(symbol)
+            if tick is None:
+                print(f"{Utils.dateprint()} - ERROR: No se pudo recuperar el último tick del símbolo {symbol}. MT5 error: {mt5.last_error()}")
+                continue
+            bid[i] = tick.bid
+            ask[i] = tick.ask
+        return bid, ask
+
+    def revalue(self, quotes: Dict[str, Tuple[float, float]] | None = None) -> float:
+        """
+        Revalues all the open positions.
+
+        Args:
+            quotes (Dict[str, Tuple[float, float]] | None): The (bid, ask) of the symbols, e.g. from a batch of bars. The
+                missing ones (or all of them, if None) are retrieved from the platform.
+
+        Returns:
+            float: The total unrealized PnL in the account currency. Positions without a quote are valued at 0.
+        """
+        self._rebuild()
+        if len(self.tickets) == 0:
+            self.total_unrealized_pnl = 0.0
+            return 0.0
+
+        quotes = quotes if quotes is not None else {}
+        all_symbols = self._symbols + self._fx_symbols
+        missing = [symbol for symbol in all_symbols if symbol not in quotes]
+        missing_bid, missing_ask = self._get_quotes(missing)
+        quotes = {**quotes, **{symbol: (missing_bid[i], missing_ask[i]) for i, symbol in enumerate(missing)}}
+        bid = np.array([quotes[symbol][0] for symbol in self._symbols], dtype=float)
+        ask = np.array([quotes[symbol][1] for symbol in self._symbols], dtype=float)
+        fx_bid = np.array([quotes[symbol][0] for symbol in self._fx_symbols], dtype=float)
+
+        # Factor de conversión de cada símbolo a la divisa de la cuenta
+        conversion = np.ones(len(self._symbols))
+        needs_fx = self._fx_index >= 0
+        fx_price = fx_bid[self._fx_index[needs_fx]]
+        conversion[needs_fx] = np.where(self._fx_invert[needs_fx], 1.0 / fx_price, fx_price)
+
+        # Los largos se cierran al bid y los cortos al ask
+        s = self._symbol_index
+        close_price = np.where(self._side > 0.0, bid[s], ask[s])
+        pnl = self._side * (close_price - self._price_open) * self._units * conversion[s]
+
+        self.unrealized_pnl = np.nan_to_num(pnl, nan=0.0)
+        self.total_unrealized_pnl = float(self.unrealized_pnl.sum())
+        return self.total_unrealized_pnl
+
+    def get_pnl_by_symbol(self) -> pd.Series:
+        """
+        Returns the unrealized PnL of the last revaluation aggregated by symbol.
+
+        Returns:
+            pd.Series: The unrealized PnL in the account currency, indexed by symbol.
+        """
+        pnl = np.bincount(self._symbol_index, weights=self.unrealized_pnl, minlength=len(self._symbols)) if len(self.tickets) > 0 else np.zeros(len(self._symbols))
+        return pd.Series(pnl, index=pd.Index(self._symbols, name='symbol'), name='unrealized_pnl')
+
+    def get_pnl_by_magic(self) -> pd.Series:
+        """
+        Returns the unrealized PnL of the last revaluation aggregated by magic number.
+
+        Returns:
+            pd.Series: The unrealized PnL in the account currency, indexed by magic number.
+        """
+        magics, inverse = np.unique(self.magics, return_inverse=True)
+        pnl = np.bincount(inverse, weights=self.unrealized_pnl, minlength=len(magics)) if len(magics) > 0 else np.zeros(0)
+        return pd.Series(pnl, index=pd.Index(magics, name='magic'), name='unrealized_pnl')
+
+    def get_strategy_unrealized_pnl(self) -> float:
+        """
+        Returns the unrealized PnL of the last revaluation of the positions of the strategy (the magic of the portfolio).
+        """
+        return float(self.unrealized_pnl[self.magics == self.PORTFOLIO.magic].sum()) if len(self.tickets) > 0 else 0.0
@@ -1,27 +1,233 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
-import MetaTrader5 as mt5
-from typing import Dict
+from .position import Position
+from events.events import ExecutionEvent
+from utils.utils import Utils
+from clock.clock import Clock
+from datetime import datetime, timedelta
+from utils.terminal import mt5
+from typing import Dict, Tuple
 
 class Portfolio():
 
-    def __init__(self, magic_number: int):
+    # Volumen por debajo del cual consideramos que una posición está cerrada
+    _VOLUME_EPSILON = 1e-8
+
+    def __init__(self, magic_number: int, reconcile_interval_seconds: float = 5.0, pending_reconcile_interval_seconds: float = 1.0):
         """
         Initializes a new instance of the Portfolio class.
 
+        The open positions of the account are kept in a local position book, updated from the execution events and
+        reconciled periodically against the platform (positions closed by SL/TP or opened by pending orders are only
+        seen by the reconciliation). The counts and volumes by (magic, symbol, side) are kept aggregated, so the
+        queries of the strategies cost O(1) and do not call the platform.
+
+        The trade-off is that a SL/TP close or a pending order fill is seen up to one reconciliation interval late. While
+        the strategy has pending orders in the platform (which could fill at any moment and lead a strategy to place a
+        duplicate entry), the shorter pending interval is used.
+
         Args:
             magic_number (int): The magic number associated with the portfolio.
+            reconcile_interval_seconds (float): The time between reconciliations of the position book with the platform.
+            pending_reconcile_interval_seconds (float): The time between reconciliations while the strategy has pending orders.
         """
         self.magic = magic_number
+        self.reconcile_interval = timedelta(seconds=reconcile_interval_seconds)
+        self.pending_reconcile_interval = timedelta(seconds=pending_reconcile_interval_seconds)
+
+        # True si la estrategia tiene órdenes pendientes en la plataforma (se actualiza en cada reconciliación)
+        self._has_pending_orders: bool = False
+
+        # Libro de posiciones: ticket -> posición
+        self._positions: Dict[int, Position] = {}
+
+        # Agregados por (magic, símbolo, lado): [número de posiciones, volumen]. El magic None agrupa todas las estrategias
+        self._totals: Dict[Tuple[int | None, str, str], list] = {}
+
+        # Momento de la última reconciliación (None fuerza la reconciliación en la siguiente consulta)
+        self._last_reconciliation: datetime | None = None
+        self._reconciled_once: bool = False
+
+        # Versión del libro: se incrementa con cada cambio, para que otros módulos detecten cuándo recalcular
+        self.version: int = 0
+
+    @staticmethod
+    def _get_side(position_type: int) -> str:
+        """
+        Returns the side ("LONG" or "SHORT") of a position type.
+        """
+        return "LONG" if position_type == mt5.ORDER_TYPE_BUY else "SHORT"
+
+    def _add_to_totals(self, position: Position, sign: int) -> None:
+        """
+        Adds (sign=1) or removes (sign=-1) a position from the aggregated counts and volumes.
+
+        Args:
+            position (Position): The position.
+            sign (int): 1 to add the position, -1 to remove it.
+
+        Returns:
+            None
+        """
+        side = self._get_side(position.type)
+        for key in ((position.magic, position.symbol, side), (None, position.symbol, side)):
+            totals = self._totals.setdefault(key, [0, 0.0])
+            totals[0] += sign
+            totals[1] += sign * position.volume
+            if totals[0] <= 0:
+                del self._totals[key]
+
+    def _set_position(self, position: Position) -> None:
+        """
+        Adds or replaces a position in the book.
+        """
+        self._remove_position(position.ticket)
+        self._positions[position.ticket] = position
+        self._add_to_totals(position, 1)
+        self.version += 1
+
+    def _remove_position(self, ticket: int) -> None:
+        """
+        Removes a position from the book, if it is there.
+        """
+        position = self._positions.pop(ticket, None)
+        if position is not None:
+            self._add_to_totals(position, -1)
+            self.version += 1
+
+    def on_execution(self, execution_event: ExecutionEvent) -> None:
+        """
+        Updates the position book from an execution event (a new position, an increase, a partial or a total close).
+
+        Args:
+            execution_event (ExecutionEvent): The execution event.
+
+        Returns:
+            None
+        """
+        ticket = execution_event.position_id
+        if ticket == 0:
+            # Sin identificador de posición no podemos aplicar la ejecución: reconciliamos en la siguiente consulta
+            self.request_reconciliation()
+            return
+
+        position = self._positions.get(ticket)
+
+        if execution_event.closes_position:
+            if position is None:
+                return
+            remaining_volume = position.volume - execution_event.volume
+            if remaining_volume > self._VOLUME_EPSILON:
+                self._set_position(position.model_copy(update={"volume": remaining_volume}))
+            else:
+                self._remove_position(ticket)
+                if remaining_volume < -self._VOLUME_EPSILON:
+                    # Cierre por un volumen mayor al de la posición (reversal en cuentas netting)
+                    self.request_reconciliation()
+
+        elif position is None:
+            self._set_position(Position(ticket=ticket,
+                                        symbol=execution_event.symbol,
+                                        magic=execution_event.magic_number,
+                                        type=mt5.ORDER_TYPE_BUY if execution_event.signal == "BUY" else mt5.ORDER_TYPE_SELL,
+                                        volume=execution_event.volume,
+                                        price_open=execution_event.fill_price))
+
+        else:
+            # Aumento de una posición existente (cuentas netting): precio medio ponderado
+            volume = position.volume + execution_event.volume
+            price_open = (position.price_open * position.volume + execution_event.fill_price * execution_event.volume) / volume
+            self._set_position(position.model_copy(update={"volume": volume, "price_open": price_open}))
+
+    def on_pending_order_placed(self) -> None:
+        """
+        Registers that the strategy has placed a pending order, so the position book is reconciled with the shorter
+        pending interval until the platform shows no pending orders of the strategy.
+
+        Returns:
+            None
+        """
+        self._has_pending_orders = True
+
+    def request_reconciliation(self) -> None:
+        """
+        Forces a reconciliation of the position book with the platform in the next query.
+
+        Returns:
+            None
+        """
+        self._last_reconciliation = None
+
+    def reconcile(self) -> None:
+        """
+        Reconciles the position book with the open positions of the platform, applying the differences and logging
+        the drift found.
+
+        Returns:
+            None
+        """
+        platform_positions = mt5.positions_get()
+        if platform_positions is None:
+            print(f"{Utils.dateprint()} - ERROR: No se han podido recuperar las posiciones para reconciliar el portfolio. MT5 error: {mt5.last_error()}")
+            return
+
+        self._last_reconciliation = Clock.now()
+
+        # Órdenes pendientes de la estrategia: mientras haya alguna, reconciliamos con más frecuencia
+        pending_orders = mt5.orders_get()
+        if pending_orders is not None:
+            self._has_pending_orders = any(order.magic == self.magic for order in pending_orders)
+
+        snapshot = {position.ticket: Position(ticket=position.ticket,
+                                              symbol=position.symbol,
+                                              magic=position.magic,
+                                              type=position.type,
+                                              volume=position.volume,
+                                              price_open=position.price_open) for position in platform_positions}
+
+        # Posiciones cerradas en la plataforma (SL, TP, cierres manuales...)
+        closed = [ticket for ticket in self._positions if ticket not in snapshot]
+        for ticket in closed:
+            self._remove_position(ticket)
+
+        # Posiciones nuevas (órdenes pendientes ejecutadas, aperturas manuales...) o modificadas
+        opened = 0
+        modified = 0
+        for ticket, position in snapshot.items():
+            current = self._positions.get(ticket)
+            if current is None:
+                opened += 1
+                self._set_position(position)
+            elif current.type != position.type or abs(current.volume - position.volume) > self._VOLUME_EPSILON:
+                modified += 1
+                self._set_position(position)
+
+        # En la primera reconciliación se carga el libro, no hay desviación que registrar
+        if self._reconciled_once and (closed or opened or modified):
+            print(f"{Utils.dateprint()} - PORTFOLIO: Reconciliado el libro de posiciones con la plataforma: {opened} nuevas, {len(closed)} cerradas y {modified} modificadas")
+        self._reconciled_once = True
+
+    def reconcile_if_due(self) -> None:
+        """
+        Reconciles the position book if the reconciliation interval has elapsed (or a reconciliation was requested).
+        While the strategy has pending orders, the pending interval is used instead.
+
+        Returns:
+            None
+        """
+        interval = self.pending_reconcile_interval if self._has_pending_orders else self.reconcile_interval
+        if self._last_reconciliation is None or Clock.now() - self._last_reconciliation >= interval:
+            self.reconcile()
 
     def get_open_positions(self) -> tuple:
         """
-        Retrieves the open positions from the MetaTrader 5 platform.
+        Retrieves the open positions of the account.
 
         Returns:
             tuple: A tuple containing the open positions.
         """
-        return mt5.positions_get()
+        self.reconcile_if_due()
+        return tuple(self._positions.values())
 
     def get_strategy_open_positions(self) -> tuple:
         """
@@ -30,12 +236,17 @@ class Portfolio():
         Returns:
             tuple: A tuple containing the open positions for the strategy.
         """
-        positions = []
-        for position in mt5.positions_get():
-            if position.magic == self.magic:
-                positions.append(position)
-        
-        return tuple(positions)
+        self.reconcile_if_due()
+        return tuple(position for position in self._positions.values() if position.magic == self.magic)
+
+    def _get_counts(self, magic: int | None, symbol: str) -> Dict[str, int]:
+        """
+        Returns the count of long, short and total positions of a magic number (None for all) and symbol.
+        """
+        self.reconcile_if_due()
+        longs = self._totals.get((magic, symbol, "LONG"), (0, 0.0))[0]
+        shorts = self._totals.get((magic, symbol, "SHORT"), (0, 0.0))[0]
+        return {"LONG": longs, "SHORT": shorts, "TOTAL": longs + shorts}
 
     def get_number_of_open_positions_by_symbol(self, symbol: str) -> Dict[str, int]:
         """
@@ -48,15 +259,7 @@ class Portfolio():
             Dict[str, int]: A dictionary containing the count of long positions, short positions, and total positions.
 
         """
-        longs = 0
-        shorts = 0
-        for position in mt5.positions_get(symbol=symbol):
-            if position.type == mt5.ORDER_TYPE_BUY:
-                longs += 1
-            else:
-                shorts += 1
-        
-        return {"LONG": longs, "SHORT": shorts, "TOTAL": longs + shorts}
+        return self._get_counts(None, symbol)
 
     def get_number_of_strategy_open_positions_by_symbol(self, symbol: str) -> Dict[str, int]:
         """
@@ -69,14 +272,33 @@ class Portfolio():
             Dict[str, int]: A dictionary containing the count of long positions, short positions, and the total count.
 
         """
-        longs = 0
-        shorts = 0
+        return self._get_counts(self.magic, symbol)
+
+    def get_strategy_volume_by_symbol(self, symbol: str) -> Dict[str, float]:
+        """
+        Get the open volume for a given symbol in the strategy's portfolio.
 
-        for position in mt5.positions_get(symbol=symbol):
-            if position.magic == self.magic:
-                if position.type == mt5.ORDER_TYPE_BUY:
-                    longs += 1
-                else:
-                    shorts += 1
-        
-        return {"LONG": longs, "SHORT": shorts, "TOTAL": longs + shorts}
\ No newline at end of file
+        Args:
+            symbol (str): The symbol for which to sum the open volume.
+
+        Returns:
+            Dict[str, float]: A dictionary containing the long volume, the short volume, and the net volume (long - short).
+        """
+        self.reconcile_if_due()
+        longs = self._totals.get((self.magic, symbol, "LONG"), (0, 0.0))[1]
+        shorts = self._totals.get((self.magic, symbol, "SHORT"), (0, 0.0))[1]
+        return {"LONG": longs, "SHORT": shorts, "NET": longs - shorts}
+
+    def get_strategy_net_volumes(self) -> Dict[str, float]:
+        """
+        Get the net open volume (long - short) of every symbol with open positions in the strategy's portfolio.
+
+        Returns:
+            Dict[str, float]: The net volume in lots by symbol.
+        """
+        self.reconcile_if_due()
+        net_volumes: Dict[str, float] = {}
+        for (magic, symbol, side), (_, volume) in self._totals.items():
+            if magic == self.magic:
+                net_volumes[symbol] = net_volumes.get(symbol, 0.0) + (volume if side == "LONG" else -volume)
+        return net_volumes
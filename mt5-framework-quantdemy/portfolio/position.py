@@ -0,0 +1,23 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class Position(BaseModel):
+    """
+    An open position of the local position book. It has the same attributes as the positions returned by
+    mt5.positions_get, so both can be used interchangeably.
+
+    Attributes:
+        ticket (int): The ticket of the position.
+        symbol (str): The symbol of the position.
+        magic (int): The magic number of the position.
+        type (int): The type of the position (mt5.ORDER_TYPE_BUY or mt5.ORDER_TYPE_SELL).
+        volume (float): The open volume of the position, in lots.
+        price_open (float): The open price of the position.
+    """
+    ticket: int
+    symbol: str
+    magic: int
+    type: int
+    volume: float
+    price_open: float
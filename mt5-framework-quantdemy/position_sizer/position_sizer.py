@@ -2,18 +2,24 @@
 
 from utils.utils import Utils
 from data_provider.data_provider import DataProvider
-from events.events import SignalEvent, SizingEvent
+from events.events import SignalEvent, SizingEvent, DataEvent
+from indicators.indicator_engine import IndicatorEngine
+from market_statistics.correlation_engine import CorrelationEngine
+from utils.symbol_metadata_cache import SymbolMetadataCache
 from .interfaces.position_sizer_interface import IPositionSizer
-from .properties.position_sizer_properties import BaseSizerProps, MinSizingProps, FixedSizingProps, RiskPctSizingProps
+from .properties.position_sizer_properties import BaseSizerProps, MinSizingProps, FixedSizingProps, RiskPctSizingProps, VolTargetSizingProps, RiskParitySizingProps
 from .position_sizers.min_size_position_sizer import MinSizePositionSizer
 from .position_sizers.fixed_size_position_sizer import FixedSizePositionSizer
 from .position_sizers.risk_pct_position_sizer import RiskPctPositionSizer
-import MetaTrader5 as mt5
+from .position_sizers.vol_target_position_sizer import VolTargetPositionSizer
+from .position_sizers.risk_parity_position_sizer import RiskParityPositionSizer
+from typing import List
 from queue import Queue
 
 class PositionSizer(IPositionSizer):
 
-    def __init__(self, events_queue: Queue, data_provider: DataProvider, sizing_properties: BaseSizerProps):
+    def __init__(self, events_queue: Queue, data_provider: DataProvider, sizing_properties: BaseSizerProps, indicator_engine: IndicatorEngine | None = None,
+                 correlation_engine: CorrelationEngine | None = None):
         """
         Initialize the PositionSizer object.
 
@@ -21,12 +27,16 @@ class PositionSizer(IPositionSizer):
             events_queue (Queue): The queue for receiving events.
             data_provider (DataProvider): The data provider object.
             sizing_properties (BaseSizerProps): The sizing properties object.
+            indicator_engine (IndicatorEngine | None): The indicator engine shared with the strategies (used by the sizers based on indicators).
+            correlation_engine (CorrelationEngine | None): The engine with the rolling covariance of the symbol returns (used by the allocation sizers).
 
         Returns:
             None
         """
         self.events_queue = events_queue
         self.DATA_PROVIDER = data_provider
+        self.INDICATOR_ENGINE = indicator_engine
+        self.CORRELATIONS = correlation_engine
         self.position_sizing_method = self._get_position_sizing_method(sizing_properties)
 
     def _get_position_sizing_method(self, sizing_props: BaseSizerProps) -> IPositionSizer:
@@ -50,6 +60,14 @@ class PositionSizer(IPositionSizer):
         
         elif isinstance(sizing_props, RiskPctSizingProps):
             return RiskPctPositionSizer(properties=sizing_props)
+
+        elif isinstance(sizing_props, VolTargetSizingProps):
+            return VolTargetPositionSizer(properties=sizing_props, indicator_engine=self.INDICATOR_ENGINE)
+
+        elif isinstance(sizing_props, RiskParitySizingProps):
+            if self.CORRELATIONS is None:
+                raise Exception("ERROR: El sizing por risk parity necesita un correlation engine")
+            return RiskParityPositionSizer(properties=sizing_props, correlation_engine=self.CORRELATIONS)
         
         else:
             raise Exception(f"ERROR: Método de sizing desconocido: {sizing_props}")
@@ -78,6 +96,19 @@ class PositionSizer(IPositionSizer):
         # Colocamos el sizing event a la cola de eventos
         self.events_queue.put(sizing_event)
 
+    def on_data_event(self, data_event: DataEvent) -> None:
+        """
+        Passes a data event to the sizing method, if it keeps state updated with the bars (e.g. an ATR).
+
+        Args:
+            data_event (DataEvent): The data event.
+
+        Returns:
+            None
+        """
+        if hasattr(self.position_sizing_method, 'on_data_event'):
+            self.position_sizing_method.on_data_event(data_event, self.DATA_PROVIDER)
+
     def size_signal(self, signal_event: SignalEvent) -> None:
         """
         Sizes the position based on the given signal event.
@@ -90,11 +121,44 @@ class PositionSizer(IPositionSizer):
         """
         # Obtener el volumen adecuado según el método de sizing
         volume = self.position_sizing_method.size_signal(signal_event, self.DATA_PROVIDER)
+        self._check_and_put_sizing_event(signal_event, volume)
+
+    def size_signals(self, signal_events: List[SignalEvent]) -> None:
+        """
+        Sizes the signals of one bar close. If the sizing method allocates across simultaneous signals, they are sized
+        together in one pass; otherwise, each one is sized on its own.
+
+        Args:
+            signal_events (List[SignalEvent]): The signal events to be sized.
 
+        Returns:
+            None
+        """
+        if not hasattr(self.position_sizing_method, 'size_signals'):
+            for signal_event in signal_events:
+                self.size_signal(signal_event)
+            return
+
+        volumes = self.position_sizing_method.size_signals(signal_events, self.DATA_PROVIDER)
+        for signal_event, volume in zip(signal_events, volumes):
+            self._check_and_put_sizing_event(signal_event, volume)
+
+    def _check_and_put_sizing_event(self, signal_event: SignalEvent, volume: float) -> None:
+        """
+        Checks that the volume is admitted by the symbol and, if so, creates the sizing event and puts it into the queue.
+
+        Args:
+            signal_event (SignalEvent): The signal event that has been sized.
+            volume (float): The volume of the signal.
+
+        Returns:
+            None
+        """
         # Control de seguridad
-        if volume < mt5.symbol_info(signal_event.symbol).volume_min:
+        metadata = SymbolMetadataCache.get(signal_event.symbol)
+        if metadata is None or volume < metadata.volume_min:
             print(f"{Utils.dateprint()} - ERROR: El volumen {volume} es menor al volumen mínimo admitido por el símbolo {signal_event.symbol}")
             return
         
         # Crear el evento y ponerlo en la cola
-        self._create_and_put_sizing_event(signal_event, volume)
\ No newline at end of file
+        self._create_and_put_sizing_event(signal_event, volume)
@@ -4,7 +4,7 @@ from utils.utils import Utils
 from data_provider.data_provider import DataProvider
 from events.events import SignalEvent
 from ..interfaces.position_sizer_interface import IPositionSizer
-import MetaTrader5 as mt5
+from utils.terminal import mt5
 
 class MinSizePositionSizer(IPositionSizer):
 
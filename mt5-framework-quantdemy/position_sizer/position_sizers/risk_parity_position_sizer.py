@@ -0,0 +1,158 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from data_provider.data_provider import DataProvider
+from events.events import SignalEvent
+from market_statistics.correlation_engine import CorrelationEngine
+from ..interfaces.position_sizer_interface import IPositionSizer
+from ..properties.position_sizer_properties import RiskParitySizingProps
+from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+from typing import List
+import numpy as np
+
+class RiskParityPositionSizer(IPositionSizer):
+
+    def __init__(self, properties: RiskParitySizingProps, correlation_engine: CorrelationEngine):
+        """
+        Initializes a RiskParityPositionSizer object.
+
+        The signals of one bar close are sized together: the exposure of each one is allocated with inverse volatility
+        or risk parity over the covariance of their (signed) returns, and the basket is scaled so that its standard
+        deviation per bar is the risk budget. All the allocation math works on arrays of the size of the basket.
+
+        Args:
+            properties (RiskParitySizingProps): The properties of the allocation.
+            correlation_engine (CorrelationEngine): The engine with the rolling covariance of the symbol returns.
+
+        Raises:
+            Exception: If the allocation method is unknown.
+        """
+        if properties.method not in ("RISK_PARITY", "INVERSE_VOL"):
+            raise Exception(f"ERROR: Método de asignación desconocido: {properties.method}")
+
+        self.risk_budget_pct = properties.risk_budget_pct
+        self.method = properties.method
+        self.max_iterations = properties.max_iterations
+        self.tolerance = properties.tolerance
+        self.CORRELATIONS = correlation_engine
+        self._index = {symbol: i for i, symbol in enumerate(self.CORRELATIONS.symbols)}
+
+    def _compute_weights(self, covariance: np.ndarray) -> np.ndarray:
+        """
+        Computes the relative exposures of the basket.
+
+        Args:
+            covariance (np.ndarray): The covariance matrix of the signed returns of the signals.
+
+        Returns:
+            np.ndarray: The (positive) relative exposure of every signal.
+        """
+        volatility = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+        weights = 1.0 / volatility
+        if self.method == "INVERSE_VOL" or len(weights) == 1:
+            return weights
+
+        # Risk parity: minimizamos ½w'Σw - Σ ln(w_i)/n (convexa), cuyo mínimo iguala las contribuciones al riesgo
+        # w_i·(Σw)_i. Con el método de Newton converge en pocas iteraciones aunque la cesta tenga coberturas
+        budget = 1.0 / len(weights)
+        weights /= np.sqrt(weights @ covariance @ weights)
+        for _ in range(self.max_iterations):
+            contributions = weights * (covariance @ weights)
+            if contributions.max() - contributions.min() <= self.tolerance * abs(contributions.mean()):
+                break
+            gradient = covariance @ weights - budget / weights
+            hessian = covariance + np.diag(budget / weights**2)
+            step = np.linalg.solve(hessian, gradient)
+
+            # Reducimos el paso hasta que todos los pesos sigan siendo positivos
+            t = 1.0
+            while np.any(weights - t * step <= 0.0):
+                t *= 0.5
+            weights = weights - t * step
+        return weights
+
+    def size_signals(self, signal_events: List[SignalEvent], data_provider: DataProvider) -> List[float]:
+        """
+        Sizes together the signals of one bar close, allocating the risk budget across them.
+
+        Args:
+            signal_events (List[SignalEvent]): The signal events to be sized.
+            data_provider (DataProvider): The data provider used to retrieve the entry prices.
+
+        Returns:
+            List[float]: The volume of every signal, in the same order, rounded down to the volume step of its symbol.
+        """
+        volumes = [0.0] * len(signal_events)
+        if not self.CORRELATIONS.is_ready:
+            print(f"{Utils.dateprint()} - ERROR (RiskParityPositionSizer): La ventana de covarianzas todavía no está completa")
+            return volumes
+
+        # Señales que podemos dimensionar: símbolo en el correlation engine, con información de contrato y precio de entrada
+        positions = []
+        indices = []
+        lot_values = []
+        metadata_list = []
+        account_currency = SymbolMetadataCache.get_account_currency()
+        for position, signal_event in enumerate(signal_events):
+            symbol = signal_event.symbol
+            metadata = SymbolMetadataCache.get(symbol)
+            if symbol not in self._index or metadata is None:
+                print(f"{Utils.dateprint()} - ERROR (RiskParityPositionSizer): No hay covarianzas o información de contrato del símbolo {symbol}")
+                continue
+
+            if signal_event.target_order == "MARKET":
+                last_tick = data_provider.get_latest_tick(symbol)
+                entry_price = (last_tick.get('ask', 0.0) if signal_event.signal == "BUY" else last_tick.get('bid', 0.0)) if last_tick else 0.0
+            else:
+                entry_price = signal_event.target_price
+
+            # Valor de un lote en la divisa de la cuenta
+            lot_value = entry_price * metadata.trade_contract_size * SymbolMetadataCache.get_conversion_rate(metadata.currency_profit, account_currency)
+            if lot_value <= 0.0:
+                print(f"{Utils.dateprint()} - ERROR (RiskParityPositionSizer): No se ha podido valorar un lote de {symbol}")
+                continue
+
+            positions.append(position)
+            indices.append(self._index[symbol])
+            lot_values.append(lot_value)
+            metadata_list.append(metadata)
+
+        if not positions:
+            return volumes
+
+        # Covarianza de los retornos con signo de las señales (las ventas tienen el retorno invertido)
+        idx = np.array(indices)
+        sign = np.array([1.0 if signal_events[position].signal == "BUY" else -1.0 for position in positions])
+        covariance = self.CORRELATIONS.get_covariance_matrix()[np.ix_(idx, idx)] * np.outer(sign, sign)
+        if np.any(np.diag(covariance) <= 0.0):
+            print(f"{Utils.dateprint()} - ERROR (RiskParityPositionSizer): Hay símbolos sin volatilidad en la ventana de covarianzas")
+            return volumes
+
+        # Escalamos la cesta para que su desviación típica por vela sea el presupuesto de riesgo
+        weights = self._compute_weights(covariance)
+        basket_volatility = np.sqrt(weights @ covariance @ weights)
+        if not basket_volatility > 0.0:
+            return volumes
+        exposures = weights * (SymbolMetadataCache.get_equity() * self.risk_budget_pct / basket_volatility)
+
+        # Volúmenes redondeados hacia abajo al volume step y limitados al volumen máximo
+        volume_step = np.array([metadata.volume_step if metadata.volume_step > 0 else 0.01 for metadata in metadata_list])
+        volume_max = np.array([metadata.volume_max for metadata in metadata_list])
+        basket_volumes = np.minimum(np.floor(exposures / np.array(lot_values) / volume_step + 1e-9) * volume_step, volume_max)
+
+        for position, volume in zip(positions, np.round(basket_volumes, 8).tolist()):
+            volumes[position] = volume
+        return volumes
+
+    def size_signal(self, signal_event: SignalEvent, data_provider: DataProvider) -> float:
+        """
+        Sizes a single signal, as a basket of one.
+
+        Args:
+            signal_event (SignalEvent): The signal event containing information about the trade.
+            data_provider (DataProvider): The data provider used to retrieve market data.
+
+        Returns:
+            float: The size of the position.
+        """
+        return self.size_signals([signal_event], data_provider)[0]
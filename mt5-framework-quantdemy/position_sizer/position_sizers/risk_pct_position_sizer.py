@@ -5,7 +5,7 @@ from events.events import SignalEvent
 from ..interfaces.position_sizer_interface import IPositionSizer
 from ..properties.position_sizer_properties import RiskPctSizingProps
 from utils.utils import Utils
-import MetaTrader5 as mt5
+from utils.terminal import mt5
 
 class RiskPctPositionSizer(IPositionSizer):
 
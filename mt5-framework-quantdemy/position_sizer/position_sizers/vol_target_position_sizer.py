@@ -0,0 +1,83 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from data_provider.data_provider import DataProvider
+from events.events import SignalEvent, DataEvent
+from indicators.indicator_engine import IndicatorEngine
+from indicators.properties.indicator_properties import ATRIndicatorProps
+from ..interfaces.position_sizer_interface import IPositionSizer
+from ..properties.position_sizer_properties import VolTargetSizingProps
+from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+import math
+
+class VolTargetPositionSizer(IPositionSizer):
+
+    def __init__(self, properties: VolTargetSizingProps, indicator_engine: IndicatorEngine | None = None):
+        """
+        Initializes a VolTargetPositionSizer object.
+
+        The ATR of every symbol is updated incrementally on each data event (and shared with the strategies if the
+        indicator engine is shared), and the contract data comes from the metadata cache, so sizing a signal is O(1)
+        and only reads the (cached) equity.
+
+        Args:
+            properties (VolTargetSizingProps): The properties of the volatility-targeting sizing.
+            indicator_engine (IndicatorEngine | None): The shared indicator engine. If None, the sizer creates its own.
+        """
+        self.timeframe = properties.timeframe
+        self.atr_multiple = properties.atr_multiple
+        self.risk_pct = properties.risk_pct
+        self.atr_props = ATRIndicatorProps(period=properties.atr_period)
+
+        self.INDICATORS = indicator_engine if indicator_engine is not None else IndicatorEngine()
+        self.subscription_id = self.INDICATORS.subscribe(self.timeframe, [self.atr_props])
+
+    def on_data_event(self, data_event: DataEvent, data_provider: DataProvider) -> None:
+        """
+        Updates the ATR of the symbol of a data event.
+
+        Args:
+            data_event (DataEvent): The data event.
+            data_provider (DataProvider): The data provider.
+
+        Returns:
+            None
+        """
+        self.INDICATORS.on_data_event(self.subscription_id, data_event, data_provider)
+
+    def size_signal(self, signal_event: SignalEvent, data_provider: DataProvider) -> float:
+        """
+        Calculates the volume that loses the target risk if the price moves atr_multiple ATRs against the position.
+
+        Args:
+            signal_event (SignalEvent): The signal event containing information about the trade.
+            data_provider (DataProvider): The data provider used to retrieve market data.
+
+        Returns:
+            float: The size of the position, rounded down to the volume step of the symbol.
+        """
+        symbol = signal_event.symbol
+        if not self.INDICATORS.is_ready(symbol, self.timeframe, [self.atr_props]):
+            print(f"{Utils.dateprint()} - ERROR (VolTargetPositionSizer): El ATR de {symbol} todavía no está disponible")
+            return 0.0
+
+        metadata = SymbolMetadataCache.get(symbol)
+        if metadata is None or metadata.trade_tick_size <= 0.0:
+            print(f"{Utils.dateprint()} - ERROR (VolTargetPositionSizer): No se ha podido recuperar la información del símbolo {symbol}")
+            return 0.0
+
+        # Valor de un tick por lote en la divisa de la cuenta (con el tipo de conversión cacheado)
+        conversion_rate = SymbolMetadataCache.get_conversion_rate(metadata.currency_profit, SymbolMetadataCache.get_account_currency())
+        tick_value_account_ccy = metadata.trade_contract_size * metadata.trade_tick_size * conversion_rate
+
+        stop_distance_in_ticks = self.atr_multiple * self.INDICATORS.get_value(symbol, self.timeframe, self.atr_props) / metadata.trade_tick_size
+        if stop_distance_in_ticks <= 0.0 or tick_value_account_ccy <= 0.0:
+            print(f"{Utils.dateprint()} - ERROR (VolTargetPositionSizer): No se puede calcular el riesgo por lote de {symbol}")
+            return 0.0
+
+        monetary_risk = SymbolMetadataCache.get_equity() * self.risk_pct
+        volume = monetary_risk / (stop_distance_in_ticks * tick_value_account_ccy)
+
+        # Redondeamos hacia abajo al volume step para no superar el riesgo objetivo
+        volume = math.floor(volume / metadata.volume_step + 1e-9) * metadata.volume_step
+        return round(min(volume, metadata.volume_max), 8)
@@ -24,4 +24,36 @@ class RiskPctSizingProps(BaseSizerProps):
     Attributes:
         risk_pct (float): The risk percentage for position sizing.
     """
-    risk_pct: float
\ No newline at end of file
+    risk_pct: float
+
+class VolTargetSizingProps(BaseSizerProps):
+    """
+    Properties for volatility-targeting position sizing: the stop distance is a multiple of the ATR, and the volume
+    is the one that loses the target risk at that distance.
+
+    Attributes:
+        timeframe (str): The timeframe of the ATR.
+        atr_period (int): The period of the ATR.
+        atr_multiple (float): The number of ATRs of the assumed stop distance.
+        risk_pct (float): The target risk per trade, as a fraction of the equity.
+    """
+    timeframe: str
+    atr_period: int = 14
+    atr_multiple: float = 2.0
+    risk_pct: float = 0.01
+
+class RiskParitySizingProps(BaseSizerProps):
+    """
+    Properties for the joint sizing of the signals of one bar close: a total risk budget is allocated across them
+    from the rolling covariance of the correlation engine.
+
+    Attributes:
+        risk_budget_pct (float): The target standard deviation of the value of the basket per bar, as a fraction of the equity.
+        method (str): "RISK_PARITY" (equal risk contributions) or "INVERSE_VOL" (exposure inversely proportional to the volatility).
+        max_iterations (int): The maximum number of iterations of the risk parity solver.
+        tolerance (float): The maximum relative difference between risk contributions at which the solver stops.
+    """
+    risk_budget_pct: float = 0.01
+    method: str = "RISK_PARITY"
+    max_iterations: int = 100
+    tolerance: float = 1e-6
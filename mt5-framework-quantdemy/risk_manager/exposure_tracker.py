@@ -0,0 +1,275 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from portfolio.portfolio import Portfolio
+from events.events import DataEvent
+from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+from clock.clock import Clock
+from datetime import datetime, timedelta
+from typing import Dict, Set, Tuple
+from utils.terminal import mt5
+
+
+class ExposureTracker():
+
+    def __init__(self, portfolio: Portfolio, rate_refresh_seconds: float = 1.0):
+        """
+        Initializes the ExposureTracker object.
+
+        The net units of every symbol are taken from the position book of the portfolio only when it changes (fills,
+        closes or reconciliations). The value of each symbol in the account currency is recomputed only when its
+        units, its price or its conversion rate change, and the total is kept updated incrementally, so reading the
+        current exposure is O(1) and never queries the platform. Prices are updated with the close of every data
+        event, and the rates that are not fed by data events (e.g. the FX conversion symbols) are refreshed from the
+        platform on data events, at most once per rate_refresh_seconds.
+
+        Args:
+            portfolio (Portfolio): The portfolio whose positions are tracked.
+            rate_refresh_seconds (float): The maximum age of a cached price or conversion rate.
+        """
+        self.PORTFOLIO = portfolio
+        self.rate_refresh = timedelta(seconds=rate_refresh_seconds)
+
+        # Datos estáticos cacheados: (tamaño de contrato, divisa de beneficio, símbolo de conversión) por símbolo
+        self._symbol_specs: Dict[str, Tuple[float, str, str | None]] = {}
+
+        # Caché de precios: símbolo -> (bid, momento de la consulta)
+        self._rates: Dict[str, Tuple[float, datetime]] = {}
+
+        # Símbolos con posición cuyo valor depende de cada precio (el propio símbolo y su símbolo de conversión)
+        self._dependents: Dict[str, Set[str]] = {}
+
+        # Exposición por símbolo: unidades netas, precio y tipo de conversión usados, y valor en la divisa de la cuenta
+        self._units: Dict[str, float] = {}
+        self._valuation: Dict[str, Tuple[float, float]] = {}
+        self._values: Dict[str, float] = {}
+        self.total_value: float = 0.0
+
+        # Versión de la exposición: se incrementa con cada cambio del valor de algún símbolo
+        self.version: int = 0
+
+        self._portfolio_version: int = -1
+
+    def _get_symbol_specs(self, symbol: str) -> Tuple[float, str, str | None]:
+        """
+        Returns the contract size, the profit currency and the FX symbol to convert to the account currency (None if
+        no conversion is needed) of a symbol (cached).
+        """
+        specs = self._symbol_specs.get(symbol)
+        if specs is None:
+            metadata = SymbolMetadataCache.get(symbol)
+            account_currency = SymbolMetadataCache.get_account_currency()
+            fx_symbol = None if metadata.currency_profit == account_currency else Utils.get_conversion_fx_symbol(metadata.currency_profit, account_currency)
+            specs = (metadata.trade_contract_size, metadata.currency_profit, fx_symbol)
+            self._symbol_specs[symbol] = specs
+        return specs
+
+    def _get_rate(self, symbol: str) -> float:
+        """
+        Returns the cached bid of a symbol. It is only retrieved from the platform the first time it is needed; after
+        that it is kept updated by on_data_event.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            float: The bid, or 0.0 if it cannot be retrieved.
+        """
+        cached = self._rates.get(symbol)
+        if cached is not None:
+            return cached[0]
+        return self._fetch_rate(symbol)
+
+    def _fetch_rate(self, symbol: str) -> float:
+        """
+        Retrieves the bid of a symbol from the platform and caches it.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            float: The bid, the previous cached one if it cannot be retrieved, or 0.0 if there is none.
+        """
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None:
+            print(f"{Utils.dateprint()} - ERROR: No se pudo recuperar el último tick del símbolo {symbol}. MT5 error: {mt5.last_error()}")
+            cached = self._rates.get(symbol)
+            return cached[0] if cached is not None else 0.0
+
+        self._rates[symbol] = (tick.bid, Clock.now())
+        return tick.bid
+
+    def _set_rate(self, symbol: str, price: float) -> None:
+        """
+        Caches a new price of a symbol and revalues only the positions whose value depends on it.
+
+        Args:
+            symbol (str): The symbol.
+            price (float): The new price.
+
+        Returns:
+            None
+        """
+        self._rates[symbol] = (price, Clock.now())
+        for position_symbol in list(self._dependents.get(symbol, ())):
+            self._revalue(position_symbol)
+
+    def _track(self, symbol: str, tracked: bool) -> None:
+        """
+        Registers (or unregisters) a symbol with positions as a dependent of its price and of its conversion rate.
+
+        Args:
+            symbol (str): The symbol with positions.
+            tracked (bool): True if the symbol has positions, False if they have been closed.
+
+        Returns:
+            None
+        """
+        _, _, fx_symbol = self._get_symbol_specs(symbol)
+        for rate_symbol in (symbol, fx_symbol):
+            if rate_symbol is None:
+                continue
+            if tracked:
+                self._dependents.setdefault(rate_symbol, set()).add(symbol)
+            elif rate_symbol in self._dependents:
+                self._dependents[rate_symbol].discard(symbol)
+                if not self._dependents[rate_symbol]:
+                    del self._dependents[rate_symbol]
+
+    def _compute_value(self, symbol: str, units: float) -> Tuple[float, float, float]:
+        """
+        Computes the value in the account currency of a number of units of a symbol with the cached rates.
+
+        Args:
+            symbol (str): The symbol.
+            units (float): The signed units (positive long, negative short).
+
+        Returns:
+            Tuple[float, float, float]: The value, and the price and conversion rate used.
+        """
+        _, _, fx_symbol = self._get_symbol_specs(symbol)
+        price = self._get_rate(symbol)
+        value_in_profit_ccy = units * price
+        if fx_symbol is None:
+            return value_in_profit_ccy, price, 1.0
+
+        fx_price = self._get_rate(fx_symbol)
+        if fx_price <= 0.0:
+            return 0.0, price, fx_price
+        return Utils.convert_currency_amount_with_fx_price(value_in_profit_ccy, fx_price, fx_symbol, SymbolMetadataCache.get_account_currency()), price, fx_price
+
+    def _revalue(self, symbol: str) -> None:
+        """
+        Recomputes the value of a symbol if its units, price or conversion rate changed, updating the total.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            None
+        """
+        units = self._units.get(symbol, 0.0)
+        if units == 0.0:
+            if symbol in self._values:
+                self.total_value -= self._values.pop(symbol)
+                self.version += 1
+            self._valuation.pop(symbol, None)
+            return
+
+        value, price, fx_price = self._compute_value(symbol, units)
+        if self._valuation.get(symbol) == (price, fx_price):
+            return
+
+        self.total_value += value - self._values.get(symbol, 0.0)
+        self._values[symbol] = value
+        self._valuation[symbol] = (price, fx_price)
+        self.version += 1
+
+    def _sync_units(self) -> None:
+        """
+        Updates the net units of every symbol from the position book, if it changed since the last sync.
+
+        Returns:
+            None
+        """
+        self.PORTFOLIO.reconcile_if_due()
+        if self.PORTFOLIO.version == self._portfolio_version:
+            return
+        self._portfolio_version = self.PORTFOLIO.version
+
+        new_units = {}
+        for symbol, net_volume in self.PORTFOLIO.get_strategy_net_volumes().items():
+            contract_size, _, _ = self._get_symbol_specs(symbol)
+            new_units[symbol] = net_volume * contract_size
+
+        for symbol in set(self._units) | set(new_units):
+            units = new_units.get(symbol, 0.0)
+            if self._units.get(symbol, 0.0) != units:
+                if units == 0.0:
+                    self._units.pop(symbol, None)
+                else:
+                    self._units[symbol] = units
+                self._track(symbol, units != 0.0)
+                # Forzamos el recálculo del valor aunque los precios no hayan cambiado
+                self._valuation.pop(symbol, None)
+                self._revalue(symbol)
+
+    def get_current_value(self) -> float:
+        """
+        Returns the net value of the open positions of the strategy in the account currency (longs positive, shorts
+        negative).
+
+        Returns:
+            float: The net value.
+        """
+        # Los cambios de precio ya se han aplicado en on_data_event: aquí solo recogemos los cambios de posiciones
+        self._sync_units()
+        return self.total_value
+
+    def on_data_event(self, data_event: DataEvent) -> None:
+        """
+        Revalues the positions that depend on the price of the symbol of a new bar, and refreshes from the platform the
+        rates of the positions that are not fed by data events (e.g. the FX conversion symbols) if they are older than
+        rate_refresh_seconds.
+
+        Args:
+            data_event (DataEvent): The data event with the new bar.
+
+        Returns:
+            None
+        """
+        self._sync_units()
+        self._set_rate(data_event.symbol, float(data_event.data.close))
+
+        now = Clock.now()
+        for rate_symbol in list(self._dependents):
+            cached = self._rates.get(rate_symbol)
+            if cached is None or now - cached[1] >= self.rate_refresh:
+                self._set_rate(rate_symbol, self._fetch_rate(rate_symbol))
+
+    def get_values_by_symbol(self) -> Dict[str, float]:
+        """
+        Returns the net value of the open positions of the strategy in the account currency, by symbol.
+
+        Returns:
+            Dict[str, float]: The net value of every symbol with open positions.
+        """
+        self.get_current_value()
+        return dict(self._values)
+
+    def get_value_of_position(self, symbol: str, volume: float, position_type: int) -> float:
+        """
+        Returns the value of a (new) position in the account currency, with the cached rates.
+
+        Args:
+            symbol (str): The symbol of the position.
+            volume (float): The volume of the position, in lots.
+            position_type (int): The type of the position (mt5.ORDER_TYPE_BUY or mt5.ORDER_TYPE_SELL).
+
+        Returns:
+            float: The value of the position (negative for shorts).
+        """
+        contract_size, _, _ = self._get_symbol_specs(symbol)
+        units = volume * contract_size
+        value, _, _ = self._compute_value(symbol, units if position_type == mt5.ORDER_TYPE_BUY else -units)
+        return value
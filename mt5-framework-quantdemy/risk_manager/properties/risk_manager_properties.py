@@ -10,4 +10,39 @@ class MaxLeverageFactorRiskProps(BaseRiskProps):
     Risk properties for managing maximum leverage factor.
     """
 
-    max_leverage_factor: float
\ No newline at end of file
+    max_leverage_factor: float
+
+class DrawdownKillSwitchRiskProps(BaseRiskProps):
+    """
+    Risk properties for the kill-switch risk manager, which blocks new orders when a loss or activity limit is breached.
+
+    Attributes:
+        max_daily_loss_pct (float): The maximum loss of the day, as a fraction of the equity at the start of the day.
+        max_drawdown_pct (float): The maximum drawdown from the equity high-water mark, as a fraction.
+        max_trades_per_period (int): The maximum number of trades opened (filled) within the trailing period.
+        trades_period_hours (float): The length of the trailing period for the trade count, in hours.
+        flatten_on_breach (bool): If True, all the positions of the strategy are closed when a loss limit is breached.
+        reset_on_start (bool): If True, a halt restored from the checkpointed state is lifted on start (the operator
+            sets it for one restart to clear a halt, instead of deleting the state file).
+    """
+    max_daily_loss_pct: float = 0.03
+    max_drawdown_pct: float = 0.10
+    max_trades_per_period: int = 50
+    trades_period_hours: float = 24.0
+    flatten_on_breach: bool = False
+    reset_on_start: bool = False
+
+class VaRRiskProps(BaseRiskProps):
+    """
+    Risk properties for the parametric (variance-covariance) portfolio VaR risk manager.
+
+    Attributes:
+        max_var_pct (float): The maximum VaR (or expected shortfall) of the portfolio, as a fraction of the equity.
+        confidence (float): The confidence level of the VaR.
+        horizon_bars (int): The horizon of the VaR, in bars of the correlation engine timeframe.
+        use_expected_shortfall (bool): If True, the limit applies to the expected shortfall instead of the VaR.
+    """
+    max_var_pct: float = 0.02
+    confidence: float = 0.99
+    horizon_bars: int = 1
+    use_expected_shortfall: bool = False
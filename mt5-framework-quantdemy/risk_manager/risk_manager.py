@@ -1,18 +1,28 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
 from .interfaces.risk_manager_interface import IRiskManager
-from .properties.risk_manager_properties import BaseRiskProps, MaxLeverageFactorRiskProps
+from .properties.risk_manager_properties import BaseRiskProps, MaxLeverageFactorRiskProps, DrawdownKillSwitchRiskProps, VaRRiskProps
 from .risk_managers.max_leverage_factor_risk_manager import MaxLeverageFactorRiskManager
+from .risk_managers.drawdown_kill_switch_risk_manager import DrawdownKillSwitchRiskManager
+from .risk_managers.var_risk_manager import VaRRiskManager
+from .exposure_tracker import ExposureTracker
 from data_provider.data_provider import DataProvider
 from portfolio.portfolio import Portfolio
-from events.events import SizingEvent, OrderEvent
+from order_executor.order_executor import OrderExecutor
+from market_statistics.correlation_engine import CorrelationEngine
+from events.events import DataEvent, SizingEvent, OrderEvent, ExecutionEvent, OrderRejectedEvent, PlacedPendingOrderEvent
 from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+from datetime import datetime
+from typing import List
 from queue import Queue
-import MetaTrader5 as mt5
+import math
+from utils.terminal import mt5
 
 class RiskManager(IRiskManager):
     
-    def __init__(self, events_queue: Queue, data_provider: DataProvider, portfolio: Portfolio, risk_properties: BaseRiskProps):
+    def __init__(self, events_queue: Queue, data_provider: DataProvider, portfolio: Portfolio, risk_properties: BaseRiskProps,
+                 order_executor: OrderExecutor | None = None, correlation_engine: CorrelationEngine | None = None):
         """
         Initializes a RiskManager object.
 
@@ -21,6 +31,8 @@ class RiskManager(IRiskManager):
             data_provider (DataProvider): The data provider for retrieving market data.
             portfolio (Portfolio): The portfolio object for managing positions and balances.
             risk_properties (BaseRiskProps): The risk properties object for configuring risk management.
+            order_executor (OrderExecutor | None): The order executor used to close the positions when a risk manager requests it.
+            correlation_engine (CorrelationEngine | None): The correlation engine of the traded universe (needed by the VaR risk manager).
 
         Returns:
             None
@@ -28,6 +40,11 @@ class RiskManager(IRiskManager):
         self.events_queue = events_queue
         self.DATA_PROVIDER = data_provider
         self.PORTFOLIO = portfolio
+        self.ORDER_EXECUTOR = order_executor
+        self.CORRELATIONS = correlation_engine
+
+        # Exposición de la cuenta mantenida de forma incremental (evita revalorar todas las posiciones en cada orden)
+        self.EXPOSURE = ExposureTracker(portfolio)
         
         self.risk_management_method = self._get_risk_management_method(risk_properties)
     
@@ -46,9 +63,36 @@ class RiskManager(IRiskManager):
         """
         if isinstance(risk_props, MaxLeverageFactorRiskProps):
             return MaxLeverageFactorRiskManager(risk_props)
+        elif isinstance(risk_props, DrawdownKillSwitchRiskProps):
+            return DrawdownKillSwitchRiskManager(risk_props)
+        elif isinstance(risk_props, VaRRiskProps):
+            if self.CORRELATIONS is None:
+                raise Exception("ERROR: El VaR Risk Mgmt necesita un correlation engine")
+            return VaRRiskManager(risk_props, self.CORRELATIONS, self.EXPOSURE)
         else:
             raise Exception(f"ERROR: Método de Risk Mgmt desconocido: {risk_props}")
 
+    def get_state(self) -> dict:
+        """
+        Returns the state of the risk management method to be checkpointed (e.g. the halt of a kill switch).
+        """
+        method = self.risk_management_method
+        return {"method": method.get_state() if hasattr(method, 'get_state') else None}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the risk management method.
+
+        Args:
+            state (dict): The state returned by get_state.
+
+        Returns:
+            None
+        """
+        method = self.risk_management_method
+        if state.get("method") is not None and hasattr(method, 'set_state'):
+            method.set_state(state["method"])
+
     def _compute_current_value_of_positions_in_account_currency(self) -> float:
         """
         Computes the current value of positions in the account currency.
@@ -56,16 +100,8 @@ class RiskManager(IRiskManager):
         Returns:
             float: The total value of the positions in the account currency.
         """
-
-        # Recopilamos las posiciones abiertas por nuestra estrategia
-        current_positions = self.PORTFOLIO.get_strategy_open_positions()
-
-        # Vamos a calcular el valor de las posiciones abiertas
-        total_value = 0.0
-        for position in current_positions:
-            total_value += self._compute_value_of_position_in_account_currency(position.symbol, position.volume, position.type)
-        
-        return total_value
+        # El exposure tracker solo revalora los símbolos cuyas posiciones o precios han cambiado
+        return self.EXPOSURE.get_current_value()
 
     def _compute_value_of_position_in_account_currency(self, symbol: str, volume: float, position_type: int) -> float:
         """
@@ -79,21 +115,7 @@ class RiskManager(IRiskManager):
         Returns:
             float: The value of the position in the account currency.
         """
-        symbol_info = mt5.symbol_info(symbol)
-
-        # Unidades operadas en las unidades del symbol: (cantidad de moneda base, barriles de petroleo, onzas de oro)
-        traded_units = volume * symbol_info.trade_contract_size
-
-        # Valor de las unidades operadas en la divisa cotizada del símbolo (USD para el oro, USD para el petróleo, CHF para el GBPCHF, EUR para el DAX)
-        value_traded_in_profit_ccy = traded_units * self.DATA_PROVIDER.get_latest_tick(symbol)['bid']
-
-        # Valor de las unidades operadas en la divisa de nuestra cuenta de trading (la cuenta en el broker, la cuenta MT5)
-        value_traded_in_account_ccy = Utils.convert_currency_amount_to_another_currency(value_traded_in_profit_ccy, symbol_info.currency_profit, mt5.account_info().currency)
-
-        if position_type == mt5.ORDER_TYPE_SELL:
-            return -value_traded_in_account_ccy
-        else:
-            return value_traded_in_account_ccy
+        return self.EXPOSURE.get_value_of_position(symbol, volume, position_type)
 
     def _create_and_put_order_event(self, sizing_event: SizingEvent, volume: float) -> None:
         """
@@ -129,7 +151,11 @@ class RiskManager(IRiskManager):
         Returns:
             None
         """
-        
+        # Si el método puede reducir el volumen, una orden suelta sigue la misma regla que una ráfaga de órdenes
+        if hasattr(self.risk_management_method, 'get_compliant_volume'):
+            self.assess_orders([sizing_event])
+            return
+
         # Obtenemos el valor de todas las posiciones abiertas por la estrategia en la divisa de la cuenta
         current_position_value = self._compute_current_value_of_positions_in_account_currency()
 
@@ -139,8 +165,169 @@ class RiskManager(IRiskManager):
         
         # Obtenemos el nuevo volumen de la operacion que queremos ejecutar después de pasar por el risk manager
         new_volume = self.risk_management_method.assess_order(sizing_event, current_position_value, new_position_value)
+        if 0.0 < new_volume < sizing_event.volume:
+            new_volume = self._round_volume_down(sizing_event.symbol, new_volume)
 
         # Evaluamos el nuevo volumen
         if new_volume > 0.0:
             # colocar el order event a la cola de eventos
-            self._create_and_put_order_event(sizing_event, new_volume)
\ No newline at end of file
+            self._create_and_put_order_event(sizing_event, new_volume)
+
+    def update_equity(self, time: datetime, equity: float) -> None:
+        """
+        Passes a new equity mark to the risk management method (if it tracks the equity), and closes the positions of
+        the strategy if it requests it.
+
+        Args:
+            time (datetime): The time of the mark.
+            equity (float): The equity of the account.
+
+        Returns:
+            None
+        """
+        if not hasattr(self.risk_management_method, 'update_equity'):
+            return
+
+        self.risk_management_method.update_equity(time, equity)
+        if self.risk_management_method.consume_flatten_request():
+            self._flatten_strategy_positions()
+
+    def reset(self) -> bool:
+        """
+        Resets the risk management method manually (for example, lifts an active kill switch), if it supports it.
+
+        Returns:
+            bool: True if the method was reset, False if it has nothing to reset.
+        """
+        if not hasattr(self.risk_management_method, 'reset'):
+            return False
+        self.risk_management_method.reset()
+        return True
+
+    def on_data_event(self, data_event: DataEvent) -> None:
+        """
+        Revalues the exposure of the strategy with the price of the new bar.
+
+        Args:
+            data_event (DataEvent): The data event with the new bar.
+
+        Returns:
+            None
+        """
+        self.EXPOSURE.on_data_event(data_event)
+
+    def on_execution(self, execution_event: ExecutionEvent) -> None:
+        """
+        Passes an execution to the risk management method, if it tracks them.
+
+        Args:
+            execution_event (ExecutionEvent): The execution event.
+
+        Returns:
+            None
+        """
+        if hasattr(self.risk_management_method, 'on_execution'):
+            self.risk_management_method.on_execution(execution_event)
+
+    def on_order_rejected(self, rejection_event: OrderRejectedEvent) -> None:
+        """
+        Passes an order rejection to the risk management method, if it tracks them.
+
+        Args:
+            rejection_event (OrderRejectedEvent): The order rejection event.
+
+        Returns:
+            None
+        """
+        if hasattr(self.risk_management_method, 'on_order_rejected'):
+            self.risk_management_method.on_order_rejected(rejection_event)
+
+    def on_pending_order_placed(self, pending_order_event: PlacedPendingOrderEvent) -> None:
+        """
+        Passes a placed pending order to the risk management method, if it tracks them.
+
+        Args:
+            pending_order_event (PlacedPendingOrderEvent): The placed pending order event.
+
+        Returns:
+            None
+        """
+        if hasattr(self.risk_management_method, 'on_pending_order_placed'):
+            self.risk_management_method.on_pending_order_placed(pending_order_event)
+
+    def _flatten_strategy_positions(self) -> None:
+        """
+        Closes all the open positions of the strategy through the order executor.
+
+        Returns:
+            None
+        """
+        if self.ORDER_EXECUTOR is None:
+            print(f"{Utils.dateprint()} - ERROR: RISK MGMT: No hay order executor para cerrar las posiciones de la estrategia")
+            return
+
+        positions = self.PORTFOLIO.get_strategy_open_positions()
+        print(f"{Utils.dateprint()} - RISK MGMT: Cerrando las {len(positions)} posiciones abiertas de la estrategia")
+        self.ORDER_EXECUTOR.close_positions(positions)
+
+    def _round_volume_down(self, symbol: str, volume: float) -> float:
+        """
+        Rounds a scaled down volume down to the volume step of the symbol.
+
+        Args:
+            symbol (str): The symbol.
+            volume (float): The volume.
+
+        Returns:
+            float: The rounded volume, or 0.0 if it is below the minimum volume of the symbol.
+        """
+        metadata = SymbolMetadataCache.get(symbol)
+        if metadata is None:
+            return 0.0
+        step = metadata.volume_step if metadata.volume_step > 0 else 0.01
+        rounded = round(math.floor(volume / step + 1e-9) * step, 8)
+        return rounded if rounded >= metadata.volume_min else 0.0
+
+    def assess_orders(self, sizing_events: List[SizingEvent]) -> None:
+        """
+        Assesses a burst of sizing events (e.g. all the signals of the same bar close) against one snapshot of the
+        account, accumulating the exposure of the orders approved so far, so the combined leverage is checked.
+
+        The orders are evaluated in a deterministic priority: first the ones that reduce the net exposure, then the
+        rest by symbol. Orders that do not fit are scaled down (to the volume step of the symbol) or rejected.
+
+        Args:
+            sizing_events (List[SizingEvent]): The sizing events of the burst.
+
+        Returns:
+            None
+        """
+        if not hasattr(self.risk_management_method, 'get_compliant_volume'):
+            for sizing_event in sizing_events:
+                self.assess_order(sizing_event)
+            return
+
+        # Una única lectura del estado de la cuenta para todo el lote
+        current_position_value = self._compute_current_value_of_positions_in_account_currency()
+        account_info = mt5.account_info()
+        if account_info is None:
+            print(f"{Utils.dateprint()} - ERROR: No se ha podido recuperar la equity de la cuenta para evaluar {len(sizing_events)} órdenes. MT5 error: {mt5.last_error()}")
+            return
+
+        evaluations = []
+        for sizing_event in sizing_events:
+            position_type = mt5.ORDER_TYPE_BUY if sizing_event.signal == "BUY" else mt5.ORDER_TYPE_SELL
+            new_position_value = self._compute_value_of_position_in_account_currency(sizing_event.symbol, sizing_event.volume, position_type)
+            reduces_exposure = abs(current_position_value + new_position_value) < abs(current_position_value)
+            evaluations.append((not reduces_exposure, sizing_event.symbol, sizing_event.signal, sizing_event, new_position_value))
+
+        for _, _, _, sizing_event, new_position_value in sorted(evaluations, key=lambda evaluation: evaluation[:3]):
+            new_volume = self.risk_management_method.get_compliant_volume(sizing_event, current_position_value, new_position_value, account_info.equity)
+            if 0.0 < new_volume < sizing_event.volume:
+                new_volume = self._round_volume_down(sizing_event.symbol, new_volume)
+                if new_volume > 0.0:
+                    print(f"{Utils.dateprint()} - RISK MGMT: Volumen de {sizing_event.signal} en {sizing_event.symbol} reducido de {sizing_event.volume} a {new_volume} lotes por el Leverage Factor máx.")
+
+            if new_volume > 0.0:
+                current_position_value += new_position_value * new_volume / sizing_event.volume
+                self._create_and_put_order_event(sizing_event, new_volume)
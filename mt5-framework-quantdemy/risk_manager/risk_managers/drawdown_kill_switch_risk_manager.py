@@ -0,0 +1,203 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from utils.utils import Utils
+from clock.clock import Clock
+from events.events import SizingEvent, ExecutionEvent
+from ..interfaces.risk_manager_interface import IRiskManager
+from ..properties.risk_manager_properties import DrawdownKillSwitchRiskProps
+from collections import deque
+from datetime import date, datetime, timedelta
+
+class DrawdownKillSwitchRiskManager(IRiskManager):
+
+    def __init__(self, properties: DrawdownKillSwitchRiskProps):
+        """
+        Initializes a DrawdownKillSwitchRiskManager object.
+
+        The equity high-water mark, the equity at the start of the day and the times of the recent trades are updated
+        incrementally (on every equity mark and execution), so every check costs O(1) and does not query the
+        platform.
+
+        Args:
+            properties (DrawdownKillSwitchRiskProps): The properties of the kill switch.
+        """
+        self.max_daily_loss_pct = properties.max_daily_loss_pct
+        self.max_drawdown_pct = properties.max_drawdown_pct
+        self.max_trades_per_period = properties.max_trades_per_period
+        self.trades_period = timedelta(hours=properties.trades_period_hours)
+        self.flatten_on_breach = properties.flatten_on_breach
+        self.reset_on_start = properties.reset_on_start
+
+        # Seguimiento de la equity
+        self.equity: float = 0.0
+        self.peak_equity: float = 0.0
+        self.day_start_equity: float = 0.0
+        self.current_day: date | None = None
+
+        # Momentos de las operaciones abiertas (ejecutadas) dentro del periodo móvil
+        self._trade_times: deque = deque()
+
+        # Estado del kill switch: motivo del bloqueo (None si no está activo) y si hay que cerrar las posiciones
+        self.halt_reason: str | None = None
+        self._daily_halt: bool = False
+        self._flatten_pending: bool = False
+
+    def update_equity(self, time: datetime, equity: float) -> None:
+        """
+        Updates the equity tracking with a new equity mark, and activates the kill switch if a loss limit is breached.
+
+        Args:
+            time (datetime): The time of the mark.
+            equity (float): The equity of the account.
+
+        Returns:
+            None
+        """
+        # Cambio de día: nueva equity de referencia y levantamos el bloqueo por pérdida diaria
+        if time.date() != self.current_day:
+            self.current_day = time.date()
+            self.day_start_equity = equity
+            if self._daily_halt:
+                print(f"{Utils.dateprint()} - RISK MGMT: Nuevo día, se levanta el bloqueo por pérdida diaria máxima")
+                self.halt_reason = None
+                self._daily_halt = False
+
+        self.equity = equity
+        self.peak_equity = max(self.peak_equity, equity)
+
+        if self.halt_reason is not None and not self._daily_halt:
+            return
+
+        if self.peak_equity > 0.0 and 1.0 - equity / self.peak_equity >= self.max_drawdown_pct:
+            self._halt(f"drawdown de {1.0 - equity / self.peak_equity:.2%} desde el máximo de equity {self.peak_equity:.2f}", daily=False)
+
+        elif self.halt_reason is None and self.day_start_equity > 0.0 and 1.0 - equity / self.day_start_equity >= self.max_daily_loss_pct:
+            self._halt(f"pérdida diaria de {1.0 - equity / self.day_start_equity:.2%}", daily=True)
+
+    def _halt(self, reason: str, daily: bool) -> None:
+        """
+        Activates the kill switch.
+
+        Args:
+            reason (str): The reason of the halt.
+            daily (bool): True if the halt is lifted at the start of the next day.
+
+        Returns:
+            None
+        """
+        self.halt_reason = reason
+        self._daily_halt = daily
+        self._flatten_pending = self.flatten_on_breach
+        print(f"{Utils.dateprint()} - RISK MGMT: KILL SWITCH activado por {reason}. Se bloquean las nuevas órdenes")
+
+    def consume_flatten_request(self) -> bool:
+        """
+        Returns True (once) if the positions of the strategy have to be closed because of a breach.
+        """
+        flatten = self._flatten_pending
+        self._flatten_pending = False
+        return flatten
+
+    def reset(self) -> None:
+        """
+        Lifts the kill switch manually and resets the high-water mark to the current equity.
+
+        Returns:
+            None
+        """
+        if self.halt_reason is not None:
+            print(f"{Utils.dateprint()} - RISK MGMT: KILL SWITCH levantado manualmente ({self.halt_reason})")
+        self.halt_reason = None
+        self._daily_halt = False
+        self._flatten_pending = False
+        self.peak_equity = self.equity
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the kill switch to be checkpointed: the equity tracking, the recent trades and the halt.
+        """
+        return {
+            "equity": self.equity,
+            "peak_equity": self.peak_equity,
+            "day_start_equity": self.day_start_equity,
+            "current_day": self.current_day,
+            "trade_times": list(self._trade_times),
+            "halt_reason": self.halt_reason,
+            "daily_halt": self._daily_halt,
+            "flatten_pending": self._flatten_pending,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the kill switch. An active halt stays active after the restart (a daily halt
+        until the next day, any other halt until reset is called), unless reset_on_start is set.
+
+        Args:
+            state (dict): The state returned by get_state.
+
+        Returns:
+            None
+        """
+        self.equity = state["equity"]
+        self.peak_equity = state["peak_equity"]
+        self.day_start_equity = state["day_start_equity"]
+        self.current_day = state["current_day"]
+        self._trade_times = deque(state["trade_times"])
+        self.halt_reason = state["halt_reason"]
+        self._daily_halt = state["daily_halt"]
+        self._flatten_pending = state["flatten_pending"]
+
+        if self.halt_reason is not None:
+            print(f"{Utils.dateprint()} - RISK MGMT: KILL SWITCH restaurado activo ({self.halt_reason})")
+            if self.reset_on_start:
+                self.reset()
+
+    def _drop_expired_trades(self) -> None:
+        """
+        Removes the trades that are out of the trailing period.
+        """
+        now = Clock.now()
+        while self._trade_times and now - self._trade_times[0] >= self.trades_period:
+            self._trade_times.popleft()
+
+    def on_execution(self, execution_event: ExecutionEvent) -> None:
+        """
+        Records an opened trade for the trade-rate limit. Closing executions and orders that are never filled (rejected
+        or timed out) do not count.
+
+        Args:
+            execution_event (ExecutionEvent): The execution event.
+
+        Returns:
+            None
+        """
+        if execution_event.closes_position:
+            return
+        self._drop_expired_trades()
+        self._trade_times.append(Clock.now())
+
+    def assess_order(self, sizing_event: SizingEvent, current_positions_value_acc_ccy: float, new_position_value_acc_ccy: float) -> float:
+        """
+        Assess the order: it is blocked if the kill switch is active or the maximum number of trades opened in the
+        trailing period has been reached.
+
+        Args:
+            sizing_event (SizingEvent): The sizing event for the order.
+            current_positions_value_acc_ccy (float): The current value of all positions in the account currency.
+            new_position_value_acc_ccy (float): The value of the new position in the account currency.
+
+        Returns:
+            float: The volume of the order if it is allowed, otherwise 0.0.
+        """
+        if self.halt_reason is not None:
+            print(f"{Utils.dateprint()} - RISK MGMT: Orden {sizing_event.signal} en {sizing_event.symbol} bloqueada por el kill switch ({self.halt_reason})")
+            return 0.0
+
+        # Descartamos las operaciones que han salido del periodo móvil
+        self._drop_expired_trades()
+
+        if len(self._trade_times) >= self.max_trades_per_period:
+            print(f"{Utils.dateprint()} - RISK MGMT: Orden {sizing_event.signal} en {sizing_event.symbol} bloqueada: alcanzado el máximo de {self.max_trades_per_period} operaciones por periodo")
+            return 0.0
+
+        return sizing_event.volume
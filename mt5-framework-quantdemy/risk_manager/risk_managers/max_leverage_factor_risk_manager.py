@@ -4,8 +4,7 @@ from utils.utils import Utils
 from events.events import SizingEvent
 from ..interfaces.risk_manager_interface import IRiskManager
 from ..properties.risk_manager_properties import MaxLeverageFactorRiskProps
-import MetaTrader5 as mt5
-import sys
+from utils.terminal import mt5
 
 class MaxLeverageFactorRiskManager(IRiskManager):
 
@@ -18,64 +17,51 @@ class MaxLeverageFactorRiskManager(IRiskManager):
         """
         self.max_leverage_factor = properties.max_leverage_factor
 
-    def _compute_leverage_factor(self, account_value_acc_ccy: float) -> float:
-        """
-        Computes the leverage factor based on the account value and equity.
-
-        Args:
-            account_value_acc_ccy (float): The account value in the account currency.
-
-        Returns:
-            float: The computed leverage factor.
-        """
-
-        account_equity = mt5.account_info().equity
-
-        if account_equity <= 0:
-            return sys.float_info.max
-        else:
-            return account_value_acc_ccy / account_equity
-
-    def _check_expected_new_position_is_compliant_with_max_leverage_factor(self, sizing_event: SizingEvent, 
-                                                                            current_positions_value_acc_ccy: float,
-                                                                            new_position_value_acc_ccy: float) -> bool:
+    def assess_order(self, sizing_event: SizingEvent, current_positions_value_acc_ccy: float, new_position_value_acc_ccy: float) -> float:
         """
-        Checks if the expected new position is compliant with the maximum leverage factor.
+        Assess the order and determine whether it should be allowed or not based on the maximum leverage factor.
 
         Args:
-            sizing_event (SizingEvent): The sizing event for the new position.
+            sizing_event (SizingEvent): The sizing event for the order.
             current_positions_value_acc_ccy (float): The current value of all positions in the account currency.
             new_position_value_acc_ccy (float): The value of the new position in the account currency.
 
         Returns:
-            bool: True if the new position is compliant with the maximum leverage factor, False otherwise.
+            float: The volume of the order if it is compliant with the maximum leverage factor, otherwise the largest
+            compliant fraction of it (the same rule used for a batch of orders in get_compliant_volume).
         """
-        # Calculamos el nuevo expected account value que tendría la cuenta si ejecutáramos la nueva posición
-        new_account_value = current_positions_value_acc_ccy + new_position_value_acc_ccy
-
-        # Calculamos el nuevo factor de apalancamiento que tendríamos SI EJECUTÁRAMOS esa posición
-        new_leverage_factor = self._compute_leverage_factor(new_account_value)
+        account_info = mt5.account_info()
+        account_equity = account_info.equity if account_info is not None else 0.0
+        return self.get_compliant_volume(sizing_event, current_positions_value_acc_ccy, new_position_value_acc_ccy, account_equity)
 
-        # Comprobamos si el nuevo leverage factor sería mayor a nuestro máximo leverage factor
-        if abs(new_leverage_factor) <= self.max_leverage_factor:
-            return True
-        else:
-            print(f"{Utils.dateprint()} - RISK MGMT: La posición objetivo {sizing_event.signal} {sizing_event.volume} implica un Leverage Factor de {abs(new_leverage_factor):.2f}, que supera el máx. de {self.max_leverage_factor}")
-            return False
-
-    def assess_order(self, sizing_event: SizingEvent, current_positions_value_acc_ccy: float, new_position_value_acc_ccy: float) -> float:
+    def get_compliant_volume(self, sizing_event: SizingEvent, current_positions_value_acc_ccy: float,
+                             new_position_value_acc_ccy: float, account_equity: float) -> float:
         """
-        Assess the order and determine whether it should be allowed or not based on the maximum leverage factor.
+        Returns the largest fraction of the order volume that keeps the leverage factor within the maximum, for a
+        given snapshot of the account equity (used to assess a batch of orders against the same snapshot).
 
         Args:
             sizing_event (SizingEvent): The sizing event for the order.
-            current_positions_value_acc_ccy (float): The current value of all positions in the account currency.
+            current_positions_value_acc_ccy (float): The current value of all positions (and of the orders already
+                approved in the batch) in the account currency.
             new_position_value_acc_ccy (float): The value of the new position in the account currency.
+            account_equity (float): The equity of the account.
 
         Returns:
-            float: The volume of the order if it is compliant with the maximum leverage factor, otherwise 0.0.
+            float: The compliant volume (the full volume, a scaled down volume or 0.0).
         """
-        if self._check_expected_new_position_is_compliant_with_max_leverage_factor(sizing_event, current_positions_value_acc_ccy, new_position_value_acc_ccy):
+        if account_equity <= 0:
+            return 0.0
+
+        # Valor neto máximo permitido en el sentido de la nueva posición
+        max_value = self.max_leverage_factor * account_equity
+        new_account_value = current_positions_value_acc_ccy + new_position_value_acc_ccy
+        if abs(new_account_value) <= max_value or new_position_value_acc_ccy == 0.0:
             return sizing_event.volume
-        else:
-            return 0.0
\ No newline at end of file
+
+        # Fracción de la orden que lleva el valor neto justo hasta el máximo
+        limit = max_value if new_position_value_acc_ccy > 0 else -max_value
+        fraction = min(max((limit - current_positions_value_acc_ccy) / new_position_value_acc_ccy, 0.0), 1.0)
+        if fraction <= 0.0:
+            print(f"{Utils.dateprint()} - RISK MGMT: La posición objetivo {sizing_event.signal} {sizing_event.volume} en {sizing_event.symbol} superaría el Leverage Factor máx. de {self.max_leverage_factor}")
+        return sizing_event.volume * fraction
@@ -0,0 +1,243 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from utils.utils import Utils
+from events.events import SizingEvent, ExecutionEvent, OrderRejectedEvent, PlacedPendingOrderEvent
+from market_statistics.correlation_engine import CorrelationEngine
+from ..interfaces.risk_manager_interface import IRiskManager
+from ..properties.risk_manager_properties import VaRRiskProps
+from ..exposure_tracker import ExposureTracker
+from datetime import datetime
+from typing import List
+from statistics import NormalDist
+from utils.terminal import mt5
+import numpy as np
+import math
+
+class VaRRiskManager(IRiskManager):
+
+    def __init__(self, properties: VaRRiskProps, correlation_engine: CorrelationEngine, exposure_tracker: ExposureTracker):
+        """
+        Initializes a VaRRiskManager object.
+
+        The portfolio variance x'Σx and the vector Σx are cached and only recomputed when the covariance (new bar) or
+        the exposure (fills, closes or price changes) change. The variance after a candidate order of value d on
+        symbol i is then x'Σx + 2d(Σx)_i + d²Σ_ii, so each order is assessed in O(1) without re-simulating, and an
+        approved order updates Σx in O(n).
+
+        Args:
+            properties (VaRRiskProps): The properties of the VaR limit.
+            correlation_engine (CorrelationEngine): The engine with the rolling covariance of the symbol returns.
+            exposure_tracker (ExposureTracker): The tracker with the exposure of the strategy by symbol.
+        """
+        self.max_var_pct = properties.max_var_pct
+        self.confidence = properties.confidence
+        self.use_expected_shortfall = properties.use_expected_shortfall
+        self.CORRELATIONS = correlation_engine
+        self.EXPOSURE = exposure_tracker
+
+        # Multiplicador de la desviación típica de la cartera: VaR = z·σ·√h, ES = φ(z)/(1-c)·σ·√h
+        z = NormalDist().inv_cdf(self.confidence)
+        self.var_multiplier = z * math.sqrt(properties.horizon_bars)
+        self.es_multiplier = NormalDist().pdf(z) / (1.0 - self.confidence) * math.sqrt(properties.horizon_bars)
+        self._index = {symbol: i for i, symbol in enumerate(self.CORRELATIONS.symbols)}
+
+        # Caché: exposición por símbolo, Σ, Σx y x'Σx, con las versiones con las que se calcularon
+        self._exposure = np.zeros(len(self._index))
+        self._covariance = np.zeros((len(self._index), len(self._index)))
+        self._cov_exposure = np.zeros(len(self._index))
+        self._variance: float = 0.0
+        self._versions: tuple = (-1, -1)
+
+        # Exposición de las órdenes aprobadas que aún no se reflejan en el portfolio. Cada orden se descuenta cuando se
+        # ejecuta, se rechaza o queda colocada como pendiente: [símbolo, dirección, índice, valor, marca de aprobación].
+        # Si no llega respuesta, se descarta tras una vela completa
+        self._pending = np.zeros(len(self._index))
+        self._pending_orders: List[list] = []
+        self._marks: int = 0
+
+        self.equity: float = 0.0
+
+    def update_equity(self, time: datetime, equity: float) -> None:
+        """
+        Updates the equity used for the limit. The approved orders without a response for a whole bar are discarded.
+
+        Args:
+            time (datetime): The time of the mark.
+            equity (float): The equity of the account.
+
+        Returns:
+            None
+        """
+        self.equity = equity
+        self._marks += 1
+
+        expired = [order for order in self._pending_orders if self._marks - order[4] >= 2]
+        for order in expired:
+            self._remove_pending_order(order)
+        if expired:
+            self._update_variance()
+
+    def _remove_pending_order(self, order: list) -> None:
+        """
+        Removes an approved order from the pending exposure (without recomputing the variance).
+        """
+        self._pending_orders.remove(order)
+        self._pending[order[2]] -= order[3]
+        if not self._pending_orders:
+            self._pending.fill(0.0)
+
+    def _release_pending_order(self, symbol: str, signal: str) -> None:
+        """
+        Removes the oldest approved order of a symbol and direction from the pending exposure, if any.
+
+        Args:
+            symbol (str): The symbol of the order.
+            signal (str): The direction of the order ("BUY" or "SELL").
+
+        Returns:
+            None
+        """
+        for order in self._pending_orders:
+            if order[0] == symbol and order[1] == signal:
+                self._remove_pending_order(order)
+                self._update_variance()
+                return
+
+    def on_execution(self, execution_event: ExecutionEvent) -> None:
+        """
+        The executed order is now part of the portfolio exposure: its pending exposure is removed.
+        """
+        self._release_pending_order(execution_event.symbol, execution_event.signal)
+
+    def on_order_rejected(self, rejection_event: OrderRejectedEvent) -> None:
+        """
+        The rejected order will not be filled: its pending exposure is removed.
+        """
+        self._release_pending_order(rejection_event.symbol, rejection_event.signal)
+
+    def on_pending_order_placed(self, pending_order_event: PlacedPendingOrderEvent) -> None:
+        """
+        The order rests in the platform as a pending order, which is not part of the exposure: its pending exposure is removed.
+        """
+        self._release_pending_order(pending_order_event.symbol, pending_order_event.signal)
+
+    def consume_flatten_request(self) -> bool:
+        """
+        The VaR limit only blocks new orders: it never requests to close the positions.
+        """
+        return False
+
+    def _refresh(self) -> None:
+        """
+        Recomputes the cached exposure vector, Σx and x'Σx if the covariance or the exposure changed.
+
+        Returns:
+            None
+        """
+        values = self.EXPOSURE.get_values_by_symbol()
+        versions = (self.CORRELATIONS.version, self.EXPOSURE.version)
+        if versions == self._versions:
+            return
+        self._versions = versions
+
+        self._exposure.fill(0.0)
+        for symbol, value in values.items():
+            i = self._index.get(symbol)
+            if i is not None:
+                self._exposure[i] = value
+
+        self._covariance = self.CORRELATIONS.get_covariance_matrix()
+        self._update_variance()
+
+    def _update_variance(self) -> None:
+        """
+        Recomputes Σx and x'Σx with the current exposure plus the pending approved orders.
+        """
+        exposure = self._exposure + self._pending
+        self._cov_exposure = self._covariance @ exposure
+        self._variance = max(float(exposure @ self._cov_exposure), 0.0)
+
+    def _get_risk(self, variance: float) -> float:
+        """
+        Returns the VaR (or the expected shortfall) of a portfolio variance, in the account currency.
+        """
+        multiplier = self.es_multiplier if self.use_expected_shortfall else self.var_multiplier
+        return multiplier * math.sqrt(max(variance, 0.0))
+
+    def get_portfolio_risk(self) -> float:
+        """
+        Returns the current VaR (or expected shortfall) of the portfolio in the account currency.
+        """
+        self._refresh()
+        return self._get_risk(self._variance)
+
+    def get_marginal_var(self, symbol: str) -> float:
+        """
+        Returns the marginal VaR (or expected shortfall) of a symbol: the change of the portfolio risk per unit of
+        account currency added to it.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            float: The marginal VaR, or 0.0 if the symbol is not tracked or the portfolio has no risk.
+        """
+        self._refresh()
+        i = self._index.get(symbol)
+        if i is None or self._variance <= 0.0:
+            return 0.0
+        multiplier = self.es_multiplier if self.use_expected_shortfall else self.var_multiplier
+        return multiplier * self._cov_exposure[i] / math.sqrt(self._variance)
+
+    def assess_order(self, sizing_event: SizingEvent, current_positions_value_acc_ccy: float, new_position_value_acc_ccy: float) -> float:
+        """
+        Assess the order: it is allowed in full if the portfolio VaR after it stays within the limit (or if it reduces the
+        VaR), scaled down to the volume that reaches the limit, or rejected.
+
+        Args:
+            sizing_event (SizingEvent): The sizing event for the order.
+            current_positions_value_acc_ccy (float): The current value of all positions in the account currency.
+            new_position_value_acc_ccy (float): The value of the new position in the account currency.
+
+        Returns:
+            float: The allowed volume (the full volume, a scaled down volume or 0.0).
+        """
+        i = self._index.get(sizing_event.symbol)
+        if i is None:
+            print(f"{Utils.dateprint()} - RISK MGMT: No hay covarianzas de {sizing_event.symbol} para calcular el VaR. Orden rechazada")
+            return 0.0
+
+        self._refresh()
+        if self.equity <= 0.0:
+            account_info = mt5.account_info()
+            self.equity = account_info.equity if account_info is not None else 0.0
+        if self.equity <= 0.0:
+            return 0.0
+
+        # Varianza tras la orden en función de la fracción f del volumen: a·f² + b·f + x'Σx
+        d = new_position_value_acc_ccy
+        a = d * d * self._covariance[i, i]
+        b = 2.0 * d * self._cov_exposure[i]
+        max_risk = self.max_var_pct * self.equity
+        risk_after = self._get_risk(self._variance + a + b)
+
+        if risk_after <= max_risk or a + b <= 0.0:
+            fraction = 1.0
+        else:
+            # Mayor fracción que mantiene el riesgo en el límite (raíz positiva de la cuadrática)
+            multiplier = self.es_multiplier if self.use_expected_shortfall else self.var_multiplier
+            c = self._variance - (max_risk / multiplier) ** 2
+            discriminant = b * b - 4.0 * a * c
+            fraction = (-b + math.sqrt(discriminant)) / (2.0 * a) if a > 0.0 and discriminant >= 0.0 and c <= 0.0 else 0.0
+            fraction = min(max(fraction, 0.0), 1.0)
+            print(f"{Utils.dateprint()} - RISK MGMT: La posición objetivo {sizing_event.signal} {sizing_event.volume} en {sizing_event.symbol} llevaría el VaR a {risk_after:.2f}, por encima del máx. de {max_risk:.2f}. Fracción permitida: {fraction:.2f}")
+
+        if fraction > 0.0:
+            # La exposición aprobada cuenta para las siguientes órdenes hasta que se ejecute (actualización O(n) de Σx)
+            d_approved = d * fraction
+            self._pending[i] += d_approved
+            self._pending_orders.append([sizing_event.symbol, sizing_event.signal, i, d_approved, self._marks])
+            self._variance = max(self._variance + d_approved * d_approved * self._covariance[i, i] + 2.0 * d_approved * self._cov_exposure[i], 0.0)
+            self._cov_exposure += d_approved * self._covariance[:, i]
+
+        return sizing_event.volume * fraction
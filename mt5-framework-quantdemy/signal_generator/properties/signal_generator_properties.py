@@ -24,4 +24,34 @@ class RSIProps(BaseSignalProps):
     rsi_upper: float
     rsi_lower: float
     sl_points: int
-    tp_points: int
\ No newline at end of file
+    tp_points: int
+
+class SRBreakoutProps(BaseSignalProps):
+    """
+    Represents the properties for a support/resistance breakout or bounce signal generator.
+
+    Attributes:
+        timeframe (str): The timeframe for the signal generator.
+        entry_mode (str): "BREAKOUT" to trade the close beyond a level, or "BOUNCE" to trade the rejection of a level.
+        n1 (int): The number of bars before a pivot bar.
+        n2 (int): The number of bars after a pivot bar needed to confirm it.
+        cluster_distance_points (float): The maximum distance, in points, between pivots merged into the same level.
+        decay_half_life_bars (float): The number of bars after which the strength of a level not touched again halves.
+        min_touches (int): The minimum number of touches of a level to be traded.
+        sl_tp_buffer_points (float): The distance, in points, between the SL/TP and the levels they are placed from.
+        use_pending_orders (bool): If True, enter with STOP (breakout) or LIMIT (bounce) orders at the levels, placed when
+            the price is within entry_distance_points of them. If False, enter at market on the bar close.
+        entry_distance_points (float): The distance, in points, to a level at which the pending order is placed.
+        warm_up_bars (int): The number of historical bars used to build the levels when the strategy starts.
+    """
+    timeframe: str
+    entry_mode: str = "BREAKOUT"
+    n1: int = 2
+    n2: int = 2
+    cluster_distance_points: float = 20.0
+    decay_half_life_bars: float = 500.0
+    min_touches: int = 2
+    sl_tp_buffer_points: float = 5.0
+    use_pending_orders: bool = False
+    entry_distance_points: float = 50.0
+    warm_up_bars: int = 1000
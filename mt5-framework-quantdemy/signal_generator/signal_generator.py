@@ -2,17 +2,21 @@
 
 from events.events import DataEvent
 from .interfaces.signal_generator_interface import ISignalGenerator
-from .properties.signal_generator_properties import BaseSignalProps, MACrossoverProps, RSIProps
+from .properties.signal_generator_properties import BaseSignalProps, MACrossoverProps, RSIProps, SRBreakoutProps
 from .signals.signal_ma_crossover import SignalMACrossover
 from .signals.signal_rsi_mr import SignalRSI
+from .signals.signal_sr_breakout import SignalSRBreakout
 from data_provider.data_provider import DataProvider
 from portfolio.portfolio import Portfolio
 from order_executor.order_executor import OrderExecutor
+from indicators.indicator_engine import IndicatorEngine
 from queue import Queue
+from utils.utils import Utils
 
 class SignalGenerator(ISignalGenerator):
 
-    def __init__(self, events_queue: Queue, data_provider: DataProvider, portfolio: Portfolio, order_executor: OrderExecutor, signal_properties: BaseSignalProps):
+    def __init__(self, events_queue: Queue, data_provider: DataProvider, portfolio: Portfolio, order_executor: OrderExecutor, signal_properties: BaseSignalProps,
+                 indicator_engine: IndicatorEngine | None = None):
         """
         Initialize the SignalGenerator object.
 
@@ -22,11 +26,14 @@ class SignalGenerator(ISignalGenerator):
             portfolio (Portfolio): The portfolio for managing positions and balances.
             order_executor (OrderExecutor): The order executor for executing trading orders.
             signal_properties (BaseSignalProps): The signal properties for generating trading signals.
+            indicator_engine (IndicatorEngine | None): The indicator engine shared by all the strategies, so that each
+                indicator is computed only once per symbol and bar. If None, the strategy uses a private one.
         """
         self.events_queue = events_queue
         self.DATA_PROVIDER = data_provider
         self.PORTFOLIO = portfolio
         self.ORDER_EXECUTOR = order_executor
+        self.INDICATOR_ENGINE = indicator_engine
 
         self.signal_generator_method = self._get_signal_generator_method(signal_properties)
 
@@ -44,10 +51,13 @@ class SignalGenerator(ISignalGenerator):
             Exception: If the signal properties are of an unknown type.
         """
         if isinstance(signal_props, MACrossoverProps):
-            return SignalMACrossover(properties=signal_props)
+            return SignalMACrossover(properties=signal_props, indicator_engine=self.INDICATOR_ENGINE)
         
         elif isinstance(signal_props, RSIProps):
-            return SignalRSI(properties=signal_props)
+            return SignalRSI(properties=signal_props, indicator_engine=self.INDICATOR_ENGINE)
+
+        elif isinstance(signal_props, SRBreakoutProps):
+            return SignalSRBreakout(properties=signal_props)
         
         else:
             raise Exception(f"ERROR: Método de sizing desconocido: {signal_props}")
@@ -67,4 +77,43 @@ class SignalGenerator(ISignalGenerator):
 
         # Comprobamos que SignalEvent no sea None y colocamos el evento a la cola
         if signal_event is not None:
-            self.events_queue.put(signal_event)
\ No newline at end of file
+            self.events_queue.put(signal_event)
+
+    def warm_up(self, symbols: list) -> None:
+        """
+        Warms up the strategy from bulk history: the bars it needs are retrieved for all the symbols in one pass.
+
+        Args:
+            symbols (list): The symbols traded by the strategy.
+
+        Returns:
+            None
+        """
+        strategy = self.signal_generator_method
+        if not hasattr(strategy, 'warm_up'):
+            return
+
+        history = self.DATA_PROVIDER.get_bulk_history(symbols, strategy.timeframe, strategy.get_warm_up_bars())
+        strategy.warm_up(history)
+        print(f"{Utils.dateprint()} - Estrategia inicializada con el histórico de {len(history)} símbolos")
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the signal generator to be checkpointed: the shared indicator engine and the strategy.
+        """
+        strategy = self.signal_generator_method
+        return {
+            "indicator_engine": self.INDICATOR_ENGINE.get_state() if self.INDICATOR_ENGINE is not None else None,
+            "strategy": strategy.get_state() if hasattr(strategy, 'get_state') else None,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the signal generator.
+        """
+        if self.INDICATOR_ENGINE is not None and state.get("indicator_engine") is not None:
+            self.INDICATOR_ENGINE.set_state(state["indicator_engine"])
+
+        strategy = self.signal_generator_method
+        if hasattr(strategy, 'set_state') and state.get("strategy") is not None:
+            strategy.set_state(state["strategy"])
@@ -6,15 +6,22 @@ from ..interfaces.signal_generator_interface import ISignalGenerator
 from ..properties.signal_generator_properties import MACrossoverProps
 from portfolio.portfolio import Portfolio
 from order_executor.order_executor import OrderExecutor
+from indicators.indicator_engine import IndicatorEngine
+from indicators.vectorized_indicators import VectorizedIndicators
+from indicators.properties.indicator_properties import SMAIndicatorProps
+from typing import Dict, Tuple
+import pandas as pd
+import numpy as np
 
 class SignalMACrossover(ISignalGenerator):
     
-    def __init__(self, properties: MACrossoverProps):
+    def __init__(self, properties: MACrossoverProps, indicator_engine: IndicatorEngine | None = None):
         """
         Initializes the MACrossover object.
 
         Args:
             properties (MACrossoverProps): The properties object containing the parameters for the moving average crossover.
+            indicator_engine (IndicatorEngine | None): The indicator engine shared with other strategies. If None, a private one is used.
 
         Raises:
             Exception: If the fast period is greater than or equal to the slow period.
@@ -27,7 +34,45 @@ class SignalMACrossover(ISignalGenerator):
         if self.fast_period >= self.slow_period:
             raise Exception(f"ERROR: el periodo rápido ({self.fast_period}) es mayor o igual al periodo lento ({self.slow_period}) para el cálculo de las medias móviles")
 
+        # Medias móviles incrementales por símbolo: cada vela nueva se procesa en O(1)
+        self.fast_ma_props = SMAIndicatorProps(period=self.fast_period)
+        self.slow_ma_props = SMAIndicatorProps(period=self.slow_period)
+        self._owns_indicator_engine = indicator_engine is None
+        self.INDICATORS = indicator_engine if indicator_engine is not None else IndicatorEngine()
+        self.subscription_id = self.INDICATORS.subscribe(self.timeframe, [self.fast_ma_props, self.slow_ma_props])
+
     
+    def get_warm_up_bars(self) -> int:
+        """
+        Returns the number of historical bars needed to warm up the indicators of the strategy.
+        """
+        return self.INDICATORS.get_warm_up_bars(self.timeframe)
+
+    def warm_up(self, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Warms up the indicators of the strategy from bulk history.
+
+        Args:
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, in the strategy timeframe.
+
+        Returns:
+            None
+        """
+        self.INDICATORS.warm_up_symbols(self.timeframe, history)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the strategy to be checkpointed (the indicators, if the engine is not shared).
+        """
+        return {"indicators": self.INDICATORS.get_state() if self._owns_indicator_engine else None}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the strategy.
+        """
+        if self._owns_indicator_engine and state.get("indicators") is not None:
+            self.INDICATORS.set_state(state["indicators"])
+
     def generate_signal(self, data_event: DataEvent, data_provider: DataProvider, portfolio: Portfolio, order_executor: OrderExecutor) -> SignalEvent:
         """
         Generates a signal based on the moving average crossover strategy.
@@ -44,15 +89,16 @@ class SignalMACrossover(ISignalGenerator):
         # Cogemos el símbolo del evento
         symbol = data_event.symbol
 
-        # Recuperamos los datos necesarios para calcular las medias móviles
-        bars = data_provider.get_latest_closed_bars(symbol, self.timeframe, self.slow_period)
+        # Actualizamos las medias móviles con la nueva vela (o las inicializamos con el histórico)
+        if not self.INDICATORS.on_data_event(self.subscription_id, data_event, data_provider):
+            return None
 
         # Recuperamos las posiciones abiertas por esta estrategia en el símbolo donde hemos tenido el Data Event
         open_positions = portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
 
         # Calculamos el valor de los indicadores
-        fast_ma = bars['close'][-self.fast_period:].mean()
-        slow_ma = bars['close'].mean()
+        fast_ma = self.INDICATORS.get_value(symbol, self.timeframe, self.fast_ma_props)
+        slow_ma = self.INDICATORS.get_value(symbol, self.timeframe, self.slow_ma_props)
 
         # Detectar una señal de compra
         if open_positions['LONG'] == 0 and fast_ma > slow_ma:
@@ -82,11 +128,17 @@ class SignalMACrossover(ISignalGenerator):
             
             return signal_event
 
+    def compute_backtest_conditions(self, bars: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes, for the whole history at once, the entry conditions evaluated by generate_signal at each bar close.
 
+        Args:
+            bars (pd.DataFrame): The historical bars.
 
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The BUY and SELL conditions of each bar.
+        """
+        fast_ma = VectorizedIndicators.compute(self.fast_ma_props, bars)
+        slow_ma = VectorizedIndicators.compute(self.slow_ma_props, bars)
 
-
-
-
-
-
+        return fast_ma > slow_ma, slow_ma > fast_ma
@@ -6,18 +6,23 @@ from ..interfaces.signal_generator_interface import ISignalGenerator
 from ..properties.signal_generator_properties import RSIProps
 from portfolio.portfolio import Portfolio
 from order_executor.order_executor import OrderExecutor
+from indicators.indicator_engine import IndicatorEngine
+from indicators.vectorized_indicators import VectorizedIndicators
+from indicators.properties.indicator_properties import RSIIndicatorProps
+from typing import Dict, Tuple
 import pandas as pd
 import numpy as np
-import MetaTrader5 as mt5
+from utils.terminal import mt5
 
 class SignalRSI(ISignalGenerator):
     
-    def __init__(self, properties: RSIProps):
+    def __init__(self, properties: RSIProps, indicator_engine: IndicatorEngine | None = None):
         """
         Initializes the RSI Mean Reversion object.
 
         Args:
             properties (RSIMeanRev): The properties object containing the parameters for the RSI mean reversion.
+            indicator_engine (IndicatorEngine | None): The indicator engine shared with other strategies. If None, a private one is used.
 
         Raises:
             Exception: If the fast period is greater than or equal to the slow period.
@@ -48,24 +53,58 @@ class SignalRSI(ISignalGenerator):
             self.tp_points = properties.tp_points
         else:
             self.tp_points = 0
+
+        # RSI incremental (suavizado de Wilder) por símbolo: cada vela nueva se procesa en O(1)
+        self.rsi_props = RSIIndicatorProps(period=self.rsi_period)
+        self._owns_indicator_engine = indicator_engine is None
+        self.INDICATORS = indicator_engine if indicator_engine is not None else IndicatorEngine()
+        self.subscription_id = self.INDICATORS.subscribe(self.timeframe, [self.rsi_props])
     
 
     def compute_rsi(self, prices: pd.Series) -> float:
+        """
+        Computes the RSI with Wilder smoothing of the last price of a series.
 
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
+        Args:
+            prices (pd.Series): The prices, oldest first.
 
-        average_gain = np.mean(gains[-self.rsi_period:])
-        average_loss = np.mean(losses[-self.rsi_period:])
+        Returns:
+            float: The RSI after the last price (NaN if there are not enough prices).
+        """
+        return VectorizedIndicators.rsi(np.asarray(prices, dtype=float), self.rsi_period)[-1]
 
-        # Aplicamos formula RSI: RSI = 100 – [100 ÷ ( 1 + (Average Gain During Up Periods ÷ Average Loss During Down Periods ))]
-        rs = average_gain / average_loss if average_loss > 0 else 0
-        rsi = 100 - (100 / (1 + rs))
+    
+    def get_warm_up_bars(self) -> int:
+        """
+        Returns the number of historical bars needed to warm up the indicators of the strategy.
+        """
+        return self.INDICATORS.get_warm_up_bars(self.timeframe)
 
-        return rsi
+    def warm_up(self, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Warms up the indicators of the strategy from bulk history.
+
+        Args:
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, in the strategy timeframe.
+
+        Returns:
+            None
+        """
+        self.INDICATORS.warm_up_symbols(self.timeframe, history)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the strategy to be checkpointed (the indicators, if the engine is not shared).
+        """
+        return {"indicators": self.INDICATORS.get_state() if self._owns_indicator_engine else None}
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the strategy.
+        """
+        if self._owns_indicator_engine and state.get("indicators") is not None:
+            self.INDICATORS.set_state(state["indicators"])
 
-    
     def generate_signal(self, data_event: DataEvent, data_provider: DataProvider, portfolio: Portfolio, order_executor: OrderExecutor) -> SignalEvent:
         """
         Generates a signal based on the RSI mean reversion strategy.
@@ -82,11 +121,11 @@ class SignalRSI(ISignalGenerator):
         # Cogemos el símbolo del evento
         symbol = data_event.symbol
 
-        # Recuperamos los datos necesarios para calcular el indicador del RSI
-        bars = data_provider.get_latest_closed_bars(symbol, self.timeframe, self.rsi_period + 1)
+        # Actualizamos el RSI con la nueva vela (o lo inicializamos con el histórico)
+        if not self.INDICATORS.on_data_event(self.subscription_id, data_event, data_provider):
+            return None
 
-        # Calculamos el RSI de las últimas velas
-        rsi = self.compute_rsi(bars['close'])
+        rsi = self.INDICATORS.get_value(symbol, self.timeframe, self.rsi_props)
 
         # Recuperamos las posiciones abiertas por esta estrategia en el símbolo donde hemos tenido el Data Event
         open_positions = portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
@@ -127,11 +166,17 @@ class SignalRSI(ISignalGenerator):
             
             return signal_event
 
+    def compute_backtest_conditions(self, bars: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes, for the whole history at once, the entry conditions evaluated by generate_signal at each bar close.
 
+        Args:
+            bars (pd.DataFrame): The historical bars.
 
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The BUY and SELL conditions of each bar.
+        """
+        # Mismo RSI que el indicador incremental, aplicado sobre todo el histórico
+        rsi = VectorizedIndicators.compute(self.rsi_props, bars)
 
-
-
-
-
-
+        return rsi < self.rsi_lower, rsi > self.rsi_upper
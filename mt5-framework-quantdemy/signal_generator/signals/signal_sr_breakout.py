@@ -0,0 +1,409 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from events.events import DataEvent, SignalEvent
+from data_provider.data_provider import DataProvider
+from ..interfaces.signal_generator_interface import ISignalGenerator
+from ..properties.signal_generator_properties import SRBreakoutProps
+from portfolio.portfolio import Portfolio
+from order_executor.order_executor import OrderExecutor
+from support_resistance.support_resistance_tracker import SupportResistanceTracker
+from support_resistance.support_resistance_level import SupportResistanceLevel
+from support_resistance.properties.support_resistance_properties import SupportResistanceTrackerProps
+from utils.utils import Utils
+from utils.symbol_metadata_cache import SymbolMetadataCache
+from datetime import datetime
+from typing import Dict, Tuple
+import pandas as pd
+from utils.terminal import mt5
+
+class SignalSRBreakout(ISignalGenerator):
+
+    def __init__(self, properties: SRBreakoutProps):
+        """
+        Initializes the SRBreakout object.
+
+        Args:
+            properties (SRBreakoutProps): The properties object containing the parameters for the support/resistance strategy.
+
+        Raises:
+            Exception: If the entry mode is not "BREAKOUT" or "BOUNCE".
+        """
+        self.timeframe = properties.timeframe
+        self.entry_mode = properties.entry_mode.upper()
+        self.min_touches = properties.min_touches if properties.min_touches > 1 else 1
+        self.sl_tp_buffer_points = properties.sl_tp_buffer_points if properties.sl_tp_buffer_points > 0 else 0.0
+        self.use_pending_orders = properties.use_pending_orders
+        self.entry_distance_points = properties.entry_distance_points if properties.entry_distance_points > 0 else 0.0
+        self.cluster_distance_points = properties.cluster_distance_points
+        self.warm_up_bars = properties.warm_up_bars if properties.warm_up_bars > 0 else 1
+
+        if self.entry_mode not in ("BREAKOUT", "BOUNCE"):
+            raise Exception(f"ERROR: el modo de entrada {properties.entry_mode} no es válido. Debe ser BREAKOUT o BOUNCE")
+
+        # Niveles de soporte y resistencia incrementales por símbolo: cada vela nueva se procesa en O(1)
+        self.SR_TRACKER = SupportResistanceTracker(SupportResistanceTrackerProps(n1=properties.n1,
+                                                                                n2=properties.n2,
+                                                                                cluster_distance_points=properties.cluster_distance_points,
+                                                                                decay_half_life_bars=properties.decay_half_life_bars))
+
+        # Última vela procesada y último cierre de cada símbolo
+        self._last_bar_datetime: Dict[str, datetime] = {}
+        self._last_close: Dict[str, float] = {}
+
+        # Nivel de la última orden pendiente enviada por (símbolo, dirección), para no repetirla en cada vela
+        self._last_pending_level: Dict[Tuple[str, str], float] = {}
+
+    def _rebuild_levels(self, symbol: str, data_provider: DataProvider) -> pd.Series | None:
+        """
+        Rebuilds the levels of a symbol from the history of the data provider, up to the bar before the latest closed
+        bar (so the cross of the latest bar can still be detected).
+
+        Args:
+            symbol (str): The symbol.
+            data_provider (DataProvider): The data provider used to retrieve the bars.
+
+        Returns:
+            pd.Series | None: The latest closed bar, not yet added to the levels, or None if there is not enough history.
+        """
+        bars = data_provider.get_latest_closed_bars(symbol, self.timeframe, self.warm_up_bars)
+        self.SR_TRACKER.reset(symbol)
+        if bars is None or len(bars) < 2:
+            return None
+        self.SR_TRACKER.warm_up(symbol, bars.iloc[:-1])
+        self._last_close[symbol] = float(bars['close'].iloc[-2])
+        return bars.iloc[-1]
+
+    def _update_levels(self, data_event: DataEvent, data_provider: DataProvider) -> pd.Series | None:
+        """
+        Updates the levels of the event symbol with its new closed bar. The levels are built from the history of the
+        data provider the first time. After a gap, only the missing bars are replayed (a gap may just be a weekend or
+        a bar without ticks), and the levels are rebuilt only if the gap is longer than the warm-up history.
+
+        Args:
+            data_event (DataEvent): The data event with the new closed bar.
+            data_provider (DataProvider): The data provider used to retrieve the bars.
+
+        Returns:
+            pd.Series | None: The new closed bar of the strategy timeframe, or None if it was already processed or is not available.
+        """
+        symbol = data_event.symbol
+
+        # La vela del evento solo sirve si es del mismo timeframe que la estrategia
+        if data_provider.timeframe == self.timeframe:
+            bar = data_event.data
+        else:
+            bar = data_provider.get_latest_closed_bar(symbol, self.timeframe)
+
+        if bar is None or bar.empty:
+            return None
+
+        last_bar_datetime = self._last_bar_datetime.get(symbol)
+        if last_bar_datetime is not None and bar.name <= last_bar_datetime:
+            return None
+
+        timeframe_delta = Utils.get_timeframe_timedelta(self.timeframe)
+        if last_bar_datetime is None:
+            # Primera vela: construimos los niveles con el histórico
+            bar = self._rebuild_levels(symbol, data_provider)
+            if bar is None:
+                return None
+
+        elif bar.name - last_bar_datetime > timeframe_delta:
+            # Hueco desde la última vela procesada: recuperamos las velas desde ella y procesamos solo las que faltan
+            num_bars = min(int((bar.name - last_bar_datetime) / timeframe_delta) + 1, self.warm_up_bars)
+            bars = data_provider.get_latest_closed_bars(symbol, self.timeframe, num_bars)
+            if bars is None or bars.empty:
+                return None
+
+            missing_bars = bars[bars.index > last_bar_datetime]
+            if missing_bars.empty:
+                return None
+
+            if len(missing_bars) == len(bars):
+                # Las velas recuperadas no llegan hasta la última procesada: el hueco es mayor que el histórico
+                bar = self._rebuild_levels(symbol, data_provider)
+                if bar is None:
+                    return None
+            else:
+                for _, missing_bar in missing_bars.iloc[:-1].iterrows():
+                    self.SR_TRACKER.update(symbol, missing_bar)
+                if len(missing_bars) > 1:
+                    self._last_close[symbol] = float(missing_bars['close'].iloc[-2])
+                bar = missing_bars.iloc[-1]
+
+        self.SR_TRACKER.update(symbol, bar)
+        self._last_bar_datetime[symbol] = bar.name
+        return bar
+
+    def _get_sl_tp(self, signal: str, entry_price: float, sl_level: SupportResistanceLevel | None, tp_level: SupportResistanceLevel | None, point: float) -> Tuple[float, float]:
+        """
+        Computes the SL and TP of an entry from the neighbouring levels.
+
+        The SL is placed beyond the sl_level and the TP before the tp_level, both at sl_tp_buffer_points from them. They
+        are set to 0 (not used) if there is no level or if they are on the wrong side of the entry price.
+
+        Args:
+            signal (str): "BUY" or "SELL".
+            entry_price (float): The expected entry price.
+            sl_level (SupportResistanceLevel | None): The level that protects the position.
+            tp_level (SupportResistanceLevel | None): The next level in the direction of the trade.
+            point (float): The point size of the symbol.
+
+        Returns:
+            Tuple[float, float]: The SL and the TP.
+        """
+        direction = 1.0 if signal == "BUY" else -1.0
+        buffer = self.sl_tp_buffer_points * point
+
+        sl = sl_level.price - direction * buffer if sl_level is not None else 0.0
+        tp = tp_level.price - direction * buffer if tp_level is not None else 0.0
+
+        if sl != 0.0 and direction * (entry_price - sl) <= 0:
+            sl = 0.0
+        if tp != 0.0 and direction * (tp - entry_price) <= 0:
+            tp = 0.0
+
+        return sl, tp
+
+    def _get_market_signal(self, symbol: str, bar: pd.Series, previous_close: float) -> Tuple[str, SupportResistanceLevel | None, SupportResistanceLevel | None]:
+        """
+        Detects a breakout or bounce on the close of the bar.
+
+        Args:
+            symbol (str): The symbol.
+            bar (pd.Series): The new closed bar.
+            previous_close (float): The close of the previous bar.
+
+        Returns:
+            Tuple[str, SupportResistanceLevel | None, SupportResistanceLevel | None]: The signal ("BUY", "SELL" or ""),
+            the level for the SL and the level for the TP.
+        """
+        close = float(bar['close'])
+
+        if self.entry_mode == "BREAKOUT":
+            # Ruptura alcista: el cierre supera la primera resistencia que había por encima del cierre anterior
+            resistance = self.SR_TRACKER.get_nearest_resistance(symbol, previous_close, self.min_touches)
+            if resistance is not None and resistance.price < close:
+                return "BUY", resistance, self.SR_TRACKER.get_nearest_resistance(symbol, close, self.min_touches)
+
+            # Ruptura bajista: el cierre pierde el primer soporte que había por debajo del cierre anterior
+            support = self.SR_TRACKER.get_nearest_support(symbol, previous_close, self.min_touches)
+            if support is not None and support.price > close:
+                return "SELL", support, self.SR_TRACKER.get_nearest_support(symbol, close, self.min_touches)
+
+        else:
+            # Rebote en soporte: el mínimo de la vela toca el soporte y cierra por encima
+            support = self.SR_TRACKER.get_nearest_support(symbol, close, self.min_touches)
+            if support is not None and float(bar['low']) <= support.price:
+                return "BUY", support, self.SR_TRACKER.get_nearest_resistance(symbol, close, self.min_touches)
+
+            # Rebote en resistencia: el máximo de la vela toca la resistencia y cierra por debajo
+            resistance = self.SR_TRACKER.get_nearest_resistance(symbol, close, self.min_touches)
+            if resistance is not None and float(bar['high']) >= resistance.price:
+                return "SELL", resistance, self.SR_TRACKER.get_nearest_support(symbol, close, self.min_touches)
+
+        return "", None, None
+
+    def _get_pending_signal(self, symbol: str, bar: pd.Series, point: float) -> Tuple[str, str, float, SupportResistanceLevel | None, SupportResistanceLevel | None]:
+        """
+        Detects a level close enough to the price to place a pending order at it.
+
+        Args:
+            symbol (str): The symbol.
+            bar (pd.Series): The new closed bar.
+            point (float): The point size of the symbol.
+
+        Returns:
+            Tuple[str, str, float, SupportResistanceLevel | None, SupportResistanceLevel | None]: The signal ("BUY", "SELL"
+            or ""), the target order ("STOP" or "LIMIT"), the target price, the level for the SL and the level for the TP.
+        """
+        close = float(bar['close'])
+        buffer = self.sl_tp_buffer_points * point
+        max_distance = self.entry_distance_points * point
+
+        support = self.SR_TRACKER.get_nearest_support(symbol, close, self.min_touches)
+        resistance = self.SR_TRACKER.get_nearest_resistance(symbol, close, self.min_touches)
+
+        # Elegimos el nivel más cercano al precio, si está dentro de la distancia de entrada
+        # (lado, nivel): el lado se decide por la búsqueda que encontró el nivel, no por la identidad del objeto
+        candidates = [(side, level) for side, level in (("RESISTANCE", resistance), ("SUPPORT", support))
+                      if level is not None and abs(level.price - close) <= max_distance]
+        if not candidates:
+            return "", "", 0.0, None, None
+        side, level = min(candidates, key=lambda candidate: abs(candidate[1].price - close))
+
+        if self.entry_mode == "BREAKOUT":
+            if side == "RESISTANCE":
+                # BUY STOP por encima de la resistencia: el SL se protege con la propia resistencia rota
+                signal, target_order, target_price = "BUY", "STOP", level.price + buffer
+                tp_level = self.SR_TRACKER.get_nearest_resistance(symbol, target_price, self.min_touches)
+            else:
+                signal, target_order, target_price = "SELL", "STOP", level.price - buffer
+                tp_level = self.SR_TRACKER.get_nearest_support(symbol, target_price, self.min_touches)
+
+        else:
+            if side == "SUPPORT":
+                # BUY LIMIT en el soporte, con el SL por debajo de él y el TP en la resistencia
+                signal, target_order, target_price, tp_level = "BUY", "LIMIT", level.price + buffer, resistance
+            else:
+                signal, target_order, target_price, tp_level = "SELL", "LIMIT", level.price - buffer, support
+
+        # Las órdenes STOP deben quedar a favor del movimiento y las LIMIT en contra, respecto al precio actual
+        direction = 1.0 if signal == "BUY" else -1.0
+        order_side = 1.0 if target_order == "STOP" else -1.0
+        if direction * order_side * (target_price - close) <= 0:
+            return "", "", 0.0, None, None
+
+        return signal, target_order, target_price, level, tp_level
+
+    def get_warm_up_bars(self) -> int:
+        """
+        Returns the number of historical bars used to build the levels.
+        """
+        return self.warm_up_bars
+
+    def warm_up(self, history: Dict[str, pd.DataFrame]) -> None:
+        """
+        Builds the levels of the strategy from bulk history.
+
+        Args:
+            history (Dict[str, pd.DataFrame]): The historical closed bars of each symbol, in the strategy timeframe.
+
+        Returns:
+            None
+        """
+        for symbol, bars in history.items():
+            if bars.empty:
+                continue
+            self.SR_TRACKER.reset(symbol)
+            self.SR_TRACKER.warm_up(symbol, bars)
+            self._last_close[symbol] = float(bars['close'].iloc[-1])
+            self._last_bar_datetime[symbol] = bars.index[-1]
+
+    @staticmethod
+    def _get_strategy_pending_orders(symbol: str, signal: str, magic: int) -> tuple:
+        """
+        Returns the pending orders of the strategy on a symbol and direction.
+
+        Args:
+            symbol (str): The symbol of the orders.
+            signal (str): The direction of the orders ("BUY" or "SELL").
+            magic (int): The magic number of the strategy.
+
+        Returns:
+            tuple: The pending orders.
+        """
+        orders = mt5.orders_get(symbol=symbol)
+        if orders is None:
+            return ()
+
+        order_types = (mt5.ORDER_TYPE_BUY_STOP, mt5.ORDER_TYPE_BUY_LIMIT) if signal == "BUY" else (mt5.ORDER_TYPE_SELL_STOP, mt5.ORDER_TYPE_SELL_LIMIT)
+        return tuple(order for order in orders if order.magic == magic and order.type in order_types)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the strategy to be checkpointed: the levels and the last processed bars.
+        """
+        return {
+            "tracker": self.SR_TRACKER.get_state(),
+            "last_bar_datetime": self._last_bar_datetime,
+            "last_close": self._last_close,
+            "last_pending_level": self._last_pending_level,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """
+        Restores a checkpointed state of the strategy. If the levels were built with other settings, nothing is restored
+        and the levels are rebuilt from history in the next data event.
+        """
+        if not self.SR_TRACKER.set_state(state["tracker"]):
+            return
+
+        self._last_bar_datetime = state["last_bar_datetime"]
+        self._last_close = state["last_close"]
+        self._last_pending_level = state["last_pending_level"]
+
+    def generate_signal(self, data_event: DataEvent, data_provider: DataProvider, portfolio: Portfolio, order_executor: OrderExecutor) -> SignalEvent:
+        """
+        Generates a signal based on the support/resistance breakout or bounce strategy.
+
+        Args:
+            data_event (DataEvent): The data event that triggered the signal generation.
+            data_provider (DataProvider): The data provider used to retrieve the necessary data.
+            portfolio (Portfolio): The portfolio containing the open positions.
+            order_executor (OrderExecutor): The order executor used to execute the orders.
+
+        Returns:
+            SignalEvent: The generated signal event.
+        """
+        # Cogemos el símbolo del evento
+        symbol = data_event.symbol
+
+        # Actualizamos los niveles con la nueva vela
+        bar = self._update_levels(data_event, data_provider)
+        if bar is None:
+            return None
+
+        previous_close = self._last_close.get(symbol, float(bar['close']))
+        self._last_close[symbol] = float(bar['close'])
+
+        # Recuperamos las posiciones abiertas por esta estrategia en el símbolo donde hemos tenido el Data Event
+        open_positions = portfolio.get_number_of_strategy_open_positions_by_symbol(symbol)
+        points = SymbolMetadataCache.get(symbol).point
+
+        if self.use_pending_orders:
+            signal, target_order, target_price, sl_level, tp_level = self._get_pending_signal(symbol, bar, points)
+
+            # No repetimos la orden pendiente en el mismo nivel
+            if signal != "":
+                last_level = self._last_pending_level.get((symbol, signal))
+                if last_level is not None and abs(last_level - sl_level.price) <= self.cluster_distance_points * points:
+                    signal = ""
+
+            # Solo ponemos la orden si no hay posición abierta en esa dirección
+            if signal == "BUY" and open_positions['LONG'] > 0 or signal == "SELL" and open_positions['SHORT'] > 0:
+                signal = ""
+
+            # La nueva orden sustituye a la orden pendiente anterior de la estrategia en esa dirección
+            if signal != "":
+                for order in self._get_strategy_pending_orders(symbol, signal, portfolio.magic):
+                    order_executor.cancel_pending_order_by_ticket(order.ticket)
+                self._last_pending_level[(symbol, signal)] = sl_level.price
+
+            entry_price = target_price
+
+        else:
+            signal, sl_level, tp_level = self._get_market_signal(symbol, bar, previous_close)
+            target_order, target_price = "MARKET", 0.0
+
+            # Detectar una señal de compra
+            if signal == "BUY" and open_positions['LONG'] == 0:
+                if open_positions['SHORT'] > 0:
+                    # Tenemos señal de compra, pero tenemos posición de venta. Debemos cerrar la venta ANTES de abrir la compra.
+                    order_executor.close_strategy_short_positions_by_symbol(symbol)
+
+            # Señal de venta
+            elif signal == "SELL" and open_positions['SHORT'] == 0:
+                if open_positions['LONG'] > 0:
+                    order_executor.close_strategy_long_positions_by_symbol(symbol)
+
+            else:
+                signal = ""
+
+            # Detectamos el último precio para calcular SL y TP
+            if signal != "":
+                last_tick = data_provider.get_latest_tick(symbol)
+                entry_price = last_tick['ask'] if signal == "BUY" else last_tick['bid']
+
+        # Si tenemos señal, generamos SignalEvent y lo colocamos en la cola de Eventos
+        if signal != "":
+            sl, tp = self._get_sl_tp(signal, entry_price, sl_level, tp_level, points)
+            signal_event = SignalEvent(symbol=symbol,
+                                    signal=signal,
+                                    target_order=target_order,
+                                    target_price=target_price,
+                                    magic_number=portfolio.magic,
+                                    sl=sl,
+                                    tp=tp)
+
+            return signal_event
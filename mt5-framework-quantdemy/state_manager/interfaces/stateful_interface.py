@@ -0,0 +1,11 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from typing import Protocol
+
+class IStateful(Protocol):
+
+    def get_state(self) -> dict:
+        ...
+
+    def set_state(self, state: dict) -> None:
+        ...
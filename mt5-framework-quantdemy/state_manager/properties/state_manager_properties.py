@@ -0,0 +1,19 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class StateManagerProps(BaseModel):
+    """
+    Properties of the checkpointing of the framework state.
+
+    Attributes:
+        state_file (str): The path of the file where the state is saved.
+        checkpoint_interval_seconds (float): The time between periodic checkpoints.
+        max_state_age_hours (float): The maximum age of a saved state to be restored.
+        price_tolerance (float): The maximum difference between the saved close of the last bar and the close of the same
+            bar returned by the platform for the state to be considered consistent.
+    """
+    state_file: str
+    checkpoint_interval_seconds: float = 60.0
+    max_state_age_hours: float = 72.0
+    price_tolerance: float = 1e-6
@@ -0,0 +1,166 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .interfaces.stateful_interface import IStateful
+from .properties.state_manager_properties import StateManagerProps
+from data_provider.data_provider import DataProvider
+from utils.utils import Utils
+from clock.clock import Clock
+from datetime import datetime, timedelta
+from typing import Dict
+import pickle
+import os
+
+
+class StateManager():
+
+    # Versión del formato del fichero de estado
+    _STATE_VERSION = 1
+
+    def __init__(self, properties: StateManagerProps, data_provider: DataProvider, components: Dict[str, IStateful],
+                 persistent_components: Dict[str, IStateful] | None = None):
+        """
+        Initializes the StateManager object.
+
+        Args:
+            properties (StateManagerProps): The properties of the state manager.
+            data_provider (DataProvider): The data provider, whose last bars are checkpointed and used for the consistency check.
+            components (Dict[str, IStateful]): The components whose state is checkpointed (e.g. the signal generator), by name.
+            persistent_components (Dict[str, IStateful] | None): The components whose state does not depend on the bars
+                (e.g. the risk manager halts), by name. They are restored even if the state is too old or inconsistent
+                with the latest bars.
+        """
+        self.state_file = properties.state_file
+        self.checkpoint_interval = timedelta(seconds=properties.checkpoint_interval_seconds)
+        self.max_state_age = timedelta(hours=properties.max_state_age_hours)
+        self.price_tolerance = properties.price_tolerance
+
+        self.DATA_PROVIDER = data_provider
+        self.components = components
+        self.persistent_components = persistent_components if persistent_components is not None else {}
+
+        self.last_checkpoint: datetime = Clock.now()
+
+        state_dir = os.path.dirname(self.state_file)
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def checkpoint(self) -> None:
+        """
+        Saves the state of the data provider and of all the components to disk.
+
+        Returns:
+            None
+        """
+        state = {
+            "version": self._STATE_VERSION,
+            "saved_at": Clock.now(),
+            "timeframe": self.DATA_PROVIDER.timeframe,
+            "data_provider": self.DATA_PROVIDER.get_state(),
+            "components": {name: component.get_state() for name, component in self.components.items()},
+            "persistent_components": {name: component.get_state() for name, component in self.persistent_components.items()},
+        }
+
+        # Escritura atómica: fichero temporal y renombrado
+        tmp_path = self.state_file + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.state_file)
+
+        except Exception as e:
+            print(f"{Utils.dateprint()} - ERROR: No se ha podido guardar el estado en {self.state_file}. Exception: {e}")
+
+        self.last_checkpoint = Clock.now()
+
+    def checkpoint_if_due(self) -> None:
+        """
+        Saves the state if the checkpoint interval has elapsed since the last checkpoint.
+
+        Returns:
+            None
+        """
+        if Clock.now() - self.last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def _check_consistency(self, state: dict) -> bool:
+        """
+        Checks a saved state against the latest bars of the platform.
+
+        The state is consistent if it is recent enough, it was saved with the same timeframe, and for every symbol the
+        last saved bar is not newer than the latest closed bar of the platform. If no new bar has closed since the
+        checkpoint, its close must also match the saved one.
+
+        Args:
+            state (dict): The saved state.
+
+        Returns:
+            bool: True if the state can be restored.
+        """
+        if state.get("version") != self._STATE_VERSION or state.get("timeframe") != self.DATA_PROVIDER.timeframe:
+            print(f"{Utils.dateprint()} - STATE: El estado guardado no corresponde a esta configuración")
+            return False
+
+        saved_at = state["saved_at"]
+        if Clock.now() - saved_at > self.max_state_age:
+            print(f"{Utils.dateprint()} - STATE: El estado guardado es demasiado antiguo ({saved_at})")
+            return False
+
+        last_bar_datetime = state["data_provider"]["last_bar_datetime"]
+        last_bar_close = state["data_provider"]["last_bar_close"]
+        for symbol in self.DATA_PROVIDER.symbols:
+            saved_datetime = last_bar_datetime.get(symbol, datetime.min)
+            if saved_datetime == datetime.min:
+                continue
+
+            latest_bar = self.DATA_PROVIDER.get_latest_closed_bar(symbol, self.DATA_PROVIDER.timeframe)
+            if latest_bar is None or latest_bar.empty:
+                continue
+
+            if latest_bar.name < saved_datetime:
+                print(f"{Utils.dateprint()} - STATE: La última vela guardada de {symbol} ({saved_datetime}) es posterior a la de la plataforma ({latest_bar.name})")
+                return False
+
+            if latest_bar.name == saved_datetime and symbol in last_bar_close and abs(float(latest_bar['close']) - last_bar_close[symbol]) > self.price_tolerance:
+                print(f"{Utils.dateprint()} - STATE: El cierre guardado de {symbol} no coincide con el de la plataforma")
+                return False
+
+        return True
+
+    def restore(self) -> bool:
+        """
+        Restores the saved state, if there is one and it is consistent with the latest bars of the platform. The
+        persistent components are restored whenever the state can be read.
+
+        The components detect by themselves the bars missed while the framework was stopped and catch up (or warm up
+        again) in the next data event.
+
+        Returns:
+            bool: True if the state was restored. False if the components have to be warmed up from history.
+        """
+        if not os.path.exists(self.state_file):
+            return False
+
+        try:
+            with open(self.state_file, 'rb') as file:
+                state = pickle.load(file)
+
+        except Exception as e:
+            print(f"{Utils.dateprint()} - ERROR: No se ha podido leer el estado de {self.state_file}. Exception: {e}")
+            return False
+
+        # Los componentes persistentes no dependen de las velas: se restauran aunque el resto del estado se descarte
+        if state.get("version") == self._STATE_VERSION:
+            for name, component in self.persistent_components.items():
+                if name in state.get("persistent_components", {}):
+                    component.set_state(state["persistent_components"][name])
+
+        if not self._check_consistency(state):
+            return False
+
+        self.DATA_PROVIDER.set_state(state["data_provider"])
+        for name, component in self.components.items():
+            if name in state["components"]:
+                component.set_state(state["components"][name])
+
+        print(f"{Utils.dateprint()} - STATE: Estado restaurado desde {self.state_file} (guardado el {state['saved_at']})")
+        return True
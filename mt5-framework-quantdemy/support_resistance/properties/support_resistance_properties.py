@@ -0,0 +1,38 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+
+class SupportResistanceProps(BaseModel):
+    """
+    Properties of the swing support and resistance detection.
+
+    A bar is a support if the lows of the n1 bars up to it are non-increasing and the lows of the n2 bars after it are
+    non-decreasing (and the mirror condition on the highs for a resistance).
+
+    Attributes:
+        n1 (int): The number of bars before the candidate bar.
+        n2 (int): The number of bars after the candidate bar. The level is only confirmed n2 bars after the pivot.
+    """
+
+    class Config:
+        frozen = True
+
+    n1: int = 2
+    n2: int = 2
+
+class SupportResistanceTrackerProps(BaseModel):
+    """
+    Properties of the live support and resistance level tracker.
+
+    Attributes:
+        n1 (int): The number of bars before the pivot bar (as in SupportResistanceProps).
+        n2 (int): The number of bars after the pivot bar needed to confirm it.
+        cluster_distance_points (float): The maximum distance, in points, between a new pivot and an existing level to be merged into it.
+        decay_half_life_bars (float): The number of bars after which the strength of a level not touched again halves.
+        min_strength (float): The strength below which a level is removed.
+    """
+    n1: int = 2
+    n2: int = 2
+    cluster_distance_points: float = 20.0
+    decay_half_life_bars: float = 500.0
+    min_strength: float = 0.25
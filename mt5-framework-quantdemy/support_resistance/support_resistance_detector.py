@@ -0,0 +1,149 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.support_resistance_properties import SupportResistanceProps
+from typing import Dict, List, Tuple
+import pandas as pd
+import numpy as np
+
+
+class SupportResistanceDetector():
+
+    def __init__(self, bars: pd.DataFrame):
+        """
+        Initializes the SupportResistanceDetector object.
+
+        Instead of checking the n1 + n2 neighbours of every bar, the detector computes once, for every bar, the length
+        of the run of non-increasing / non-decreasing lows and highs ending at it (backwards) and starting at it
+        (forwards). Then each (n1, n2) setting is just a comparison of those run lengths, so a batch of settings over
+        millions of bars costs a few array operations each.
+
+        Args:
+            bars (pd.DataFrame): The bars, with 'high' and 'low' columns.
+        """
+        self.index = bars.index
+        self.high = bars['high'].to_numpy(dtype=float)
+        self.low = bars['low'].to_numpy(dtype=float)
+
+        # Diferencias con la vela anterior (la primera vela no tiene anterior, por lo que no cumple ninguna condición)
+        low_diff = np.diff(self.low, prepend=np.nan)
+        high_diff = np.diff(self.high, prepend=np.nan)
+
+        # Soporte: mínimos no crecientes hasta la vela y no decrecientes después
+        self._low_down_run = self._get_backward_run_lengths(low_diff <= 0)
+        self._low_up_run = self._get_forward_run_lengths(low_diff >= 0)
+
+        # Resistencia: máximos no decrecientes hasta la vela y no crecientes después
+        self._high_up_run = self._get_backward_run_lengths(high_diff >= 0)
+        self._high_down_run = self._get_forward_run_lengths(high_diff <= 0)
+
+    @staticmethod
+    def _get_backward_run_lengths(mask: np.ndarray) -> np.ndarray:
+        """
+        Returns, for each position, the number of consecutive True values of the mask ending at it.
+
+        Args:
+            mask (np.ndarray): The boolean mask.
+
+        Returns:
+            np.ndarray: The run lengths.
+        """
+        positions = np.arange(len(mask), dtype=np.int32)
+        last_false = np.where(mask, np.int32(-1), positions)
+        np.maximum.accumulate(last_false, out=last_false)
+        return positions - last_false
+
+    @staticmethod
+    def _get_forward_run_lengths(mask: np.ndarray) -> np.ndarray:
+        """
+        Returns, for each position, the number of consecutive True values of the mask starting at it.
+
+        Args:
+            mask (np.ndarray): The boolean mask.
+
+        Returns:
+            np.ndarray: The run lengths.
+        """
+        return SupportResistanceDetector._get_backward_run_lengths(np.ascontiguousarray(mask[::-1]))[::-1]
+
+    def _get_pivots(self, backward_run: np.ndarray, forward_run: np.ndarray, n1: int, n2: int) -> np.ndarray:
+        """
+        Returns the mask of the bars whose n1 previous changes and n2 next changes satisfy the run conditions.
+
+        Args:
+            backward_run (np.ndarray): The run lengths of the condition before the bar (ending at the bar).
+            forward_run (np.ndarray): The run lengths of the condition after the bar (starting at the next bar).
+            n1 (int): The number of bars before the candidate bar.
+            n2 (int): The number of bars after the candidate bar.
+
+        Returns:
+            np.ndarray: The boolean mask of the pivots.
+        """
+        n = len(backward_run)
+
+        # La vela l necesita los cambios de l-n1+1 a l (hacia atrás) y de l+1 a l+n2 (hacia delante)
+        next_forward_run = np.append(forward_run[1:], 0)
+        pivots = (backward_run >= n1) & (next_forward_run >= n2)
+
+        # Las velas sin n1 velas previas o n2 velas posteriores no pueden confirmarse
+        pivots[:max(n1, 0)] = False
+        if n2 > 0:
+            pivots[max(n - n2, 0):] = False
+
+        return pivots
+
+    def detect_supports(self, n1: int, n2: int) -> np.ndarray:
+        """
+        Returns the mask of the swing supports.
+        """
+        return self._get_pivots(self._low_down_run, self._low_up_run, n1, n2)
+
+    def detect_resistances(self, n1: int, n2: int) -> np.ndarray:
+        """
+        Returns the mask of the swing resistances.
+        """
+        return self._get_pivots(self._high_up_run, self._high_down_run, n1, n2)
+
+    def detect(self, properties: SupportResistanceProps) -> pd.DataFrame:
+        """
+        Detects the swing supports and resistances of the whole series.
+
+        Args:
+            properties (SupportResistanceProps): The properties of the detection.
+
+        Returns:
+            pd.DataFrame: The 'support' (low of the bar) and 'resistance' (high of the bar) levels at each pivot bar,
+            NaN on the rest of the bars. Indexed like the bars.
+        """
+        supports = self.detect_supports(properties.n1, properties.n2)
+        resistances = self.detect_resistances(properties.n1, properties.n2)
+
+        return pd.DataFrame({'support': np.where(supports, self.low, np.nan),
+                             'resistance': np.where(resistances, self.high, np.nan)}, index=self.index)
+
+    def detect_batch(self, properties_list: List[SupportResistanceProps]) -> Dict[SupportResistanceProps, pd.DataFrame]:
+        """
+        Detects the swing supports and resistances for a batch of settings, reusing the run lengths of the series.
+
+        Args:
+            properties_list (List[SupportResistanceProps]): The properties of every detection.
+
+        Returns:
+            Dict[SupportResistanceProps, pd.DataFrame]: The result of detect for each properties object.
+        """
+        return {properties: self.detect(properties) for properties in dict.fromkeys(properties_list)}
+
+    def get_levels(self, properties: SupportResistanceProps) -> Tuple[pd.Series, pd.Series]:
+        """
+        Returns the detected levels as two series with only the pivot bars.
+
+        Args:
+            properties (SupportResistanceProps): The properties of the detection.
+
+        Returns:
+            Tuple[pd.Series, pd.Series]: The supports and the resistances, indexed by the time of the pivot bar.
+        """
+        supports = self.detect_supports(properties.n1, properties.n2)
+        resistances = self.detect_resistances(properties.n1, properties.n2)
+
+        return (pd.Series(self.low[supports], index=self.index[supports], name='support'),
+                pd.Series(self.high[resistances], index=self.index[resistances], name='resistance'))
@@ -0,0 +1,34 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from pydantic import BaseModel
+from datetime import datetime
+
+class SupportResistanceLevel(BaseModel):
+    """
+    A price level built by clustering nearby pivots.
+
+    Attributes:
+        price (float): The price of the level (average of its pivots, weighted by their strength).
+        touches (int): The number of pivots merged into the level.
+        weight (float): The strength of the level at its last touch.
+        last_touch_bar (int): The bar number of the last pivot merged into the level.
+        last_touch_time (datetime): The time of the last pivot merged into the level.
+    """
+    price: float
+    touches: int = 1
+    weight: float = 1.0
+    last_touch_bar: int
+    last_touch_time: datetime
+
+    def get_strength(self, bar_number: int, half_life_bars: float) -> float:
+        """
+        Returns the strength of the level at a given bar, decayed exponentially since its last touch.
+
+        Args:
+            bar_number (int): The current bar number.
+            half_life_bars (float): The number of bars after which the strength halves.
+
+        Returns:
+            float: The decayed strength.
+        """
+        return self.weight * 0.5 ** ((bar_number - self.last_touch_bar) / half_life_bars)
@@ -0,0 +1,334 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .properties.support_resistance_properties import SupportResistanceTrackerProps
+from .support_resistance_level import SupportResistanceLevel
+from events.events import DataEvent
+from collections import deque
+from typing import Dict, List
+import pandas as pd
+from utils.terminal import mt5
+import bisect
+
+
+class SupportResistanceTracker():
+
+    def __init__(self, properties: SupportResistanceTrackerProps):
+        """
+        Initializes the SupportResistanceTracker object.
+
+        Pivots are confirmed incrementally with the same rule as SupportResistanceDetector: the tracker keeps the run
+        lengths of non-increasing/non-decreasing lows and highs, and a bar is confirmed as a pivot n2 bars later. New
+        pivots are merged into the nearest level when they are close enough. The levels of each symbol are kept sorted
+        by price, so the nearest-level queries are binary searches.
+
+        Args:
+            properties (SupportResistanceTrackerProps): The properties of the tracker.
+        """
+        self.n1 = properties.n1 if properties.n1 > 0 else 0
+        self.n2 = properties.n2 if properties.n2 > 0 else 0
+        self.cluster_distance_points = properties.cluster_distance_points
+        self.decay_half_life_bars = properties.decay_half_life_bars if properties.decay_half_life_bars > 0 else 1.0
+        self.min_strength = properties.min_strength
+
+        # Estado de confirmación de pivotes por símbolo
+        self._bar_count: Dict[str, int] = {}
+        self._last_bar: Dict[str, tuple] = {}
+        self._low_up_run: Dict[str, int] = {}
+        self._high_down_run: Dict[str, int] = {}
+        self._pending_bars: Dict[str, deque] = {}
+
+        # Niveles de cada símbolo ordenados por precio (lista de precios paralela para las búsquedas binarias)
+        self._levels: Dict[str, List[SupportResistanceLevel]] = {}
+        self._level_prices: Dict[str, List[float]] = {}
+        self._last_prune_bar: Dict[str, int] = {}
+
+        self._points: Dict[str, float] = {}
+
+    def _get_point(self, symbol: str) -> float:
+        """
+        Returns the point size of a symbol, retrieved from MT5 only the first time.
+        """
+        if symbol not in self._points:
+            self._points[symbol] = mt5.symbol_info(symbol).point
+        return self._points[symbol]
+
+    def reset(self, symbol: str) -> None:
+        """
+        Removes all the state and levels of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            None
+        """
+        for state in (self._bar_count, self._last_bar, self._low_up_run, self._high_down_run, self._pending_bars,
+                      self._levels, self._level_prices, self._last_prune_bar):
+            state.pop(symbol, None)
+
+    def _get_settings(self) -> tuple:
+        """
+        Returns the settings that determine the levels built by the tracker.
+        """
+        return (self.n1, self.n2, self.cluster_distance_points, self.decay_half_life_bars, self.min_strength)
+
+    def get_state(self) -> dict:
+        """
+        Returns the state of the tracker to be checkpointed.
+
+        Returns:
+            dict: The settings of the tracker, the pivot confirmation state and the levels of every symbol.
+        """
+        return {
+            "settings": self._get_settings(),
+            "bar_count": self._bar_count,
+            "last_bar": self._last_bar,
+            "low_up_run": self._low_up_run,
+            "high_down_run": self._high_down_run,
+            "pending_bars": self._pending_bars,
+            "levels": self._levels,
+            "level_prices": self._level_prices,
+            "last_prune_bar": self._last_prune_bar,
+        }
+
+    def set_state(self, state: dict) -> bool:
+        """
+        Restores a checkpointed state.
+
+        Args:
+            state (dict): The state returned by get_state.
+
+        Returns:
+            bool: False if the state was built with other settings (and it is not restored). True otherwise.
+        """
+        if tuple(state["settings"]) != self._get_settings():
+            return False
+
+        self._bar_count = state["bar_count"]
+        self._last_bar = state["last_bar"]
+        self._low_up_run = state["low_up_run"]
+        self._high_down_run = state["high_down_run"]
+        self._pending_bars = state["pending_bars"]
+        self._levels = state["levels"]
+        self._level_prices = state["level_prices"]
+        self._last_prune_bar = state["last_prune_bar"]
+        return True
+
+    def on_data_event(self, data_event: DataEvent) -> None:
+        """
+        Updates the tracker with the closed bar of a data event.
+
+        Args:
+            data_event (DataEvent): The data event.
+
+        Returns:
+            None
+        """
+        self.update(data_event.symbol, data_event.data)
+
+    def warm_up(self, symbol: str, bars: pd.DataFrame) -> None:
+        """
+        Feeds the tracker with historical closed bars of a symbol.
+
+        Args:
+            symbol (str): The symbol.
+            bars (pd.DataFrame): The bars, oldest first.
+
+        Returns:
+            None
+        """
+        highs = bars['high'].to_numpy(dtype=float).tolist()
+        lows = bars['low'].to_numpy(dtype=float).tolist()
+        for time, high, low in zip(bars.index, highs, lows):
+            self._update_values(symbol, time, high, low)
+
+    def update(self, symbol: str, bar: pd.Series) -> None:
+        """
+        Updates the tracker with a new closed bar of a symbol, in O(1) plus the insertion of a confirmed pivot.
+
+        Args:
+            symbol (str): The symbol.
+            bar (pd.Series): The closed bar, named by its time.
+
+        Returns:
+            None
+        """
+        self._update_values(symbol, bar.name, float(bar['high']), float(bar['low']))
+
+    def _update_values(self, symbol: str, time, high: float, low: float) -> None:
+        """
+        Updates the run lengths with a new bar and confirms the pivot of n2 bars ago.
+
+        Returns:
+            None
+        """
+        if symbol not in self._bar_count:
+            self._bar_count[symbol] = 0
+            self._low_up_run[symbol] = 0
+            self._high_down_run[symbol] = 0
+            self._pending_bars[symbol] = deque(maxlen=self.n2 + 1)
+            self._levels[symbol] = []
+            self._level_prices[symbol] = []
+            self._last_prune_bar[symbol] = 0
+
+        bar_number = self._bar_count[symbol]
+        self._bar_count[symbol] = bar_number + 1
+
+        # Longitudes de las rachas de mínimos y máximos que terminan en esta vela
+        last_bar = self._last_bar.get(symbol)
+        if last_bar is None:
+            low_down_run = high_up_run = 0
+            self._low_up_run[symbol] = self._high_down_run[symbol] = 0
+        else:
+            _, last_high, last_low, last_low_down_run, last_high_up_run = last_bar
+            low_down_run = last_low_down_run + 1 if low <= last_low else 0
+            high_up_run = last_high_up_run + 1 if high >= last_high else 0
+            self._low_up_run[symbol] = self._low_up_run[symbol] + 1 if low >= last_low else 0
+            self._high_down_run[symbol] = self._high_down_run[symbol] + 1 if high <= last_high else 0
+
+        current_bar = (time, high, low, low_down_run, high_up_run)
+        self._last_bar[symbol] = current_bar
+        pending_bars = self._pending_bars[symbol]
+        pending_bars.append(current_bar)
+
+        # El candidato es la vela de hace n2 velas: se confirma si las n2 velas posteriores cumplen la condición
+        if len(pending_bars) == self.n2 + 1:
+            pivot_time, pivot_high, pivot_low, pivot_low_down_run, pivot_high_up_run = pending_bars[0]
+            pivot_bar = bar_number - self.n2
+
+            if pivot_bar >= self.n1:
+                if pivot_low_down_run >= self.n1 and self._low_up_run[symbol] >= self.n2:
+                    self._add_pivot(symbol, pivot_low, pivot_bar, pivot_time)
+                if pivot_high_up_run >= self.n1 and self._high_down_run[symbol] >= self.n2:
+                    self._add_pivot(symbol, pivot_high, pivot_bar, pivot_time)
+
+        # Eliminamos periódicamente los niveles que ya han perdido su fuerza (coste amortizado O(1) por vela)
+        if bar_number - self._last_prune_bar[symbol] >= self.decay_half_life_bars:
+            self._prune_levels(symbol, bar_number)
+
+    def _add_pivot(self, symbol: str, price: float, bar_number: int, time) -> None:
+        """
+        Merges a confirmed pivot into the nearest level or creates a new level.
+
+        Args:
+            symbol (str): The symbol.
+            price (float): The price of the pivot.
+            bar_number (int): The bar number of the pivot.
+            time (datetime): The time of the pivot.
+
+        Returns:
+            None
+        """
+        levels = self._levels[symbol]
+        prices = self._level_prices[symbol]
+        max_distance = self.cluster_distance_points * self._get_point(symbol)
+
+        # Nivel más cercano: el de justo debajo o el de justo encima del precio del pivote
+        pos = bisect.bisect_left(prices, price)
+        nearest = None
+        for candidate in (pos - 1, pos):
+            if 0 <= candidate < len(prices) and abs(prices[candidate] - price) <= max_distance:
+                if nearest is None or abs(prices[candidate] - price) < abs(prices[nearest] - price):
+                    nearest = candidate
+
+        if nearest is None:
+            level = SupportResistanceLevel(price=price, last_touch_bar=bar_number, last_touch_time=time)
+        else:
+            # Fusionamos el pivote con el nivel: precio medio ponderado por la fuerza y un toque más
+            level = levels.pop(nearest)
+            prices.pop(nearest)
+            strength = level.get_strength(bar_number, self.decay_half_life_bars)
+            level.price = (level.price * strength + price) / (strength + 1.0)
+            level.weight = strength + 1.0
+            level.touches += 1
+            level.last_touch_bar = bar_number
+            level.last_touch_time = time
+
+        pos = bisect.bisect_left(prices, level.price)
+        prices.insert(pos, level.price)
+        levels.insert(pos, level)
+
+    def _prune_levels(self, symbol: str, bar_number: int) -> None:
+        """
+        Removes the levels of a symbol whose decayed strength is below the minimum.
+
+        Args:
+            symbol (str): The symbol.
+            bar_number (int): The current bar number.
+
+        Returns:
+            None
+        """
+        levels = [level for level in self._levels[symbol] if level.get_strength(bar_number, self.decay_half_life_bars) >= self.min_strength]
+        self._levels[symbol] = levels
+        self._level_prices[symbol] = [level.price for level in levels]
+        self._last_prune_bar[symbol] = bar_number
+
+    def get_strength(self, symbol: str, level: SupportResistanceLevel) -> float:
+        """
+        Returns the current strength of a level of a symbol.
+        """
+        return level.get_strength(self._bar_count.get(symbol, 0) - 1, self.decay_half_life_bars)
+
+    def get_levels(self, symbol: str) -> List[SupportResistanceLevel]:
+        """
+        Returns the levels of a symbol, sorted by price.
+        """
+        return list(self._levels.get(symbol, []))
+
+    def get_nearest_support(self, symbol: str, price: float, min_touches: int = 1) -> SupportResistanceLevel | None:
+        """
+        Returns the nearest level at or below the given price, in O(log n) (plus the skipped levels with fewer touches).
+
+        Args:
+            symbol (str): The symbol.
+            price (float): The reference price.
+            min_touches (int): The minimum number of touches of the level.
+
+        Returns:
+            SupportResistanceLevel | None: The nearest support, or None if there is no level below the price.
+        """
+        prices = self._level_prices.get(symbol, [])
+        pos = bisect.bisect_right(prices, price) - 1
+        while pos >= 0 and self._levels[symbol][pos].touches < min_touches:
+            pos -= 1
+        return self._levels[symbol][pos] if pos >= 0 else None
+
+    def get_nearest_resistance(self, symbol: str, price: float, min_touches: int = 1) -> SupportResistanceLevel | None:
+        """
+        Returns the nearest level at or above the given price, in O(log n) (plus the skipped levels with fewer touches).
+
+        Args:
+            symbol (str): The symbol.
+            price (float): The reference price.
+            min_touches (int): The minimum number of touches of the level.
+
+        Returns:
+            SupportResistanceLevel | None: The nearest resistance, or None if there is no level above the price.
+        """
+        prices = self._level_prices.get(symbol, [])
+        pos = bisect.bisect_left(prices, price)
+        while pos < len(prices) and self._levels[symbol][pos].touches < min_touches:
+            pos += 1
+        return self._levels[symbol][pos] if pos < len(prices) else None
+
+    def get_levels_within(self, symbol: str, price: float, distance_points: float) -> List[SupportResistanceLevel]:
+        """
+        Returns the levels within a distance of the given price, in O(log n + k).
+
+        Args:
+            symbol (str): The symbol.
+            price (float): The reference price.
+            distance_points (float): The maximum distance, in points.
+
+        Returns:
+            List[SupportResistanceLevel]: The levels between price - distance and price + distance, sorted by price.
+        """
+        prices = self._level_prices.get(symbol, [])
+        if not prices:
+            return []
+
+        distance = distance_points * self._get_point(symbol)
+        start = bisect.bisect_left(prices, price - distance)
+        end = bisect.bisect_right(prices, price + distance)
+        return self._levels[symbol][start:end]
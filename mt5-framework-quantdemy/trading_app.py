@@ -6,12 +6,23 @@ from trading_director.trading_director import TradingDirector
 from signal_generator.signal_generator import SignalGenerator
 from signal_generator.properties.signal_generator_properties import MACrossoverProps, RSIProps
 from position_sizer.position_sizer import PositionSizer
-from position_sizer.properties.position_sizer_properties import MinSizingProps, FixedSizingProps, RiskPctSizingProps
+from position_sizer.properties.position_sizer_properties import MinSizingProps, FixedSizingProps, RiskPctSizingProps, VolTargetSizingProps, RiskParitySizingProps
 from portfolio.portfolio import Portfolio
+from portfolio.mark_to_market import MarkToMarket
 from risk_manager.risk_manager import RiskManager
-from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps
+from risk_manager.properties.risk_manager_properties import MaxLeverageFactorRiskProps, DrawdownKillSwitchRiskProps, VaRRiskProps
 from order_executor.order_executor import OrderExecutor
+from order_executor.order_gateway import OrderGateway
+from order_executor.properties.order_executor_properties import OrderGatewayProps
 from notifications.notifications import NotificationService, TelegramNotificationProperties
+from performance.performance_metrics import PerformanceMetrics
+from performance.properties.performance_properties import PerformanceMetricsProps
+from indicators.indicator_engine import IndicatorEngine
+from state_manager.state_manager import StateManager
+from market_statistics.correlation_engine import CorrelationEngine
+from market_statistics.bar_statistics_tracker import BarStatisticsTracker
+from market_statistics.properties.market_statistics_properties import CorrelationEngineProps, BarStatisticsProps
+from state_manager.properties.state_manager_properties import StateManagerProps
 from queue import Queue
 
 if __name__ == "__main__":
@@ -43,24 +54,43 @@ if __name__ == "__main__":
     
     PORTFOLIO = Portfolio(magic_number=magic_number)
 
+    MARK_TO_MARKET = MarkToMarket(portfolio=PORTFOLIO)
+
     ORDER_EXECUTOR = OrderExecutor(events_queue=events_queue,
                                     portfolio=PORTFOLIO)
 
+    # Envío de órdenes en segundo plano, para no bloquear el bucle de trading mientras responde el bróker
+    ORDER_GATEWAY = OrderGateway(events_queue=events_queue,
+                                order_executor=ORDER_EXECUTOR,
+                                properties=OrderGatewayProps(num_workers=1, max_in_flight=8, timeout_seconds=10.0))
+
+    # Motor de indicadores compartido por todas las estrategias (cada indicador se calcula una vez por símbolo y vela)
+    INDICATOR_ENGINE = IndicatorEngine()
+
     SIGNAL_GENERATOR = SignalGenerator(events_queue=events_queue,
                                         data_provider=DATA_PROVIDER,
                                         portfolio=PORTFOLIO,
                                         order_executor=ORDER_EXECUTOR,
-                                        signal_properties=rsi_props)
+                                        signal_properties=rsi_props,
+                                        indicator_engine=INDICATOR_ENGINE)
     
+    # Correlaciones entre los retornos de los símbolos operados, a disposición de estrategias y gestores de riesgo
+    CORRELATIONS = CorrelationEngine(properties=CorrelationEngineProps(symbols=symbols,
+                                                                        timeframe=timeframe,
+                                                                        window=500))
+
     POSITION_SIZER = PositionSizer(events_queue=events_queue,
                                     data_provider=DATA_PROVIDER,
-                                    sizing_properties=FixedSizingProps(volume=0.05))
-
+                                    sizing_properties=FixedSizingProps(volume=0.05),
+                                    indicator_engine=INDICATOR_ENGINE,
+                                    correlation_engine=CORRELATIONS)
 
     RISK_MANAGER = RiskManager(events_queue=events_queue,
                                 data_provider=DATA_PROVIDER,
                                 portfolio=PORTFOLIO,
-                                risk_properties=MaxLeverageFactorRiskProps(max_leverage_factor=5))
+                                risk_properties=MaxLeverageFactorRiskProps(max_leverage_factor=5),
+                                order_executor=ORDER_EXECUTOR,
+                                correlation_engine=CORRELATIONS)
     
     NOTIFICATIONS = NotificationService(
         properties=TelegramNotificationProperties(
@@ -69,6 +99,19 @@ if __name__ == "__main__":
         )
     )
 
+    METRICS = PerformanceMetrics(properties=PerformanceMetricsProps(rolling_window=500,
+                                                                    periods_per_year=252 * 24 * 60))
+
+    # Cuantiles de spread, volumen y true range por símbolo y hora del día (p. ej. para no operar con spreads anómalos)
+    BAR_STATISTICS = BarStatisticsTracker(properties=BarStatisticsProps(timeframe=timeframe))
+
+    # Checkpoint del estado de las estrategias para restaurarlo al reiniciar
+    STATE_MANAGER = StateManager(properties=StateManagerProps(state_file="state/trading_state.pkl"),
+                                data_provider=DATA_PROVIDER,
+                                components={"signal_generator": SIGNAL_GENERATOR,
+                                            "correlation_engine": CORRELATIONS,
+                                            "bar_statistics": BAR_STATISTICS},
+                                persistent_components={"risk_manager": RISK_MANAGER})
 
     # Creación del trading director y ejecución del método principal
     TRADING_DIRECTOR = TradingDirector(events_queue=events_queue,
@@ -77,6 +120,12 @@ if __name__ == "__main__":
                                         position_sizer=POSITION_SIZER,
                                         risk_manager=RISK_MANAGER,
                                         order_executor=ORDER_EXECUTOR,
-                                        notification_service=NOTIFICATIONS)
+                                        notification_service=NOTIFICATIONS,
+                                        performance_metrics=METRICS,
+                                        state_manager=STATE_MANAGER,
+                                        correlation_engine=CORRELATIONS,
+                                        bar_statistics=BAR_STATISTICS,
+                                        mark_to_market=MARK_TO_MARKET,
+                                        order_gateway=ORDER_GATEWAY)
     
     TRADING_DIRECTOR.execute()
\ No newline at end of file
@@ -5,18 +5,31 @@ from signal_generator.interfaces.signal_generator_interface import ISignalGenera
 from position_sizer.position_sizer import PositionSizer
 from risk_manager.risk_manager import RiskManager
 from order_executor.order_executor import OrderExecutor
+from order_executor.order_gateway import OrderGateway
 from notifications.notifications import NotificationService
-from events.events import DataEvent, SignalEvent, SizingEvent, OrderEvent, ExecutionEvent, PlacedPendingOrderEvent
+from performance.performance_metrics import PerformanceMetrics
+from portfolio.mark_to_market import MarkToMarket
+from state_manager.state_manager import StateManager
+from market_statistics.correlation_engine import CorrelationEngine
+from market_statistics.bar_statistics_tracker import BarStatisticsTracker
+from events.events import DataEvent, SignalEvent, SizingEvent, OrderEvent, ExecutionEvent, PlacedPendingOrderEvent, OrderRejectedEvent
 from utils.utils import Utils
+from clock.clock import Clock
 from typing import Dict, Callable
+from datetime import datetime
+from utils.terminal import mt5
 import queue
-import time
 
 
 class TradingDirector():
     
     def __init__(self, events_queue: queue.Queue, data_provider: DataProvider, signal_generator: ISignalGenerator,
-                position_sizer: PositionSizer, risk_manager: RiskManager, order_executor: OrderExecutor, notification_service: NotificationService):
+                position_sizer: PositionSizer, risk_manager: RiskManager, order_executor: OrderExecutor, notification_service: NotificationService,
+                performance_metrics: PerformanceMetrics | None = None, state_manager: StateManager | None = None,
+                correlation_engine: CorrelationEngine | None = None,
+                bar_statistics: BarStatisticsTracker | None = None,
+                mark_to_market: MarkToMarket | None = None,
+                order_gateway: OrderGateway | None = None):
         """
         Initializes the TradingDirector object.
 
@@ -28,6 +41,12 @@ class TradingDirector():
             risk_manager (RiskManager): The risk manager object.
             order_executor (OrderExecutor): The order executor object.
             notification_service (NotificationService): The notification service object.
+            performance_metrics (PerformanceMetrics | None): The optional performance metrics engine.
+            state_manager (StateManager | None): The optional state manager that checkpoints and restores the state of the strategies.
+            correlation_engine (CorrelationEngine | None): The optional correlation engine of the traded universe, updated on every data event.
+            bar_statistics (BarStatisticsTracker | None): The optional spread, tick volume and true range statistics, updated on every data event.
+            mark_to_market (MarkToMarket | None): The optional mark-to-market of the open positions, revalued once per new bar.
+            order_gateway (OrderGateway | None): The optional asynchronous order gateway. If given, the orders are sent through it without blocking the trading loop.
         """
         self.events_queue = events_queue
         
@@ -38,6 +57,16 @@ class TradingDirector():
         self.RISK_MANAGER = risk_manager
         self.ORDER_EXECUTOR = order_executor
         self.NOTIFICATIONS = notification_service
+        self.METRICS = performance_metrics
+        self.STATE_MANAGER = state_manager
+        self.CORRELATIONS = correlation_engine
+        self.BAR_STATISTICS = bar_statistics
+        self.MARK_TO_MARKET = mark_to_market
+        self.ORDER_GATEWAY = order_gateway
+
+        # Datetime de la última vela en la que hemos registrado la equity y revalorado las posiciones
+        self.last_equity_mark: datetime = datetime.min
+        self.last_mark_to_market: datetime = datetime.min
 
         # Controlador de trading
         self.continue_trading: bool = True
@@ -49,7 +78,8 @@ class TradingDirector():
             "SIZING": self._handle_sizing_event,
             "ORDER": self._handle_order_event,
             "EXECUTION": self._handle_execution_event,
-            "PENDING": self._handle_pending_order_event
+            "PENDING": self._handle_pending_order_event,
+            "REJECTION": self._handle_rejection_event
         }
 
     def _handle_data_event(self, event: DataEvent):
@@ -63,9 +93,61 @@ class TradingDirector():
             None
         """
         # Aquí dentro gestionamos los eventos de tipo DataEvent
+        # En ejecuciones simuladas, el reloj virtual avanza hasta la vela que consumimos
+        Clock.advance_to(event.data.name)
         print(f"{Utils.dateprint()} - Recibido DATA EVENT de {event.symbol} - Último precio de cierre: {event.data.close}")
+        self._mark_equity(event.data.name)
+        self._mark_to_market(event.data.name)
+        self.RISK_MANAGER.on_data_event(event)
+        self.POSITION_SIZER.on_data_event(event)
+        if self.CORRELATIONS is not None:
+            self.CORRELATIONS.on_data_event(event, self.DATA_PROVIDER)
+        if self.BAR_STATISTICS is not None:
+            self.BAR_STATISTICS.on_data_event(event, self.DATA_PROVIDER)
         self.SIGNAL_GENERATOR.generate_signal(event)
 
+    def _mark_equity(self, bar_datetime: datetime) -> None:
+        """
+        Registers the account equity in the performance metrics and the risk manager, once per new bar.
+
+        Args:
+            bar_datetime (datetime): The datetime of the bar that has just closed.
+
+        Returns:
+            None
+        """
+        # Solo registramos una marca por vela, aunque lleguen DataEvents de varios símbolos
+        if bar_datetime <= self.last_equity_mark:
+            return
+
+        account_info = mt5.account_info()
+        if account_info is None:
+            print(f"{Utils.dateprint()} - ERROR: No se ha podido recuperar la equity de la cuenta. MT5 error: {mt5.last_error()}")
+            return
+
+        self.last_equity_mark = bar_datetime
+        if self.METRICS is not None:
+            self.METRICS.update_equity(bar_datetime, account_info.equity)
+        self.RISK_MANAGER.update_equity(bar_datetime, account_info.equity)
+
+    def _mark_to_market(self, bar_datetime: datetime) -> None:
+        """
+        Revalues the open positions once per new bar and passes the unrealized PnL to the performance metrics.
+
+        Args:
+            bar_datetime (datetime): The datetime of the bar that has just closed.
+
+        Returns:
+            None
+        """
+        if self.MARK_TO_MARKET is None or bar_datetime <= self.last_mark_to_market:
+            return
+
+        self.last_mark_to_market = bar_datetime
+        unrealized_pnl = self.MARK_TO_MARKET.revalue()
+        if self.METRICS is not None:
+            self.METRICS.update_unrealized_pnl(unrealized_pnl)
+
     def _handle_signal_event(self, event: SignalEvent):
         """
         Handle the signal event.
@@ -76,22 +158,60 @@ class TradingDirector():
         Returns:
             None
         """
-        # Procesamos el signal event
-        print(f"{Utils.dateprint()} - Recibido SIGNAL EVENT {event.signal} para {event.symbol}")
-        self.POSITION_SIZER.size_signal(event)
+        # Procesamos el signal event junto con el resto de señales ya en la cola (las del mismo cierre de vela),
+        # para que el position sizer pueda repartir el riesgo entre todas ellas
+        signal_events = [event] + self._take_queued_events("SIGNAL")
+        for signal_event in signal_events:
+            print(f"{Utils.dateprint()} - Recibido SIGNAL EVENT {signal_event.signal} para {signal_event.symbol}")
+        self.POSITION_SIZER.size_signals(signal_events)
 
     def _handle_sizing_event(self, event: SizingEvent):
         """
         Handle the sizing event.
 
+        All the sizing events already waiting in the queue (e.g. the signals of several symbols on the same bar close)
+        are assessed together by the risk manager, against one snapshot of the account.
+
         Args:
             event (SizingEvent): The sizing event object.
 
         Returns:
             None
         """
-        print(f"{Utils.dateprint()} - Recibido SIZING EVENT con volumen {event.volume} para {event.signal} en {event.symbol}")
-        self.RISK_MANAGER.assess_order(event)
+        sizing_events = [event] + self._take_queued_events("SIZING")
+        for sizing_event in sizing_events:
+            print(f"{Utils.dateprint()} - Recibido SIZING EVENT con volumen {sizing_event.volume} para {sizing_event.signal} en {sizing_event.symbol}")
+
+        if len(sizing_events) > 1:
+            self.RISK_MANAGER.assess_orders(sizing_events)
+        else:
+            self.RISK_MANAGER.assess_order(event)
+
+    def _take_queued_events(self, event_type: str) -> list:
+        """
+        Takes out of the queue all the waiting events of a given type, keeping the rest in their original order.
+
+        Args:
+            event_type (str): The type of the events to be taken.
+
+        Returns:
+            list: The events taken, in their original order.
+        """
+        taken = []
+        others = []
+        while True:
+            try:
+                queued_event = self.events_queue.get(block=False)
+            except queue.Empty:
+                break
+            if queued_event is not None and queued_event.event_type == event_type:
+                taken.append(queued_event)
+            else:
+                others.append(queued_event)
+
+        for queued_event in others:
+            self.events_queue.put(queued_event)
+        return taken
 
     def _handle_order_event(self, event: OrderEvent):
         """
@@ -104,7 +224,10 @@ class TradingDirector():
             None
         """
         print(f"{Utils.dateprint()} - Recibido ORDER EVENT con volumen {event.volume} para {event.signal} en {event.symbol}")
-        self.ORDER_EXECUTOR.execute_order(event)
+        if self.ORDER_GATEWAY is not None:
+            self.ORDER_GATEWAY.submit(event)
+        else:
+            self.ORDER_EXECUTOR.execute_order(event)
 
     def _handle_execution_event(self, event: ExecutionEvent):
         """
@@ -117,6 +240,9 @@ class TradingDirector():
             None
         """
         print(f"{Utils.dateprint()} - Recibido EXECUTION EVENT {event.signal} en {event.symbol} con volumen {event.volume} al precio {event.fill_price}")
+        if self.METRICS is not None:
+            self.METRICS.on_execution(event)
+        self.RISK_MANAGER.on_execution(event)
         self._process_execution_or_pending_events(event)
 
     def _handle_pending_order_event(self, event: PlacedPendingOrderEvent):
@@ -130,8 +256,23 @@ class TradingDirector():
             None
         """
         print(f"{Utils.dateprint()} - Recibido PLACED PENDING ORDER EVENT con volumen {event.volume} para {event.signal} {event.target_order} en {event.symbol} al precio {event.target_price}")
+        self.RISK_MANAGER.on_pending_order_placed(event)
         self._process_execution_or_pending_events(event)
 
+    def _handle_rejection_event(self, event: OrderRejectedEvent):
+        """
+        Handle the order rejection event.
+
+        Args:
+            event (OrderRejectedEvent): The order rejection event object.
+
+        Returns:
+            None
+        """
+        print(f"{Utils.dateprint()} - Recibido ORDER REJECTED EVENT para {event.signal} {event.target_order} en {event.symbol} con volumen {event.volume}: {event.reason}")
+        self.RISK_MANAGER.on_order_rejected(event)
+        self.NOTIFICATIONS.send_notification(title=f"{event.symbol} - ORDER REJECTED", message=f"{Utils.dateprint()} - Rechazada la orden {event.signal} {event.target_order} en {event.symbol} con volumen {event.volume}: {event.reason}")
+
     def _process_execution_or_pending_events(self, event: ExecutionEvent | PlacedPendingOrderEvent):    # Utilizar el | es para python 3.10 o superior
         """
         Process the execution or pending events.
@@ -177,7 +318,8 @@ class TradingDirector():
         """
         Executes the main trading loop.
 
-        This method continuously checks for events in the events queue and handles them accordingly.
+        On start, the state of the strategies is restored from the last checkpoint or, if that is not possible, their
+        indicators are warmed up from history. Then this method continuously checks for events in the events queue and handles them accordingly.
         If no events are available, it checks for new data from the data provider.
         The loop continues until the `continue_trading` flag is set to False.
 
@@ -189,21 +331,45 @@ class TradingDirector():
         Returns:
         None
         """
+        # Arranque: restauramos el estado guardado o, si no es posible, calentamos los indicadores con el histórico
+        if self.STATE_MANAGER is None or not self.STATE_MANAGER.restore():
+            if hasattr(self.SIGNAL_GENERATOR, 'warm_up'):
+                self.SIGNAL_GENERATOR.warm_up(self.DATA_PROVIDER.symbols)
+            if self.CORRELATIONS is not None:
+                self.CORRELATIONS.warm_up(self.DATA_PROVIDER.get_bulk_history(self.CORRELATIONS.symbols, self.CORRELATIONS.timeframe, self.CORRELATIONS.window + 1))
+            if self.BAR_STATISTICS is not None:
+                self.BAR_STATISTICS.warm_up(self.DATA_PROVIDER.get_bulk_history(self.DATA_PROVIDER.symbols, self.BAR_STATISTICS.timeframe, self.BAR_STATISTICS.warm_up_bars))
+
         # Definición del bucle principal
-        while self.continue_trading:
-            try:
-                event = self.events_queue.get(block=False)    # Recordar que es una cola FIFO
-            
-            except queue.Empty:
-                self.DATA_PROVIDER.check_for_new_data()
-            
-            else:
-                if event is not None:
-                    handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
-                    handler(event)
+        try:
+            while self.continue_trading:
+                try:
+                    event = self.events_queue.get(block=False)    # Recordar que es una cola FIFO
+                
+                except queue.Empty:
+                    self.DATA_PROVIDER.check_for_new_data()
+                
                 else:
-                    self._handle_none_event(event)
-
-            time.sleep(0.01)
+                    if event is not None:
+                        handler = self.event_handler.get(event.event_type, self._handle_unknown_event)
+                        handler(event)
+                    else:
+                        self._handle_none_event(event)
+
+                # Aplicamos las órdenes que el order gateway ha completado mientras procesábamos otros eventos
+                if self.ORDER_GATEWAY is not None:
+                    self.ORDER_GATEWAY.process_completions()
+
+                if self.STATE_MANAGER is not None:
+                    self.STATE_MANAGER.checkpoint_if_due()
+
+                Clock.sleep(0.01)
+
+        finally:
+            # Esperamos a las órdenes en curso y guardamos el estado al terminar (también si se interrumpe la ejecución)
+            if self.ORDER_GATEWAY is not None:
+                self.ORDER_GATEWAY.shutdown()
+            if self.STATE_MANAGER is not None:
+                self.STATE_MANAGER.checkpoint()
         
         print(f"{Utils.dateprint()} - FIN")
@@ -0,0 +1,148 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from .utils import Utils
+from clock.clock import Clock
+from pydantic import BaseModel
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+from .terminal import mt5
+
+
+class SymbolMetadata(BaseModel):
+    """
+    The contract specification of a symbol (the static fields of mt5.symbol_info).
+
+    Attributes:
+        symbol (str): The symbol.
+        point (float): The point size of the symbol.
+        trade_contract_size (float): The number of units of one lot.
+        trade_tick_size (float): The minimum price change.
+        volume_min (float): The minimum volume of an order.
+        volume_max (float): The maximum volume of an order.
+        volume_step (float): The volume step of an order.
+        currency_profit (str): The currency in which the profit of the symbol is computed.
+    """
+    symbol: str
+    point: float
+    trade_contract_size: float
+    trade_tick_size: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+    currency_profit: str
+
+    class Config:
+        frozen = True
+
+
+class SymbolMetadataCache():
+
+    # Cachés compartidas por todos los módulos del framework
+    _metadata: Dict[str, SymbolMetadata] = {}
+    _account_currency: str | None = None
+    _equity: Tuple[float, datetime] | None = None
+    _conversion_rates: Dict[Tuple[str, str], Tuple[float, datetime]] = {}
+
+    @staticmethod
+    def get(symbol: str) -> SymbolMetadata | None:
+        """
+        Returns the contract specification of a symbol. It is read from the platform only the first time.
+
+        Args:
+            symbol (str): The symbol.
+
+        Returns:
+            SymbolMetadata | None: The contract specification, or None if the symbol is not available.
+        """
+        metadata = SymbolMetadataCache._metadata.get(symbol)
+        if metadata is None:
+            symbol_info = mt5.symbol_info(symbol)
+            if symbol_info is None:
+                return None
+            metadata = SymbolMetadata(symbol=symbol,
+                                      point=symbol_info.point,
+                                      trade_contract_size=symbol_info.trade_contract_size,
+                                      trade_tick_size=symbol_info.trade_tick_size,
+                                      volume_min=symbol_info.volume_min,
+                                      volume_max=symbol_info.volume_max,
+                                      volume_step=symbol_info.volume_step,
+                                      currency_profit=symbol_info.currency_profit)
+            SymbolMetadataCache._metadata[symbol] = metadata
+        return metadata
+
+    @staticmethod
+    def get_account_currency() -> str:
+        """
+        Returns the currency of the account. It is read from the platform only the first time.
+        """
+        if SymbolMetadataCache._account_currency is None:
+            SymbolMetadataCache._account_currency = mt5.account_info().currency
+        return SymbolMetadataCache._account_currency
+
+    @staticmethod
+    def get_equity(max_age_seconds: float = 1.0) -> float:
+        """
+        Returns the equity of the account, read from the platform at most once per max_age_seconds.
+
+        Args:
+            max_age_seconds (float): The maximum age of the cached equity.
+
+        Returns:
+            float: The equity, or 0.0 if it has never been read successfully.
+        """
+        now = Clock.now()
+        cached = SymbolMetadataCache._equity
+        if cached is None or now - cached[1] >= timedelta(seconds=max_age_seconds):
+            account_info = mt5.account_info()
+            if account_info is None:
+                return cached[0] if cached is not None else 0.0
+            cached = (account_info.equity, now)
+            SymbolMetadataCache._equity = cached
+        return cached[0]
+
+    @staticmethod
+    def get_conversion_rate(from_ccy: str, to_ccy: str, max_age_seconds: float = 60.0) -> float:
+        """
+        Returns the factor that converts an amount from one currency to another, read from the platform at most once
+        per max_age_seconds.
+
+        Args:
+            from_ccy (str): The currency code of the source currency.
+            to_ccy (str): The currency code of the target currency.
+            max_age_seconds (float): The maximum age of the cached rate.
+
+        Returns:
+            float: The conversion factor, or 0.0 if it has never been read successfully.
+        """
+        if from_ccy == to_ccy:
+            return 1.0
+
+        now = Clock.now()
+        key = (from_ccy, to_ccy)
+        cached = SymbolMetadataCache._conversion_rates.get(key)
+        if cached is None or now - cached[1] >= timedelta(seconds=max_age_seconds):
+            rate = Utils.convert_currency_amount_to_another_currency(1.0, from_ccy, to_ccy)
+            if rate <= 0.0:
+                return cached[0] if cached is not None else 0.0
+            cached = (rate, now)
+            SymbolMetadataCache._conversion_rates[key] = cached
+        return cached[0]
+
+    @staticmethod
+    def invalidate(symbol: str | None = None) -> None:
+        """
+        Removes a symbol (or everything, if None) from the cache, so it is read again from the platform.
+
+        Args:
+            symbol (str | None): The symbol to be removed. If None, all the cached data is removed.
+
+        Returns:
+            None
+        """
+        if symbol is not None:
+            SymbolMetadataCache._metadata.pop(symbol, None)
+            return
+        SymbolMetadataCache._metadata.clear()
+        SymbolMetadataCache._account_currency = None
+        SymbolMetadataCache._equity = None
+        SymbolMetadataCache._conversion_rates.clear()
@@ -0,0 +1,90 @@
+# QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
+
+from typing import Any, Tuple
+import MetaTrader5
+import functools
+import threading
+
+# Lock de las consultas al terminal (velas, ticks, posiciones, cuenta, histórico...). El paquete MetaTrader5 no
+# documenta que sea seguro llamarlo desde varios hilos a la vez, y el order gateway y los cierres en bloque lo llaman
+# desde hilos de trabajo mientras el bucle principal sigue pidiendo datos. Estas llamadas son cortas, así que
+# serializarlas no retrasa el bucle. Es reentrante, para poder agrupar varias llamadas en una sola sección crítica.
+TERMINAL_LOCK = threading.RLock()
+
+# Lock propio de los envíos de órdenes, separado del anterior: una ida y vuelta al bróker nunca deja esperando a las
+# consultas de datos. Solo se usa si se pide serializar los envíos (por defecto se envían en paralelo)
+ORDER_SEND_LOCK = threading.Lock()
+
+
+class SynchronizedTerminal():
+    """
+    Proxy of the MetaTrader5 module that serializes the calls to the terminal with TERMINAL_LOCK. The constants and
+    any other attribute are returned as they are.
+
+    The trade requests (order_send) never take TERMINAL_LOCK: they wait for the round trip to the broker, and holding
+    the terminal-wide lock during it would block the data calls of the trading loop. By default they run concurrently,
+    so several orders (or the closes of a bulk close) are in flight at the same time. They can be serialized among
+    themselves with ORDER_SEND_LOCK on terminals where concurrent trade requests are not reliable.
+    """
+
+    def __init__(self):
+        self.serialize_order_send: bool = False
+
+    def set_serialize_order_send(self, enabled: bool) -> None:
+        """
+        Serializes (or not) the trade requests among themselves with ORDER_SEND_LOCK. The rest of the terminal calls
+        are never blocked by a trade request.
+
+        Args:
+            enabled (bool): True to send the trade requests one at a time.
+
+        Returns:
+            None
+        """
+        self.serialize_order_send = enabled
+
+    def _order_send(self, request: dict) -> Any:
+        """
+        Sends a trade request, without taking TERMINAL_LOCK.
+        """
+        if self.serialize_order_send:
+            with ORDER_SEND_LOCK:
+                return MetaTrader5.order_send(request)
+        return MetaTrader5.order_send(request)
+
+    def order_send_with_error(self, request: dict) -> Tuple[Any, Any]:
+        """
+        Sends a trade request and, if there was no response, reads the last error of the terminal right after it.
+
+        Args:
+            request (dict): The trade request.
+
+        Returns:
+            Tuple[Any, Any]: The result of order_send (None if there was no response) and the last error of the
+            terminal (None if there was a response).
+        """
+        result = self._order_send(request)
+        if result is not None:
+            return result, None
+
+        with TERMINAL_LOCK:
+            return result, MetaTrader5.last_error()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "order_send":
+            return self._order_send
+
+        attribute = getattr(MetaTrader5, name)
+        if not callable(attribute):
+            return attribute
+
+        @functools.wraps(attribute)
+        def synchronized_call(*args, **kwargs):
+            with TERMINAL_LOCK:
+                return attribute(*args, **kwargs)
+
+        return synchronized_call
+
+
+# Todos los módulos del framework acceden al terminal a través de este objeto (import: from utils.terminal import mt5)
+mt5 = SynchronizedTerminal()
@@ -1,8 +1,9 @@
 # QUANTDEMY - https://quantdemy.com - Trading con Python y MetaTrader 5: Crea tu Propio Framework
 
-import MetaTrader5 as mt5
-from datetime import datetime, timezone
+from clock.clock import Clock
+from .terminal import mt5
 from zoneinfo import ZoneInfo
+from datetime import timedelta
 
 # Crear un método estático para poder convertir una divisa a otra
 class Utils():
@@ -34,17 +35,8 @@ class Utils():
         if from_ccy == to_ccy:
             return amount
         
-        all_fx_symbol = ("AUDCAD", "AUDCHF", "AUDJPY", "AUDNZD", "AUDUSD", "CADCHF", "CADJPY", "CHFJPY", "EURAUD", "EURCAD",
-                        "EURCHF", "EURGBP", "EURJPY", "EURNZD", "EURUSD", "GBPAUD", "GBPCAD", "GBPCHF", "GBPJPY", "GBPNZD",
-                        "GBPUSD", "NZDCAD", "NZDCHF", "NZDJPY", "NZDUSD", "USDCAD", "USDCHF", "USDJPY", "USDSEK", "USDNOK")
-        
-        # Convertir las divisas a mayúsculas
-        from_ccy = from_ccy.upper()
-        to_ccy = to_ccy.upper()
-
-        # Buscamos el símbolo que relaciona nuestra divisa origen con nuestra divisa destino (list comprehension)
-        fx_symbol = [symbol for symbol in all_fx_symbol if from_ccy in symbol and to_ccy in symbol][0]
-        fx_symbol_base = fx_symbol[:3]
+        # Buscamos el símbolo que relaciona nuestra divisa origen con nuestra divisa destino
+        fx_symbol = Utils.get_conversion_fx_symbol(from_ccy, to_ccy)
 
         # Recuperamos los últimos datos disponibles del fx_symbol
         try:
@@ -57,20 +49,100 @@ class Utils():
             return 0.0
         
         else:
-            # Recuperamos el último precio disponible del símbolo
-            last_price = tick.bid
+            # Convertimos la cantidad de la divisa origen a la divisa destino con el último precio disponible del símbolo
+            return Utils.convert_currency_amount_with_fx_price(amount, tick.bid, fx_symbol, to_ccy)
+
+    @staticmethod
+    def get_conversion_fx_symbol(from_ccy: str, to_ccy: str) -> str:
+        """
+        Returns the FX symbol that relates the two given currencies.
 
-            # Convertimos la cantidad de la divisa origen a la divisa destino
-            converted_amount = amount / last_price if fx_symbol_base == to_ccy else amount * last_price
-            return converted_amount
+        Args:
+            from_ccy (str): The currency code of the source currency.
+            to_ccy (str): The currency code of the target currency.
+
+        Returns:
+            str: The FX symbol (e.g. "EURUSD" for EUR and USD).
+
+        Raises:
+            IndexError: If there is no FX symbol relating both currencies.
+        """
+        all_fx_symbol = ("AUDCAD", "AUDCHF", "AUDJPY", "AUDNZD", "AUDUSD", "CADCHF", "CADJPY", "CHFJPY", "EURAUD", "EURCAD",
+                        "EURCHF", "EURGBP", "EURJPY", "EURNZD", "EURUSD", "GBPAUD", "GBPCAD", "GBPCHF", "GBPJPY", "GBPNZD",
+                        "GBPUSD", "NZDCAD", "NZDCHF", "NZDJPY", "NZDUSD", "USDCAD", "USDCHF", "USDJPY", "USDSEK", "USDNOK")
+        
+        # Convertir las divisas a mayúsculas
+        from_ccy = from_ccy.upper()
+        to_ccy = to_ccy.upper()
+
+        # Buscamos el símbolo que relaciona nuestra divisa origen con nuestra divisa destino (list comprehension)
+        return [symbol for symbol in all_fx_symbol if from_ccy in symbol and to_ccy in symbol][0]
+
+    @staticmethod
+    def convert_currency_amount_with_fx_price(amount, fx_price, fx_symbol: str, to_ccy: str):
+        """
+        Converts an amount to the target currency using a given price of the FX symbol.
+
+        Works both with floats and with numpy arrays (for example historical prices in a backtest).
+
+        Args:
+            amount (float | np.ndarray): The amount to be converted.
+            fx_price (float | np.ndarray): The price of the FX symbol.
+            fx_symbol (str): The FX symbol that relates both currencies.
+            to_ccy (str): The currency code of the target currency.
+
+        Returns:
+            float | np.ndarray: The converted amount.
+        """
+        fx_symbol_base = fx_symbol[:3]
+        return amount / fx_price if fx_symbol_base == to_ccy.upper() else amount * fx_price
+
+    @staticmethod
+    def get_timeframe_timedelta(timeframe: str) -> timedelta:
+        """
+        Returns the duration of one bar of the given timeframe.
+
+        Args:
+            timeframe (str): The timeframe (e.g. '1min', '4h', '1d').
+
+        Returns:
+            timedelta: The duration of one bar. For the monthly timeframe, the longest month is used.
+
+        Raises:
+            KeyError: If the timeframe is not valid.
+        """
+        timeframe_durations = {
+            '1min': timedelta(minutes=1),
+            '2min': timedelta(minutes=2),
+            '3min': timedelta(minutes=3),
+            '4min': timedelta(minutes=4),
+            '5min': timedelta(minutes=5),
+            '6min': timedelta(minutes=6),
+            '10min': timedelta(minutes=10),
+            '12min': timedelta(minutes=12),
+            '15min': timedelta(minutes=15),
+            '20min': timedelta(minutes=20),
+            '30min': timedelta(minutes=30),
+            '1h': timedelta(hours=1),
+            '2h': timedelta(hours=2),
+            '3h': timedelta(hours=3),
+            '4h': timedelta(hours=4),
+            '6h': timedelta(hours=6),
+            '8h': timedelta(hours=8),
+            '12h': timedelta(hours=12),
+            '1d': timedelta(days=1),
+            '1w': timedelta(weeks=1),
+            '1M': timedelta(days=31),
+        }
+        return timeframe_durations[timeframe]
 
     @staticmethod
     def dateprint() -> str:
         """
-        Returns the current date and time in the format "dd/mm/yyyy HH:MM:SS.sss".
-        The timezone used is "Asia/Nicosia".
+        Returns the current date and time of the framework clock in the format "dd/mm/yyyy HH:MM:SS.sss".
+        The timezone used is "Asia/Nicosia". In simulated runs it is the virtual time of the run.
         """
-        return datetime.now(ZoneInfo("Asia/Nicosia")).strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]
+        return Clock.now(ZoneInfo("Asia/Nicosia")).strftime("%d/%m/%Y %H:%M:%S.%f")[:-3]
 
 
 